@@ -3,27 +3,54 @@
 
 Flow:
 1) POST /api/auth/login -> token
-2) GET  /api/products?search=<code>&page=1&limit=1000 -> exact code match
-3) GET  /api/products/{id} -> current product (used to build safe PUT payload)
+2) code -> id, first match wins:
+   a) local code->id cache (sqlite, TTL; see --id-cache)
+   b) GET /api/products/by-code/<code> -> single product
+   c) GET /api/products?search=<code>&page=1&limit=1000 -> exact code match
+      (only if by-code is unavailable, or --product-id picks among duplicate codes)
+3) GET  /api/products/{id} -> current product (used to build safe PUT payload;
+   a cached id whose product no longer has this code is dropped and re-resolved)
 4) PUT  /api/products/{id} -> update description
 5) GET  /api/products/{id} -> readback verification
 
+The legacy API has no conditional PUT, so two operators appending to the same
+product can overwrite each other's note. With --conflict-retries N, step 4 is
+guarded: the product is re-read right before the PUT and, if its updatedAt (or
+description) moved since step 3, the notes are re-merged onto the fresh
+description; a read-back missing any of our notes (overwritten by a concurrent
+PUT), or a 409/412 from the server, re-merges too. Retries back off with jitter.
+
+--batch FILE runs the same flow for many notes with one login: codes are resolved
+--in-flight at a time, then rows that resolve to the same product id are folded
+into a single PUT (notes appended in file order) so each product has exactly one
+writer, products are written --in-flight at a time, and every row gets a result (stdout summary,
+optional --report NDJSON). FILE is CSV with a header row or NDJSON, with fields
+code, note and optionally product_id / series_id.
+
 Examples:
   TURTLEALBUM_ADMIN_PASSWORD=*** python3 scripts/append_note.py --env dev --code MG-001 --note "2026-02-23: laid eggs x4" --dry-run
   TURTLEALBUM_ADMIN_PASSWORD=*** python3 scripts/append_note.py --env staging --code MG-001 --note "2026-02-23: laid eggs x4"
   TURTLEALBUM_ADMIN_PASSWORD=*** python3 scripts/append_note.py --env prod --code MG-001 --note "2026-02-23: laid eggs x4" --confirm-prod
+  TURTLEALBUM_ADMIN_PASSWORD=*** python3 scripts/append_note.py --env staging --batch notes.csv --dedupe --report notes.result.ndjson
 """
 
 from __future__ import annotations
 
 import argparse
+import csv
 import json
 import os
+import random
 import sys
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
 
-import requests
+from turtlealbum import DEFAULT_POOL_SIZE, ApiClient, DiskCache, TurtleAlbumError
 
 
 ENV_URLS = {
@@ -32,10 +59,25 @@ ENV_URLS = {
     "prod": "https://qmngzrlhklmt.sealoshzh.site",
 }
 
-DEFAULT_TIMEOUT = 20
+
+DEFAULT_ID_CACHE = str(Path("~/.cache/turtlealbum/append_note_ids.sqlite"))
+DEFAULT_ID_CACHE_TTL = 24 * 3600
+
+_FAILED_STATUSES = ("failed", "verify_failed", "conflict")
+
+# Backoff between conflict retries: base * 2^n with jitter, capped.
+CONFLICT_BACKOFF = 0.2
+CONFLICT_BACKOFF_MAX = 3.0
+
+# PUT statuses a server with conditional updates uses to reject a stale write.
+_CONFLICT_STATUSES = {409, 412}
+
+# by-code statuses that send the lookup to the search fallback: a 404 may mean
+# "no such product" or "no such route" on older servers, so search decides.
+_BY_CODE_MISS = {404, 405, 501}
 
 
-class AppendNoteError(RuntimeError):
+class AppendNoteError(TurtleAlbumError):
     pass
 
 
@@ -45,80 +87,58 @@ class TargetProduct:
     code: str
 
 
-class TurtleAlbumClient:
-    def __init__(
-        self,
-        base_url: str,
-        *,
-        username: Optional[str] = None,
-        password: Optional[str] = None,
-        token: Optional[str] = None,
-    ):
-        self.base_url = base_url.rstrip("/")
-        self.token: Optional[str] = token
+@dataclass
+class NoteRow:
+    row: int  # line number in the batch file
+    code: str
+    note: str
+    product_id: Optional[str] = None
+    series_id: Optional[str] = None
 
-        # For read-only operations we can skip login entirely; token is required only for PUT.
-        if self.token is None and username and password:
-            self.token = self._login(username=username, password=password)
-
-    def _login(self, username: str, password: str) -> str:
-        body = self._request(
-            "POST",
-            "/api/auth/login",
-            json_body={"username": username, "password": password},
-            auth=False,
-        )
-        token = ((body or {}).get("data") or {}).get("token")
-        if not token:
-            raise AppendNoteError("Login succeeded but token is missing in /api/auth/login response")
-        return token
-
-    def _request(
-        self,
-        method: str,
-        path: str,
-        *,
-        params: Optional[Dict[str, Any]] = None,
-        json_body: Optional[Dict[str, Any]] = None,
-        auth: bool = True,
-    ) -> Dict[str, Any]:
-        headers: Dict[str, str] = {"Content-Type": "application/json"}
-        if auth:
-            if not self.token:
-                raise AppendNoteError(
-                    "Missing auth token. Provide --password / TURTLEALBUM_ADMIN_PASSWORD (or pass token explicitly)."
-                )
-            headers["Authorization"] = f"Bearer {self.token}"
 
-        url = f"{self.base_url}{path}"
-        try:
-            resp = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                params=params,
-                json=json_body,
-                timeout=DEFAULT_TIMEOUT,
-            )
-        except requests.RequestException as exc:
-            raise AppendNoteError(f"Request failed: {method} {url} -> {exc}") from exc
+@dataclass
+class NoteResult:
+    row: int
+    code: str
+    product_id: Optional[str]
+    status: str  # updated|planned|unchanged|failed|verify_failed|conflict
+    error: Optional[str] = None
+    conflicts: int = 0  # concurrent changes detected and re-merged
 
-        try:
-            body: Dict[str, Any] = resp.json()
-        except ValueError:
-            body = {"message": resp.text}
 
-        if resp.status_code >= 400:
-            detail = body.get("message") or body.get("detail") or resp.text
-            raise AppendNoteError(f"HTTP {resp.status_code}: {detail}")
+@dataclass
+class ProductOutcome:
+    """Result of writing one product's notes (one or more batch rows)."""
+
+    results: List[NoteResult]
+    target: Optional[TargetProduct] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
 
-        if isinstance(body, dict) and body.get("success") is False:
-            raise AppendNoteError(f"API reported failure: {body.get('message') or body}")
 
-        return body
+@dataclass
+class _Lookup:
+    """Target of one code group, resolved before any write."""
+
+    rows: List[NoteRow]
+    target: Optional[TargetProduct] = None
+    current: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    cached_used: bool = False
+
+
+class TurtleAlbumClient(ApiClient):
+    error_cls = AppendNoteError
+
+    def auth_headers(self) -> Dict[str, str]:
+        # For read-only operations we can skip login entirely; token is required only for PUT.
+        if not self.token:
+            raise AppendNoteError(
+                "Missing auth token. Provide --password / TURTLEALBUM_ADMIN_PASSWORD (or pass token explicitly)."
+            )
+        return super().auth_headers()
 
     def list_products_by_search(self, search: str) -> List[Dict[str, Any]]:
-        body = self._request(
+        body = self.request(
             "GET",
             "/api/products",
             params={"search": search, "page": 1, "limit": 1000},
@@ -127,12 +147,24 @@ class TurtleAlbumClient:
         data = body.get("data") or {}
         return data.get("products") or []
 
+    def get_product_by_code(self, code: str) -> Optional[Dict[str, Any]]:
+        """Exact-code lookup; None if the server has no such product or no by-code route."""
+        try:
+            body = self.request("GET", f"/api/products/by-code/{quote(code, safe='')}", auth=bool(self.token))
+        except AppendNoteError as exc:
+            if exc.status_code in _BY_CODE_MISS:
+                return None
+            raise
+        data = body.get("data", body)
+        product = data.get("product", data) if isinstance(data, dict) else None
+        return product if isinstance(product, dict) and product.get("id") else None
+
     def get_product(self, product_id: str) -> Dict[str, Any]:
-        body = self._request("GET", f"/api/products/{product_id}", auth=False)
+        body = self.request("GET", f"/api/products/{product_id}", auth=False)
         return body.get("data") or {}
 
     def update_product(self, product_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        body = self._request("PUT", f"/api/products/{product_id}", json_body=payload, auth=True)
+        body = self.request("PUT", f"/api/products/{product_id}", json_body=payload, auth=True)
         return body.get("data") or {}
 
 
@@ -172,6 +204,69 @@ def _pick_target_product(
     raise AppendNoteError("--product-id did not match any exact code candidates")
 
 
+def _resolve_target(
+    client: TurtleAlbumClient,
+    *,
+    code: str,
+    product_id: Optional[str],
+) -> TargetProduct:
+    """Resolve code -> product via by-code, falling back to the search listing."""
+    if not product_id:
+        product = client.get_product_by_code(code)
+        if product is not None and _normalize_code(str(product.get("code") or "")) == code:
+            return TargetProduct(product_id=str(product["id"]), code=str(product.get("code") or code))
+
+    # Duplicate codes (--product-id) or no by-code route: exact match over search results.
+    products = client.list_products_by_search(code)
+    return _pick_target_product(products, code=code, product_id=product_id)
+
+
+def _load_target(
+    client: TurtleAlbumClient,
+    *,
+    code: str,
+    product_id: Optional[str],
+    cached: Optional[TargetProduct] = None,
+) -> Tuple[TargetProduct, Dict[str, Any]]:
+    """Return (target, current product), trusting ``cached`` if it still has this code."""
+    if cached is not None:
+        current: Dict[str, Any] = {}
+        try:
+            current = client.get_product(cached.product_id)
+        except AppendNoteError as exc:
+            if exc.status_code != 404:
+                raise
+        if _normalize_code(str(current.get("code") or "")) == code:
+            return cached, current
+        # Product deleted or re-coded since it was cached.
+
+    target = _resolve_target(client, code=code, product_id=product_id)
+    return target, client.get_product(target.product_id)
+
+
+def _cache_key(base_url: str, code: str) -> str:
+    return f"{base_url}|{code}"
+
+
+def _cached_targets(
+    id_cache: Optional[DiskCache],
+    base_url: str,
+    codes: List[str],
+    ttl: int,
+) -> Dict[str, TargetProduct]:
+    """Fresh code -> target entries from the id cache, in one lookup."""
+    if id_cache is None or not codes:
+        return {}
+    now = time.time()
+    hits = id_cache.get_many(_cache_key(base_url, c) for c in codes)
+    out: Dict[str, TargetProduct] = {}
+    for c in codes:
+        hit = hits.get(_cache_key(base_url, c))
+        if hit and now - float(hit.get("at") or 0) < ttl:
+            out[c] = TargetProduct(product_id=str(hit["id"]), code=str(hit.get("code") or c))
+    return out
+
+
 def _compute_new_description(
     old_description: Optional[str],
     note: str,
@@ -230,6 +325,320 @@ def _build_put_payload_from_get(product: Dict[str, Any], *, description: str) ->
     return payload
 
 
+def _clean_cell(value: Any) -> Optional[str]:
+    text = str(value).strip() if value is not None else ""
+    return text or None
+
+
+def load_batch(path: str) -> List[NoteRow]:
+    """Read note rows from a CSV (header row) or NDJSON file."""
+    p = Path(path).expanduser()
+    if not p.exists():
+        raise AppendNoteError(f"Batch file not found: {p}")
+
+    records: List[Tuple[int, Dict[str, Any]]] = []
+    with p.open("r", encoding="utf-8-sig", newline="") as fh:
+        if p.suffix.lower() in (".ndjson", ".jsonl"):
+            for lineno, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    raise AppendNoteError(f"{p}:{lineno}: invalid JSON ({exc})") from exc
+                if not isinstance(record, dict):
+                    raise AppendNoteError(f"{p}:{lineno}: expected a JSON object")
+                records.append((lineno, record))
+        else:
+            reader = csv.DictReader(fh)
+            missing = {"code", "note"} - set(reader.fieldnames or [])
+            if missing:
+                raise AppendNoteError(f"{p}: missing CSV column(s): {', '.join(sorted(missing))}")
+            for record in reader:
+                records.append((reader.line_num, record))
+
+    rows: List[NoteRow] = []
+    for lineno, record in records:
+        code = _normalize_code(str(record.get("code") or ""))
+        note = str(record.get("note") or "")
+        if not code or not note.strip():
+            raise AppendNoteError(f"{p}:{lineno}: code and note must be non-empty")
+        rows.append(
+            NoteRow(
+                row=lineno,
+                code=code,
+                note=note,
+                product_id=_clean_cell(record.get("product_id")) or _clean_cell(record.get("productId")),
+                series_id=_clean_cell(record.get("series_id")) or _clean_cell(record.get("seriesId")),
+            )
+        )
+    return rows
+
+
+def _group_rows(rows: List[NoteRow]) -> List[List[NoteRow]]:
+    """Rows per (code, product_id), in order of first appearance; each group is resolved once."""
+    groups: Dict[Tuple[str, Optional[str]], List[NoteRow]] = {}
+    for r in rows:
+        groups.setdefault((r.code, r.product_id), []).append(r)
+    return list(groups.values())
+
+
+def _merge_lookups(lookups: List[_Lookup]) -> List[_Lookup]:
+    """Fold lookups that resolved to the same product id, in order of first appearance.
+
+    Rows keep file order within the product. Failed lookups stay separate.
+    """
+    merged: List[_Lookup] = []
+    by_pid: Dict[str, _Lookup] = {}
+    for lk in lookups:
+        if lk.target is None:
+            merged.append(lk)
+            continue
+        first = by_pid.get(lk.target.product_id)
+        if first is None:
+            first = by_pid[lk.target.product_id] = _Lookup(list(lk.rows), lk.target, lk.current)
+            merged.append(first)
+        else:
+            first.rows.extend(lk.rows)
+    for lk in merged:
+        lk.rows.sort(key=lambda r: r.row)
+    return merged
+
+
+class _Conflict(Exception):
+    """The product changed under us; re-merge from ``current`` and try again."""
+
+    def __init__(self, current: Dict[str, Any], reason: str):
+        super().__init__(reason)
+        self.current = current
+
+
+def _version(product: Dict[str, Any]) -> Any:
+    """What must not change between our GET and PUT (description if no updatedAt)."""
+    return product.get("updatedAt") or product.get("updated_at") or product.get("description")
+
+
+def _merge_notes(
+    description: Optional[str],
+    rows: List[NoteRow],
+    *,
+    skip_present: bool,
+    newline_enabled: bool,
+) -> Tuple[Optional[str], set]:
+    """Append row notes to description; returns (new description, rows left out as present)."""
+    skipped = set()
+    for r in rows:
+        if skip_present and isinstance(description, str) and r.note in description:
+            skipped.add(r.row)
+            continue
+        description = _compute_new_description(description, r.note, newline_enabled=newline_enabled)
+    return description, skipped
+
+
+def _write_product_notes(
+    client: TurtleAlbumClient,
+    rows: List[NoteRow],
+    *,
+    target: TargetProduct,
+    current: Dict[str, Any],
+    dry_run: bool,
+    dedupe: bool,
+    newline_enabled: bool,
+    conflict_retries: int = 0,
+    backoff: float = CONFLICT_BACKOFF,
+) -> ProductOutcome:
+    """Append every row's note to one resolved product with a single PUT, then read back.
+
+    ``current`` is the product as read when ``target`` was resolved. With
+    ``conflict_retries`` the PUT is guarded against concurrent writers (see the
+    module docstring) and retried up to that many times.
+    """
+    pid = target.product_id
+
+    def results(status: str, error: Optional[str] = None, conflicts: int = 0) -> List[NoteResult]:
+        return [NoteResult(r.row, r.code, pid, status, error, conflicts) for r in rows]
+
+    outcome = ProductOutcome([], target=target)
+    series_ids = {r.series_id for r in rows if r.series_id}
+    if len(series_ids) > 1:
+        outcome.results = results("failed", f"conflicting series_id values: {', '.join(sorted(series_ids))}")
+        return outcome
+
+    old_description = current.get("description")
+    description, skipped = _merge_notes(old_description, rows, skip_present=dedupe, newline_enabled=newline_enabled)
+
+    def applied(status: str, conflicts: int = 0) -> List[NoteResult]:
+        return [
+            NoteResult(r.row, r.code, pid, "unchanged", "note already present", conflicts)
+            if r.row in skipped
+            else NoteResult(r.row, r.code, pid, status, None, conflicts)
+            for r in rows
+        ]
+
+    if description == old_description and not series_ids:
+        outcome.results = applied("unchanged")
+        return outcome
+
+    if dry_run:
+        outcome.payload = _build_put_payload_from_get(current, description=description or "")
+        if series_ids:
+            outcome.payload["series_id"] = next(iter(series_ids))
+        outcome.results = applied("planned")
+        return outcome
+
+    wrote = False
+    conflicts = 0
+    while True:
+        try:
+            if conflicts:
+                # Re-merge onto the fresh description. After one of our PUTs was
+                # overwritten, only notes missing from it are appended again.
+                description, skipped_now = _merge_notes(
+                    current.get("description"),
+                    rows,
+                    skip_present=dedupe or wrote,
+                    newline_enabled=newline_enabled,
+                )
+                if not wrote:
+                    skipped = skipped_now
+            payload = _build_put_payload_from_get(current, description=description or "")
+            if series_ids:
+                payload["series_id"] = next(iter(series_ids))
+
+            if conflict_retries:
+                fresh = client.get_product(pid)
+                if _version(fresh) != _version(current):
+                    raise _Conflict(fresh, "product changed before PUT")
+            try:
+                client.update_product(pid, payload)
+            except AppendNoteError as exc:
+                if conflict_retries and exc.status_code in _CONFLICT_STATUSES:
+                    raise _Conflict(client.get_product(pid), f"PUT rejected: {exc}") from exc
+                raise
+            wrote = True
+
+            try:
+                readback = client.get_product(pid)
+            except AppendNoteError as exc:
+                outcome.results = results("verify_failed", f"read-back GET: {exc}")
+                return outcome
+            final_desc = str(readback.get("description") or "")
+            missing = [r for r in rows if r.note.strip() not in final_desc]
+            if missing:
+                if conflict_retries:
+                    raise _Conflict(readback, f"read-back is missing {len(missing)} note(s)")
+                outcome.results = results("verify_failed", f"read-back is missing {len(missing)} note(s)")
+                return outcome
+
+            outcome.payload = payload
+            outcome.results = applied("updated", conflicts)
+            return outcome
+        except _Conflict as conflict:
+            conflicts += 1
+            if conflicts > conflict_retries:
+                outcome.results = results("conflict", f"gave up after {conflicts} conflicts: {conflict}", conflicts)
+                return outcome
+            current = conflict.current
+            time.sleep(min(backoff * 2 ** (conflicts - 1), CONFLICT_BACKOFF_MAX) * (0.5 + random.random()))
+        except AppendNoteError as exc:
+            outcome.results = results("failed", str(exc), conflicts)
+            return outcome
+
+
+def _lookup_group(client: TurtleAlbumClient, rows: List[NoteRow], cached: Optional[TargetProduct]) -> _Lookup:
+    try:
+        target, current = _load_target(client, code=rows[0].code, product_id=rows[0].product_id, cached=cached)
+    except AppendNoteError as exc:
+        return _Lookup(rows, error=str(exc), cached_used=cached is not None)
+    return _Lookup(rows, target, current, cached_used=target is cached)
+
+
+def write_notes(
+    args: argparse.Namespace,
+    client: TurtleAlbumClient,
+    base_url: str,
+    groups: List[List[NoteRow]],
+) -> List[ProductOutcome]:
+    """Resolve each code group, then write each resolved product with up to --in-flight at once.
+
+    Groups are merged by resolved product id before writing, so two codes (or a
+    code with and without --product-id) naming one product never race each other.
+    """
+    id_cache = None if args.no_id_cache else DiskCache(args.id_cache, max_entries=10_000)
+    pool = ThreadPoolExecutor(max_workers=args.in_flight) if args.in_flight > 1 and len(groups) > 1 else None
+    try:
+        # Cached codes are resolved in one lookup; the rest are looked up by the workers.
+        codes = [g[0].code for g in groups if not g[0].product_id]
+        cached = _cached_targets(id_cache, base_url, codes, args.id_cache_ttl)
+
+        def lookup(group: List[NoteRow]) -> _Lookup:
+            return _lookup_group(client, group, None if group[0].product_id else cached.get(group[0].code))
+
+        lookups = list(pool.map(lookup, groups)) if pool is not None else [lookup(g) for g in groups]
+
+        def write(lk: _Lookup) -> ProductOutcome:
+            if lk.target is None:
+                return ProductOutcome([NoteResult(r.row, r.code, None, "failed", lk.error) for r in lk.rows])
+            return _write_product_notes(
+                client,
+                lk.rows,
+                target=lk.target,
+                current=lk.current,
+                dry_run=args.dry_run,
+                dedupe=args.dedupe,
+                newline_enabled=not args.no_newline,
+                conflict_retries=args.conflict_retries,
+            )
+
+        products = _merge_lookups(lookups)
+        outcomes = list(pool.map(write, products)) if pool is not None else [write(lk) for lk in products]
+
+        # The sqlite handle stays on this thread; cache updates happen after the writes.
+        if id_cache is not None:
+            now = time.time()
+            fresh: List[Tuple[str, Any]] = []
+            for lk in lookups:
+                key = _cache_key(base_url, lk.rows[0].code)
+                if lk.target is not None and not lk.cached_used and not lk.rows[0].product_id:
+                    fresh.append((key, {"id": lk.target.product_id, "code": lk.target.code, "at": now}))
+                elif lk.target is None and lk.cached_used:
+                    id_cache.delete(key)
+            id_cache.put_many(fresh)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+        if id_cache is not None:
+            id_cache.close()
+    return outcomes
+
+
+def run_batch(args: argparse.Namespace, client: TurtleAlbumClient, base_url: str) -> int:
+    rows = load_batch(args.batch)
+    groups = _group_rows(rows)
+    print(f"Batch: {len(rows)} notes, {len(groups)} code lookups")
+
+    outcomes = write_notes(args, client, base_url, groups)
+    print(f"Resolved products: {sum(1 for o in outcomes if o.target is not None)}")
+
+    if args.dry_run:
+        for o in outcomes:
+            if o.payload and o.target is not None:
+                print(json.dumps({"product_id": o.target.product_id, "code": o.target.code, "payload": o.payload}))
+
+    results = sorted((r for o in outcomes for r in o.results), key=lambda r: r.row)
+    if args.report:
+        with Path(args.report).expanduser().open("w", encoding="utf-8") as fh:
+            for r in results:
+                fh.write(json.dumps(asdict(r), ensure_ascii=False) + "\n")
+
+    counts = Counter(r.status for r in results)
+    print("Summary: " + ", ".join(f"{k}={counts[k]}" for k in sorted(counts)))
+    failed = [r for r in results if r.status in _FAILED_STATUSES]
+    for r in failed:
+        print(f"- row {r.row} {r.code} ({r.product_id or '-'}): {r.status}: {r.error}", file=sys.stderr)
+    return 1 if failed else 0
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Append a note to a product description")
     parser.add_argument("--env", choices=["dev", "staging", "prod"], default="dev")
@@ -246,8 +655,14 @@ def build_parser() -> argparse.ArgumentParser:
         ),
     )
 
-    parser.add_argument("--code", required=True, help="Product code (exact match)")
-    parser.add_argument("--note", required=True, help="Note/event to append")
+    parser.add_argument("--code", help="Product code (exact match)")
+    parser.add_argument("--note", help="Note/event to append")
+    parser.add_argument(
+        "--batch",
+        help="CSV (header: code,note[,product_id,series_id]) or NDJSON file of notes; replaces --code/--note",
+    )
+    parser.add_argument("--in-flight", type=int, default=4, help="Products written at once in --batch mode")
+    parser.add_argument("--report", help="Write one NDJSON result per --batch row to this file")
     parser.add_argument("--product-id", help="Required when code is duplicated")
     parser.add_argument("--series-id", help="Override series_id (optional)")
 
@@ -260,6 +675,28 @@ def build_parser() -> argparse.ArgumentParser:
     )
     parser.add_argument("--dedupe", action="store_true", help="Skip if description already contains the note")
 
+    parser.add_argument(
+        "--id-cache",
+        default=DEFAULT_ID_CACHE,
+        help=f"sqlite cache of code -> product id for repeated notes (default: {DEFAULT_ID_CACHE})",
+    )
+    parser.add_argument(
+        "--id-cache-ttl",
+        type=int,
+        default=DEFAULT_ID_CACHE_TTL,
+        help=f"Seconds a cached code -> id mapping is trusted (default: {DEFAULT_ID_CACHE_TTL})",
+    )
+    parser.add_argument("--no-id-cache", action="store_true", help="Always resolve the code via the API")
+    parser.add_argument(
+        "--conflict-retries",
+        type=int,
+        default=0,
+        help=(
+            "Guard each PUT against concurrent edits (re-check updatedAt, verify, re-merge) "
+            "and retry up to N times with backoff (default: 0 = plain read-modify-write)"
+        ),
+    )
+
     return parser
 
 
@@ -275,7 +712,19 @@ def run(args: argparse.Namespace) -> int:
     if args.env == "prod" and (not args.dry_run) and (not args.confirm_prod):
         raise AppendNoteError("Refusing to write to prod without --confirm-prod")
 
-    newline_enabled = not bool(args.no_newline)
+    if args.batch:
+        if args.code or args.note or args.product_id or args.series_id:
+            raise AppendNoteError("--batch cannot be combined with --code/--note/--product-id/--series-id")
+        # One connection per in-flight product, so writers never wait on the pool.
+        client = TurtleAlbumClient(
+            base_url,
+            username=args.username,
+            password=password,
+            pool_size=max(DEFAULT_POOL_SIZE, args.in_flight),
+        )
+        return run_batch(args, client, base_url)
+    if not args.code or args.note is None:
+        raise AppendNoteError("Provide --code and --note, or --batch FILE")
 
     client = TurtleAlbumClient(base_url, username=args.username, password=password)
 
@@ -287,40 +736,30 @@ def run(args: argparse.Namespace) -> int:
     if not note.strip():
         raise AppendNoteError("--note must be non-empty")
 
-    products = client.list_products_by_search(code)
-    target = _pick_target_product(products, code=code, product_id=args.product_id)
-
-    current = client.get_product(target.product_id)
-    old_description = current.get("description")
-
-    note_already_present = isinstance(old_description, str) and note in old_description
-    if args.dedupe and note_already_present:
-        # Keep description unchanged, but still allow other field overrides (e.g. series_id).
-        new_description = old_description
-    else:
-        new_description = _compute_new_description(old_description, note, newline_enabled=newline_enabled)
-
-    put_payload = _build_put_payload_from_get(current, description=new_description)
-
-    series_id_override = (str(args.series_id).strip() if args.series_id else "")
-    if series_id_override:
-        put_payload["series_id"] = series_id_override
-
-    if args.dry_run:
+    row = NoteRow(
+        row=0,
+        code=code,
+        note=note,
+        product_id=_clean_cell(args.product_id),
+        series_id=_clean_cell(args.series_id),
+    )
+    (outcome,) = write_notes(args, client, base_url, [[row]])
+    (result,) = outcome.results
+    if result.status in _FAILED_STATUSES:
+        raise AppendNoteError(result.error or result.status)
+
+    if result.status == "unchanged":
+        print("No change: note already present.")
+    elif args.dry_run:
         print("Dry-run: planned update payload (no PUT will be sent).")
-        print(json.dumps({"product_id": target.product_id, "code": target.code, "payload": put_payload}, indent=2))
+        print(json.dumps({"product_id": result.product_id, "code": code, "payload": outcome.payload}, indent=2))
         return 0
-
-    client.update_product(target.product_id, put_payload)
-
-    readback = client.get_product(target.product_id)
-    final_desc = str(readback.get("description") or "")
-    if note.strip() and note.strip() not in final_desc:
-        raise AppendNoteError("Readback verification failed: appended note not found in description")
-
-    print("Update succeeded.")
-    print(f"- product_id: {target.product_id}")
-    print(f"- code: {target.code}")
+    else:
+        print("Update succeeded.")
+        if result.conflicts:
+            print(f"- concurrent changes merged: {result.conflicts}")
+    print(f"- product_id: {result.product_id}")
+    print(f"- code: {outcome.target.code if outcome.target else code}")
     return 0
 
 
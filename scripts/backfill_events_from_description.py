@@ -18,6 +18,21 @@ Examples:
 
   # Apply on prod requires explicit confirm
   python3 scripts/backfill_events_from_description.py --env prod --apply --confirm-prod --username admin --password '***'
+
+  # Post 8 breeders in parallel (each breeder's events are still written in order)
+  python3 scripts/backfill_events_from_description.py --env staging --apply --concurrency 8
+
+  # Offline dry-run from a snapshot (NDJSON streamed line by line; no API calls)
+  python3 scripts/backfill_events_from_description.py --input out/breeders.ndjson --dry-run
+
+  # Repeated dry-runs: only descriptions changed since the last run are parsed
+  python3 scripts/backfill_events_from_description.py --env prod --dry-run --parse-cache out/backfill.parse-cache.sqlite
+
+  # Parse a large export on 4 cores
+  python3 scripts/backfill_events_from_description.py --env prod --dry-run --limit 50000 --workers 4
+
+  # Resumable apply: re-running with the same journal skips confirmed writes
+  python3 scripts/backfill_events_from_description.py --env staging --apply --journal out/backfill.journal.jsonl
 """
 
 from __future__ import annotations
@@ -28,12 +43,26 @@ import json
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-
-import requests
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from turtlealbum import (
+    DEFAULT_MAX_ENTRIES,
+    IDEMPOTENT_METHODS,
+    ApiClient,
+    ApplyJournal,
+    DiskCache,
+    SnapshotError,
+    TurtleAlbumError,
+    add_http_arguments,
+    iter_snapshot_breeders,
+)
+from turtlealbum import grammar
 
 
 def _strip_quotes(v: str) -> str:
@@ -92,10 +121,20 @@ ENV_URLS = {
     "prod": "https://qmngzrlhklmt.sealoshzh.site",
 }
 
-DEFAULT_TIMEOUT = 20
 
+# Bump whenever parsing output can change for the same input; it is part of the
+# parse-cache key, so stale cached results are never reused.
+PARSER_VERSION = "2"
+
+# One page used to be the whole fetch (limit=1000); keep that size so an endpoint
+# that ignores ``page`` still returns at least as much as before.
+BREEDER_PAGE_SIZE = 1000
+
+# Breeders held in memory at once while parsing; each chunk is dropped once parsed.
+PARSE_CHUNK = 2000
 
-class BackfillError(RuntimeError):
+
+class BackfillError(TurtleAlbumError):
     pass
 
 
@@ -126,91 +165,16 @@ class ParsedEvent:
     male_inferred: bool = False
 
 
-class TurtleAlbumClient:
-    def __init__(
-        self,
-        base_url: str,
-        *,
-        username: Optional[str] = None,
-        password: Optional[str] = None,
-        timeout: int = DEFAULT_TIMEOUT,
-    ):
-        self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
-        self.token: Optional[str] = None
-        if username and password:
-            self.token = self._login(username=username, password=password)
-
-    def _request(
-        self,
-        method: str,
-        path: str,
-        *,
-        params: Optional[Dict[str, Any]] = None,
-        json_body: Optional[Dict[str, Any]] = None,
-        auth: bool = False,
-    ) -> Dict[str, Any]:
-        headers: Dict[str, str] = {"Content-Type": "application/json"}
-        if auth:
-            if not self.token:
-                raise BackfillError("Auth requested but client has no token")
-            headers["Authorization"] = f"Bearer {self.token}"
-
-        url = f"{self.base_url}{path}"
-        try:
-            resp = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                params=params,
-                json=json_body,
-                timeout=self.timeout,
-            )
-        except requests.RequestException as exc:
-            raise BackfillError(f"Request failed: {method} {url} -> {exc}") from exc
+class TurtleAlbumClient(ApiClient):
+    error_cls = BackfillError
 
-        body: Dict[str, Any]
-        try:
-            body = resp.json() if resp.content else {}
-        except ValueError:
-            body = {"message": resp.text}
-
-        if resp.status_code >= 400:
-            detail = body.get("message") or body.get("detail") or resp.text
-            raise BackfillError(f"HTTP {resp.status_code}: {detail}")
-
-        if isinstance(body, dict) and body.get("success") is False:
-            raise BackfillError(f"API reported failure: {body.get('message') or body}")
-
-        return body
-
-    def _login(self, username: str, password: str) -> str:
-        body = self._request(
-            "POST",
-            "/api/auth/login",
-            json_body={"username": username, "password": password},
-            auth=False,
-        )
-        token = ((body or {}).get("data") or {}).get("token")
-        if not token:
-            raise BackfillError("Login succeeded but token missing in response")
-        return token
-
-    def list_female_breeders(self, *, limit: int = 1000) -> List[Dict[str, Any]]:
-        body = self._request(
-            "GET",
-            "/api/breeders",
-            params={"sex": "female", "limit": limit},
-            auth=False,
-        )
-        data = body.get("data")
-        if not isinstance(data, list):
-            return []
-        return data
+    def iter_female_breeders(self, *, limit: int = 0, page_size: int = BREEDER_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Stream female breeders page by page (next page prefetched); limit 0 = all."""
+        return self.iter_list("/api/breeders", params={"sex": "female"}, page_size=page_size, limit=limit)
 
     def create_breeder_event(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         # Return the full API response so callers can inspect message for idempotency.
-        return self._request(
+        return self.request(
             "POST",
             "/api/admin/breeder-events",
             json_body=payload,
@@ -218,42 +182,24 @@ class TurtleAlbumClient:
         )
 
 
-_RE_YEAR_LINE = re.compile(r"^\s*(20\d{2})\s*(?:年)?\s*$")
-_RE_LEADING_YEAR = re.compile(r"^\s*(20\d{2})\s*(?:年)?\s*[:：\-]?\s*(.*)$")
-
-# Matches common date formats in operator notes.
-_RE_DATE = re.compile(
-    r"(?P<ymd>(?P<y>20\d{2})[\./\-](?P<m>\d{1,2})[\./\-](?P<d>\d{1,2}))"
-    r"|(?P<md_dash>(?P<m2>\d{1,2})\-(?P<d2>\d{1,2}))"
-    r"|(?P<md_dot>(?P<m3>\d{1,2})\s*\.\s*(?P<d3>\d{1,2}))"
-)
-
-_RE_EGG_COUNT = re.compile(r"(?:产|下)\s*(?:蛋|卵)?\s*(?P<n>\d{1,2})\s*(?:个|枚|颗)?\s*(?:蛋|卵)?")
-_RE_EGG_KW = re.compile(r"(产蛋|下蛋|产卵|下卵)")
-_RE_MATING_KW = re.compile(r"(交配|配对|配)")
 
-# Candidate code formats seen in the dataset (ASCII prefix or CJK prefix, dash, then token).
-_RE_CODE = re.compile(r"(?P<code>(?:[A-Za-z]{1,8}|[\u4e00-\u9fff]{1,8})\-[A-Za-z0-9]{1,8})\s*(?:公)?")
+def _collapse_ws(s: str) -> str:
+    # Same result as re.sub(r"\s+", " ", s.strip()) without the regex.
+    return " ".join((s or "").split())
 
 
-def _collapse_ws(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+# Uppercase ASCII letters only (str.upper() would also touch non-ASCII letters).
+_ASCII_UPPER = {c: c - 32 for c in range(ord("a"), ord("z") + 1)}
 
 
+@lru_cache(maxsize=8192)
 def _normalize_code_token(code: str) -> str:
     c = (code or "").strip()
     if not c:
         return ""
     if c.endswith("公"):
         c = c[:-1]
-    # Uppercase ASCII letters only (keep CJK).
-    out = []
-    for ch in c:
-        if "a" <= ch <= "z":
-            out.append(chr(ord(ch) - 32))
-        else:
-            out.append(ch)
-    return "".join(out)
+    return c.translate(_ASCII_UPPER)
 
 
 def _safe_snippet(s: str, max_len: int = 120) -> str:
@@ -268,10 +214,10 @@ def _build_source_id(*, code: str, event_type: str, event_date: datetime, male_c
         "v1",
         _normalize_code_token(code),
         event_type,
-        event_date.strftime("%Y-%m-%d"),
+        f"{event_date.year:04d}-{event_date.month:02d}-{event_date.day:02d}",
         _normalize_code_token(male_code or ""),
         str(egg_count) if egg_count is not None else "",
-        _collapse_ws(note_key),
+        note_key,  # already collapsed by _safe_snippet()
         "year_assumed=1" if year_assumed else "year_assumed=0",
         "male_inferred=1" if male_inferred else "male_inferred=0",
     ]
@@ -293,13 +239,14 @@ def _parse_date_match(
     dd: Optional[int] = None
     year_assumed = False
 
-    if m.group("ymd"):
-        y = int(m.group("y"))
-        mm = int(m.group("m"))
-        dd = int(m.group("d"))
-    elif m.group("md_dash"):
-        mm = int(m.group("m2"))
-        dd = int(m.group("d2"))
+    # The outer alternative closes last, so lastgroup names the matched format.
+    kind = m.lastgroup
+    if kind == "ymd":
+        ys, ms, ds = m.group("y", "m", "d")
+        y, mm, dd = int(ys), int(ms), int(ds)
+    elif kind == "md_dash" or kind == "md_dot":
+        ms, ds = m.group("m2", "d2") if kind == "md_dash" else m.group("m3", "d3")
+        mm, dd = int(ms), int(ds)
         if current_year is not None:
             y = current_year
         else:
@@ -307,14 +254,6 @@ def _parse_date_match(
             # usually refer to the previous year (e.g. Feb scanning sees 11.25).
             y = now_year - 1 if mm > now_month else now_year
             year_assumed = True
-    elif m.group("md_dot"):
-        mm = int(m.group("m3"))
-        dd = int(m.group("d3"))
-        if current_year is not None:
-            y = current_year
-        else:
-            y = now_year - 1 if mm > now_month else now_year
-            year_assumed = True
     else:
         return (None, False, "unknown_date_format")
 
@@ -329,27 +268,21 @@ def _parse_date_match(
 
 
 def _infer_event_type(segment: str) -> Tuple[Optional[str], Optional[int], bool, Optional[str]]:
-    """Return (event_type, egg_count, ambiguous, reason_if_none)."""
+    """Return (event_type, egg_count, ambiguous, reason_if_none).
 
-    seg = segment or ""
-    egg_count = None
+    Keywords come from ``grammar.classify_segment``, the same test cleanup uses;
+    the egg-count regex only runs to read the count.
+    """
 
-    # Allow loose forms like "产一窝蛋" / "下了蛋".
-    egg_loose_hit = (("产" in seg) or ("下" in seg)) and (("蛋" in seg) or ("卵" in seg))
-    egg_hit = bool(_RE_EGG_KW.search(seg) or _RE_EGG_COUNT.search(seg) or egg_loose_hit)
-    mating_hit = bool(_RE_MATING_KW.search(seg))
+    seg = segment or ""
+    egg_hit, mating_hit = grammar.classify_segment(seg)
 
     if egg_hit and mating_hit:
         return (None, None, True, "ambiguous_keywords")
 
     if egg_hit:
-        m = _RE_EGG_COUNT.search(seg)
-        if m:
-            try:
-                egg_count = int(m.group("n"))
-            except Exception:
-                egg_count = None
-        return ("egg", egg_count, False, None)
+        m = grammar.RE_EGG_COUNT.search(seg)
+        return ("egg", int(m.group("n")) if m else None, False, None)
 
     if mating_hit:
         return ("mating", None, False, None)
@@ -364,7 +297,7 @@ def _extract_male_code(*, segment: str, female_code: str, fallback_mate_code: Op
     female_norm = _normalize_code_token(female_code)
 
     candidates: List[str] = []
-    for m in _RE_CODE.finditer(seg):
+    for m in grammar.RE_CODE.finditer(seg):
         c = _normalize_code_token(m.group("code"))
         if not c:
             continue
@@ -383,6 +316,50 @@ def _extract_male_code(*, segment: str, female_code: str, fallback_mate_code: Op
     return (None, True)
 
 
+@dataclass
+class ScannedLine:
+    """One description line that contains at least one date token."""
+
+    text: str
+    year: Optional[int]  # year context in effect for this line
+    dates: List[re.Match]
+
+
+def scan_description(description: Optional[str]) -> List[ScannedLine]:
+    """Tokenize a description once; both the prefilter and the parser consume this.
+
+    Year header lines ("2025", "2025年") and leading years ("2025: 3.5 交配")
+    update the year context; lines without dates are dropped.
+    """
+
+    out: List[ScannedLine] = []
+    current_year: Optional[int] = None
+
+    for raw_line in (description or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if line.startswith("20"):
+            year_only = grammar.RE_YEAR_LINE.match(line)
+            if year_only:
+                current_year = int(year_only.group(1))
+                continue
+
+            leading_year = grammar.RE_LEADING_YEAR.match(line)
+            if leading_year and leading_year.group(2).strip():
+                current_year = int(leading_year.group(1))
+                line = leading_year.group(2).strip()
+
+        dates = list(grammar.RE_DATE.finditer(line))
+        if not dates:
+            continue
+
+        out.append(ScannedLine(text=line, year=current_year, dates=dates))
+
+    return out
+
+
 def parse_description_events(
     *,
     product_id: str,
@@ -390,43 +367,36 @@ def parse_description_events(
     description: Optional[str],
     mate_code: Optional[str],
     now_year: int,
+    now_month: Optional[int] = None,
+    scan: Optional[List[ScannedLine]] = None,
 ) -> Tuple[List[ParsedEvent], List[ParseFailure]]:
-    """Parse description into ParsedEvent list."""
+    """Parse description into ParsedEvent list.
+
+    Pass ``scan`` from scan_description() to reuse the prefilter's tokens.
+    """
 
     desc = description or ""
     if not desc.strip():
         return ([], [])
 
+    if now_month is None:
+        now_month = datetime.utcnow().month
+    if scan is None:
+        scan = scan_description(desc)
+
     events: List[ParsedEvent] = []
     failures: List[ParseFailure] = []
 
-    current_year: Optional[int] = None
-
-    for raw_line in desc.splitlines():
-        line = (raw_line or "").strip()
-        if not line:
-            continue
-
-        year_only = _RE_YEAR_LINE.match(line)
-        if year_only:
-            current_year = int(year_only.group(1))
-            continue
-
-        leading_year = _RE_LEADING_YEAR.match(line)
-        if leading_year and leading_year.group(2).strip():
-            current_year = int(leading_year.group(1))
-            line = leading_year.group(2).strip()
-
-        matches = list(_RE_DATE.finditer(line))
-        if not matches:
-            continue
+    for sl in scan:
+        line = sl.text
+        matches = sl.dates
 
         for i, m in enumerate(matches):
             dt, year_assumed, date_err = _parse_date_match(
                 m,
-                current_year=current_year,
+                current_year=sl.year,
                 now_year=now_year,
-                now_month=datetime.utcnow().month,
+                now_month=now_month,
             )
             if date_err or dt is None:
                 failures.append(
@@ -441,8 +411,7 @@ def parse_description_events(
 
             seg_start = m.end()
             seg_end = matches[i + 1].start() if i + 1 < len(matches) else len(line)
-            segment = line[seg_start:seg_end]
-            segment = segment.strip(" \t:：,，;；|-—")
+            segment = line[seg_start:seg_end].strip(grammar.SEGMENT_STRIP)
 
             event_type, egg_count, ambiguous, no_kw_reason = _infer_event_type(segment)
             if ambiguous:
@@ -519,27 +488,182 @@ def parse_description_events(
     return (events, failures)
 
 
-def _has_keywords(description: Optional[str]) -> bool:
+def prefilter_description(description: Optional[str]) -> Optional[List[ScannedLine]]:
+    """Return the description's scan if it passes the keyword prefilter, else None.
+
+    Heuristic: require at least one event keyword + at least one date token. The
+    keyword test starts with substring checks, so most free-text descriptions are
+    rejected before any regex or tokenizing.
+    """
+
     d = description or ""
-    if not d.strip():
-        return False
 
-    # Heuristic: require at least one date token + at least one event keyword.
-    if not _RE_DATE.search(d):
-        return False
+    # Same keyword test as the per-segment classification, so no record is skipped here.
+    if not grammar.may_contain_records(d):
+        return None
+
+    scan = scan_description(d)
+    if scan:
+        return scan
+
+    # A date can still span a line break or a stripped leading year ("2024-3").
+    return scan if grammar.RE_DATE.search(d) else None
+
+
+# (product_id, code, description, mate_code): the only breeder fields the parser
+# reads, so worker processes are not sent whole product payloads.
+BreederInput = Tuple[str, str, Optional[str], Optional[str]]
+
+
+def _parse_breeder_chunk(
+    items: List[BreederInput],
+    include_all: bool,
+    now_year: int,
+    now_month: int,
+) -> List[Optional[Tuple[List[ParsedEvent], List[ParseFailure]]]]:
+    """Parse a chunk of breeders; None marks one rejected by the prefilter.
+
+    Module-level so it can run in a worker process.
+    """
+
+    out: List[Optional[Tuple[List[ParsedEvent], List[ParseFailure]]]] = []
+    for product_id, code, desc, mate_code in items:
+        # Tokenize once; the prefilter and the parser share the scan.
+        scan = scan_description(desc) if include_all else prefilter_description(desc)
+        if scan is None:
+            out.append(None)
+            continue
+        out.append(
+            parse_description_events(
+                product_id=product_id,
+                code=code,
+                description=desc,
+                mate_code=mate_code,
+                now_year=now_year,
+                now_month=now_month,
+                scan=scan,
+            )
+        )
+    return out
+
+
+ParseResult = Optional[Tuple[List[ParsedEvent], List[ParseFailure]]]
+
+
+def _parse_cache_key(item: BreederInput, *, include_all: bool, now_year: int, now_month: int) -> str:
+    # code/product_id are inputs too: they end up in source_id and the records.
+    product_id, code, desc, mate_code = item
+    raw = "\x1f".join(
+        [
+            PARSER_VERSION,
+            str(now_year),
+            str(now_month),
+            "all" if include_all else "prefilter",
+            product_id,
+            code,
+            mate_code or "",
+            desc or "",
+        ]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _dump_parse_result(result: ParseResult) -> Any:
+    # Compact rows: product_id/code/source_type come from the breeder on load, and
+    # positional arrays decode much faster than one JSON object per event.
+    if result is None:
+        return None
+    events, failures = result
+    return [
+        [
+            [e.event_type, e.event_date.toordinal(), e.male_code, e.egg_count, e.note, e.source_id, e.year_assumed, e.male_inferred]
+            for e in events
+        ],
+        [[f.reason, f.snippet] for f in failures],
+    ]
+
 
-    if re.search(r"(交配|配对|产蛋|下蛋|产卵|下卵)", d):
-        return True
+def _load_parse_result(item: BreederInput, value: Any) -> ParseResult:
+    if value is None:
+        return None
+    product_id, code = item[0], item[1]
+    rows, failure_rows = value
+    events = [
+        ParsedEvent(product_id, code, t, datetime.fromordinal(d), male, n, note, "description", sid, ya, mi)
+        for t, d, male, n, note, sid, ya, mi in rows
+    ]
+    failures = [ParseFailure(code, product_id, reason, snippet) for reason, snippet in failure_rows]
+    return (events, failures)
 
-    # Loose egg forms: "产一窝蛋" / "下了蛋".
-    if (("产" in d) or ("下" in d)) and (("蛋" in d) or ("卵" in d)):
-        return True
 
-    # Digit egg form: "产 4 蛋".
-    if re.search(r"(?:产|下)\s*\d+\s*(?:个|枚|颗)?\s*(?:蛋|卵)", d):
-        return True
+def _parse_uncached(
+    items: List[BreederInput],
+    *,
+    include_all: bool,
+    now_year: int,
+    now_month: int,
+    workers: int,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> List[ParseResult]:
+    if workers > 1 and len(items) > 1:
+        # A few chunks per worker keeps the pool busy without pickling per breeder.
+        chunk_size = max(1, -(-len(items) // (workers * 4)))
+        chunks = [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+        args = (chunks, [include_all] * len(chunks), [now_year] * len(chunks), [now_month] * len(chunks))
+        if pool is not None:
+            parsed_chunks = list(pool.map(_parse_breeder_chunk, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as own_pool:
+                parsed_chunks = list(own_pool.map(_parse_breeder_chunk, *args))
+        return [r for chunk in parsed_chunks for r in chunk]
+    return _parse_breeder_chunk(items, include_all, now_year, now_month)
 
-    return False
+
+def _parse_breeders(
+    items: List[BreederInput],
+    *,
+    include_all: bool,
+    now_year: int,
+    now_month: int,
+    workers: int = 1,
+    cache: Optional[DiskCache] = None,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> Tuple[int, List[ParsedEvent], List[ParseFailure]]:
+    """Return (matched, events, failures) for items, in input order.
+
+    With workers > 1, chunks of breeders are parsed in a process pool (``pool``,
+    or one created for this call). Results are merged back in chunk order, so
+    the output equals the serial run. With a cache, only breeders whose inputs
+    changed since a previous run are parsed.
+    """
+
+    opts = {"include_all": include_all, "now_year": now_year, "now_month": now_month}
+    if cache is None:
+        results = _parse_uncached(items, workers=workers, pool=pool, **opts)
+    else:
+        keys = [_parse_cache_key(item, **opts) for item in items]
+        cached = cache.get_many(keys)
+        miss_idx = [i for i, k in enumerate(keys) if k not in cached]
+        parsed = _parse_uncached([items[i] for i in miss_idx], workers=workers, pool=pool, **opts)
+        cache.put_many((keys[i], _dump_parse_result(r)) for i, r in zip(miss_idx, parsed))
+
+        results = [None] * len(items)
+        for i, r in zip(miss_idx, parsed):
+            results[i] = r
+        for i, k in enumerate(keys):
+            if k in cached:
+                results[i] = _load_parse_result(items[i], cached[k])
+
+    matched = 0
+    events: List[ParsedEvent] = []
+    failures: List[ParseFailure] = []
+    for r in results:
+        if r is None:
+            continue
+        matched += 1
+        events.extend(r[0])
+        failures.extend(r[1])
+    return (matched, events, failures)
 
 
 def _print_report(
@@ -599,14 +723,125 @@ def _print_report(
                 print(f"  - {dt} {e.event_type}{extra_s} (src={e.source_id[:10]})")
 
 
+def _event_payload(e: ParsedEvent) -> Dict[str, Any]:
+    return {
+        "product_id": e.product_id,
+        "event_type": e.event_type,
+        "event_date": e.event_date.isoformat(),
+        "male_code": e.male_code,
+        "egg_count": e.egg_count,
+        "note": e.note,
+        "source_type": e.source_type,
+        "source_id": e.source_id,
+    }
+
+
+def _post_event(client: TurtleAlbumClient, e: ParsedEvent) -> Tuple[str, Optional[str]]:
+    """Return (outcome, error) where outcome is created|skipped|failed."""
+    try:
+        body = client.create_breeder_event(_event_payload(e))
+    except BackfillError as exc:
+        # If API uses the idempotency skip message as success, we won't be here.
+        return ("failed", str(exc))
+    message = str(body.get("message") or "")
+    if "already exists" in message.lower():
+        return ("skipped", None)
+    return ("created", None)
+
+
+def _record_outcome(tally: Dict[str, int], e: ParsedEvent, outcome: str, error: Optional[str]) -> None:
+    tally[outcome] += 1
+    if outcome == "failed":
+        print(f"❌ {e.code} {e.event_date.strftime('%Y-%m-%d')} {e.event_type} -> {error}")
+
+
+def _apply_events(
+    client: TurtleAlbumClient,
+    events: List[ParsedEvent],
+    *,
+    concurrency: int,
+    journal: Optional[ApplyJournal] = None,
+) -> Dict[str, int]:
+    """Post events and tally created/skipped/failed.
+
+    With concurrency > 1 breeders are posted in parallel, but each breeder's
+    events stay sequential and in order. Outcomes are always reported in the
+    serial order of ``events``. Confirmed writes are appended to ``journal`` as
+    soon as the server answers, so a killed run can resume from it.
+    """
+
+    def post(e: ParsedEvent) -> Tuple[str, Optional[str]]:
+        outcome, error = _post_event(client, e)
+        if journal is not None and outcome != "failed":
+            journal.record(e.source_id, outcome, product_id=e.product_id, code=e.code)
+        return (outcome, error)
+
+    tally = {"created": 0, "skipped": 0, "failed": 0}
+    if concurrency <= 1:
+        for e in events:
+            outcome, error = post(e)
+            _record_outcome(tally, e, outcome, error)
+        return tally
+
+    groups: Dict[str, List[ParsedEvent]] = {}
+    slots: List[Tuple[str, int]] = []
+    for e in events:
+        items = groups.setdefault(e.product_id, [])
+        slots.append((e.product_id, len(items)))
+        items.append(e)
+
+    def post_group(items: List[ParsedEvent]) -> List[Tuple[str, Optional[str]]]:
+        return [post(e) for e in items]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pid: pool.submit(post_group, items) for pid, items in groups.items()}
+        for e, (pid, pos) in zip(events, slots):
+            outcome, error = futures[pid].result()[pos]
+            _record_outcome(tally, e, outcome, error)
+    return tally
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     p = argparse.ArgumentParser(description="Backfill breeder_events from products.description")
     p.add_argument("--env", choices=sorted(ENV_URLS.keys()), default="dev")
     p.add_argument("--base-url", default=None)
 
-    p.add_argument("--limit", type=int, default=1000, help="Max number of female breeders to scan")
+    p.add_argument(
+        "--input",
+        default=None,
+        help="Read breeders from a JSON/NDJSON snapshot instead of GET /api/breeders (e.g. a product export)",
+    )
+    p.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Max number of female breeders to scan (default: all)",
+    )
+    p.add_argument(
+        "--page-size",
+        type=int,
+        default=BREEDER_PAGE_SIZE,
+        help=f"Breeders per /api/breeders page (default: {BREEDER_PAGE_SIZE})",
+    )
     p.add_argument("--only-code", action="append", default=[], help="Filter to specific breeder code(s)")
     p.add_argument("--include-all", action="store_true", help="Scan all breeders (skip keyword prefilter)")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse descriptions in N processes (output is identical to a serial run; useful for large exports)",
+    )
+    p.add_argument(
+        "--parse-cache",
+        default=None,
+        help="sqlite file caching parse results by description hash; re-runs only parse changed descriptions",
+    )
+    p.add_argument(
+        "--parse-cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help=f"Max cached descriptions, least recently used evicted first (default: {DEFAULT_MAX_ENTRIES})",
+    )
 
     p.add_argument("--dry-run", action="store_true", help="Dry run (default)")
     p.add_argument("--apply", action="store_true", help="Actually write via admin API")
@@ -633,6 +868,18 @@ def main(argv: Optional[List[str]] = None) -> int:
     p.add_argument("--preview-per-code", type=int, default=5)
     p.add_argument("--irregular-top-n", type=int, default=20)
     p.add_argument("--max-write", type=int, default=0, help="0 = no limit")
+    p.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Breeders posted in parallel during --apply (events of one breeder stay in order)",
+    )
+    p.add_argument(
+        "--journal",
+        default=None,
+        help="Append-only JSONL of confirmed writes; re-runs skip journaled source_ids without a request",
+    )
+    add_http_arguments(p)
 
     args = p.parse_args(argv)
 
@@ -648,50 +895,78 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     base_url = (args.base_url or ENV_URLS[args.env]).rstrip("/")
     now_year = datetime.utcnow().year
+    now_month = datetime.utcnow().month
 
     print(f"Base URL: {base_url}")
     print(f"Mode: {'APPLY' if args.apply else 'DRY-RUN'}")
     if loaded_env:
         print(f"Loaded .env: {loaded_env}")
 
-    ro_client = TurtleAlbumClient(base_url)
-    breeders = ro_client.list_female_breeders(limit=args.limit)
+    http_opts: Dict[str, Any] = {
+        "timeout": args.timeout,
+        "pool_size": max(args.pool_size, args.concurrency),
+        "retries": args.retries,
+    }
+    breeders: Iterable[Dict[str, Any]]
+    if args.input:
+        print(f"Input: {args.input}")
+        breeders = iter_snapshot_breeders(args.input, limit=args.limit or 0)
+    else:
+        ro_client = TurtleAlbumClient(base_url, **http_opts)
+        breeders = ro_client.iter_female_breeders(limit=args.limit or 0, page_size=args.page_size)
 
     only_codes = [_normalize_code_token(c) for c in (args.only_code or []) if (c or "").strip()]
 
-    scanned = 0
-    matched = 0
-    all_events: List[ParsedEvent] = []
-    all_failures: List[ParseFailure] = []
-
-    for b in breeders:
-        product_id = str(b.get("id") or "")
-        code = str(b.get("code") or "")
-        if not product_id or not code:
-            continue
-
-        code_norm = _normalize_code_token(code)
-        if only_codes and code_norm not in set(only_codes):
-            continue
+    only_code_set = set(only_codes)
 
-        scanned += 1
+    def breeder_inputs() -> Iterator[BreederInput]:
+        for b in breeders:
+            product_id = str(b.get("id") or "")
+            code = str(b.get("code") or "")
+            if not product_id or not code:
+                continue
 
-        desc = b.get("description")
-        mate_code = b.get("mateCode") or b.get("mate_code")
+            if only_code_set and _normalize_code_token(code) not in only_code_set:
+                continue
 
-        if not args.include_all and not _has_keywords(desc):
-            continue
+            yield (product_id, code, b.get("description"), b.get("mateCode") or b.get("mate_code"))
 
-        matched += 1
-        events, failures = parse_description_events(
-            product_id=product_id,
-            code=code,
-            description=desc,
-            mate_code=mate_code,
-            now_year=now_year,
-        )
-        all_events.extend(events)
-        all_failures.extend(failures)
+    scanned = 0
+    matched = 0
+    all_events: List[ParsedEvent] = []
+    all_failures: List[ParseFailure] = []
+    cache = DiskCache(args.parse_cache, max_entries=args.parse_cache_size) if args.parse_cache else None
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    try:
+        # Parse fixed-size chunks as they stream in; only events and failures are kept.
+        inputs = breeder_inputs()
+        while True:
+            chunk = list(islice(inputs, PARSE_CHUNK))
+            if not chunk:
+                break
+            scanned += len(chunk)
+            chunk_matched, events, failures = _parse_breeders(
+                chunk,
+                include_all=args.include_all,
+                now_year=now_year,
+                now_month=now_month,
+                workers=args.workers,
+                cache=cache,
+                pool=pool,
+            )
+            matched += chunk_matched
+            all_events.extend(events)
+            all_failures.extend(failures)
+    except SnapshotError as exc:
+        print(f"Invalid --input: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if cache is not None:
+            cache.close()
+    if cache is not None:
+        print(f"Parse cache: {cache.path} (hits: {cache.hits}, parsed: {cache.misses})")
 
     # Stable ordering for report.
     all_failures.sort(key=lambda x: (x.code, x.reason, x.snippet))
@@ -716,48 +991,59 @@ def main(argv: Optional[List[str]] = None) -> int:
         print("\n--apply requires --username/--password (or TURTLEALBUM_USERNAME/TURTLEALBUM_PASSWORD env vars)")
         return 2
 
-    wr_client = TurtleAlbumClient(base_url, username=args.username, password=args.password)
-
-    print("\n=== Apply ===")
-    created = 0
-    skipped = 0
-    failed = 0
+    journal = ApplyJournal(args.journal) if args.journal else None
 
     # Post in deterministic order.
     events_sorted = sorted(all_events, key=lambda e: (e.code, e.event_date, e.event_type, e.source_id))
+    journaled = 0
+    if journal is not None:
+        pending = [e for e in events_sorted if not journal.done(e.source_id)]
+        journaled = len(events_sorted) - len(pending)
+        events_sorted = pending
+    if args.max_write and len(events_sorted) > args.max_write:
+        events_sorted = events_sorted[: args.max_write]
+        hit_max_write = True
+    else:
+        hit_max_write = False
+
+    print("\n=== Apply ===")
+    if journal is not None:
+        print(f"Journal: {journal.path} ({journaled} events already confirmed, {len(events_sorted)} pending)")
+
+    tally = {"created": 0, "skipped": 0, "failed": 0}
+    try:
+        if events_sorted:
+            # Event writes are idempotent via source_id, so POST is safe to retry on 429/5xx.
+            wr_client = TurtleAlbumClient(
+                base_url,
+                username=args.username,
+                password=args.password,
+                retry_methods=IDEMPOTENT_METHODS | {"POST"},
+                **http_opts,
+            )
+            tally = _apply_events(
+                wr_client,
+                events_sorted,
+                concurrency=args.concurrency,
+                journal=journal,
+            )
+    finally:
+        if journal is not None:
+            journal.close()
+
+    if hit_max_write:
+        print(f"Hit --max-write={args.max_write}; stopping")
 
-    for i, e in enumerate(events_sorted):
-        if args.max_write and i >= args.max_write:
-            print(f"Hit --max-write={args.max_write}; stopping")
-            break
-
-        payload: Dict[str, Any] = {
-            "product_id": e.product_id,
-            "event_type": e.event_type,
-            "event_date": e.event_date.isoformat(),
-            "male_code": e.male_code,
-            "egg_count": e.egg_count,
-            "note": e.note,
-            "source_type": e.source_type,
-            "source_id": e.source_id,
-        }
-
-        try:
-            body = wr_client.create_breeder_event(payload)
-            message = str(body.get("message") or "")
-            if "already exists" in message.lower():
-                skipped += 1
-            else:
-                created += 1
-        except BackfillError as exc:
-            # If API uses the idempotency skip message as success, we won't be here.
-            failed += 1
-            print(f"❌ {e.code} {e.event_date.strftime('%Y-%m-%d')} {e.event_type} -> {exc}")
+    created = tally["created"]
+    skipped = tally["skipped"]
+    failed = tally["failed"]
 
     print("\nApply summary:")
     print(f"  created: {created}")
     print(f"  skipped: {skipped}")
     print(f"  failed: {failed}")
+    if journal is not None:
+        print(f"  journaled (no request): {journaled}")
 
     return 0 if failed == 0 else 1
 
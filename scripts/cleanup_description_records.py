@@ -3,13 +3,20 @@
 
 Goal: After breeder_events is populated, keep products.description as *free-form turtle description only*.
 We remove segments that look like historical records (date + mating/egg keywords) while preserving
-any non-record text on the same line.
+any non-record text on the same line. What counts as a record comes from turtlealbum.grammar, the
+same rules backfill_events_from_description.py uses, so every backfilled record is also cleaned.
 
 Safety:
 - Default is dry-run.
 - PROD writes require --apply --confirm-prod.
 - Uses /api/auth/login with creds from .env (TURTLEALBUM_ADMIN_USERNAME/PASSWORD).
-- Read-back verification per product.
+- Read-back verification per product. Writes run --in-flight products at a time (PUT then GET per
+  product); a failed or mismatched product is reported in the ledger and does not stop the others.
+- The list payload is trusted for planning; only breeders whose description would change are
+  re-fetched (in parallel) and re-planned if their updatedAt moved. --full-refetch GETs every breeder.
+- --input reads breeders from a JSON/NDJSON snapshot; a dry-run then makes no API calls.
+- Changes are planned in chunks and streamed as unified diffs to --report (NDJSON) / --diff files,
+  so dry-run memory does not grow with tenant size.
 
 This script does NOT delete events from breeder_events.
 """
@@ -17,15 +24,26 @@ This script does NOT delete events from breeder_events.
 from __future__ import annotations
 
 import argparse
+import difflib
+import json
 import os
-import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
-import requests
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from turtlealbum import (
+    ApiClient,
+    ApplyJournal,
+    SnapshotError,
+    TurtleAlbumError,
+    add_http_arguments,
+    iter_snapshot_breeders,
+    text_digest,
+)
+from turtlealbum import grammar
 
 ENV_URLS = {
     "dev": "http://localhost:8000",
@@ -76,57 +94,26 @@ def autoload_dotenv(explicit: Optional[str] = None) -> Optional[Path]:
     return None
 
 
-class API:
-    def __init__(self, base_url: str, token: Optional[str]):
-        self.base_url = base_url.rstrip("/")
-        self.token = token
-
-    def _headers(self) -> Dict[str, str]:
-        if not self.token:
-            return {"Content-Type": "application/json"}
-        t = self.token.strip()
-        if not t.lower().startswith("bearer "):
-            t = f"Bearer {t}"
-        return {"Authorization": t, "Content-Type": "application/json"}
-
-    def login(self, username: str, password: str) -> None:
-        r = requests.post(
-            f"{self.base_url}/api/auth/login",
-            json={"username": username, "password": password},
-            timeout=20,
-        )
-        r.raise_for_status()
-        payload = r.json() or {}
-        data = payload.get("data") or payload
-        token = data.get("access_token") or data.get("accessToken") or data.get("token")
-        if not token:
-            raise RuntimeError("Login succeeded but token missing")
-        self.token = token
-
-    def list_female_breeders(self, limit: int) -> List[Dict[str, Any]]:
-        r = requests.get(
-            f"{self.base_url}/api/breeders",
-            params={"sex": "female", "limit": limit},
-            timeout=30,
+# Breeders planned (batch-cleaned and re-fetched) per step; bounds dry-run memory.
+PLAN_CHUNK_SIZE = 500
+
+# Same size as the old single limit=1000 call, so an endpoint that ignores
+# ``page`` still returns at least as much as before.
+BREEDER_PAGE_SIZE = 1000
+
+
+class API(ApiClient):
+    def iter_female_breeders(self, *, limit: int = 0, page_size: int = BREEDER_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Stream female breeders page by page (next page prefetched); limit 0 = all."""
+        return self.iter_list(
+            "/api/breeders", params={"sex": "female"}, page_size=page_size, limit=limit, timeout=30
         )
-        r.raise_for_status()
-        body = r.json() or {}
-        data = body.get("data")
-        return data if isinstance(data, list) else []
 
     def get_product(self, pid: str) -> Dict[str, Any]:
-        r = requests.get(f"{self.base_url}/api/products/{pid}", timeout=20)
-        r.raise_for_status()
-        return (r.json() or {}).get("data") or {}
+        return self.request("GET", f"/api/products/{pid}").get("data") or {}
 
     def update_description(self, pid: str, desc: str) -> None:
-        r = requests.put(
-            f"{self.base_url}/api/products/{pid}",
-            headers=self._headers(),
-            json={"description": desc},
-            timeout=30,
-        )
-        r.raise_for_status()
+        self.request("PUT", f"/api/products/{pid}", json_body={"description": desc}, auth=True, timeout=30)
 
 
 @dataclass
@@ -137,23 +124,6 @@ class Change:
     new: str
 
 
-_RE_DATE = re.compile(
-    r"(?P<ymd>(?P<y>20\d{2})[\./\-](?P<m>\d{1,2})[\./\-](?P<d>\d{1,2}))"
-    r"|(?P<md_dash>(?P<m2>\d{1,2})\-(?P<d2>\d{1,2}))"
-    r"|(?P<md_dot>(?P<m3>\d{1,2})\s*\.\s*(?P<d3>\d{1,2}))"
-)
-
-# Event keywords that indicate a segment is a record (not free description).
-# Keep this fairly permissive; it is only used after a date token is detected.
-_RE_EVENT_KW = re.compile(
-    r"(交配|配对|配"
-    r"|产蛋|下蛋|产卵|下卵"
-    r"|(?:产|下)\s*\d{1,2}\s*(?:个|枚|颗)?\s*受精(?:蛋|卵)?"
-    r"|(?:产|下)\s*\d{1,2}\s*(?:受精)?\s*(?:个|枚|颗)?\s*(?:蛋|卵)"
-    r"|(?:产|下)\s*(?:一窝)?\s*(?:蛋|卵))"
-)
-
-
 def _norm_newlines(s: str) -> str:
     return (s or "").replace("\r\n", "\n").replace("\r", "\n")
 
@@ -161,7 +131,11 @@ def _norm_newlines(s: str) -> str:
 def _cleanup_line(line: str) -> str:
     """Remove date+event segments from a single line, preserving other text."""
     s = line
-    matches = list(_RE_DATE.finditer(s))
+    if not grammar.has_event_keyword(s):
+        # No segment can be a record: keep everything, only normalize spacing if dated.
+        return " ".join(s.split()) if grammar.RE_DATE.search(s) else s
+
+    matches = list(grammar.RE_DATE.finditer(s))
     if not matches:
         return s
 
@@ -177,7 +151,7 @@ def _cleanup_line(line: str) -> str:
         segment = s[seg_after_date:seg_end]
 
         # If the segment contains event keywords, drop date+segment; otherwise keep intact.
-        if _RE_EVENT_KW.search(segment):
+        if grammar.has_event_keyword(segment):
             if prefix.strip():
                 keep_parts.append(prefix)
         else:
@@ -185,28 +159,22 @@ def _cleanup_line(line: str) -> str:
 
         cursor = seg_end
 
-    out = "".join(keep_parts)
-    out = re.sub(r"\s+", " ", out).strip()
-    return out
-
+    return " ".join("".join(keep_parts).split())
 
-def cleanup_description(desc: str) -> str:
-    d = _norm_newlines(desc)
 
+def _cleanup_normalized(d: str, memo: Optional[Dict[str, str]]) -> str:
     out_lines: List[str] = []
     for raw in d.split("\n"):
         line = raw.rstrip()
         if not line.strip():
             continue
 
-        # Drop obvious record headers.
-        if re.search(r"(产蛋/交配记录|交配记录|产蛋记录)", line):
-            continue
-        if line.lstrip().startswith("-") and _RE_DATE.search(line) and _RE_EVENT_KW.search(line):
-            # Bullet record line.
-            continue
-
-        cleaned = _cleanup_line(line)
+        if memo is not None:
+            cleaned = memo.get(line)
+            if cleaned is None:
+                cleaned = memo[line] = _cleanup_record_line(line)
+        else:
+            cleaned = _cleanup_record_line(line)
         if not cleaned:
             continue
         out_lines.append(cleaned)
@@ -214,11 +182,260 @@ def cleanup_description(desc: str) -> str:
     return "\n".join(out_lines).strip()
 
 
+def _cleanup_record_line(line: str) -> str:
+    # Drop obvious record headers.
+    if any(h in line for h in grammar.RECORD_HEADERS):
+        return ""
+    if line.lstrip().startswith("-") and grammar.has_event_keyword(line) and grammar.RE_DATE.search(line):
+        # Bullet record line.
+        return ""
+    return _cleanup_line(line)
+
+
+def cleanup_description(desc: str) -> str:
+    return _cleanup_normalized(_norm_newlines(desc), None)
+
+
+def cleanup_descriptions(descs: Iterable[str]) -> List[str]:
+    """Clean many descriptions in one call.
+
+    Operator notes repeat a lot (templates, copied lines), so each distinct line
+    is cleaned once per call and reused.
+    """
+    memo: Dict[str, str] = {}
+    return [_cleanup_normalized(_norm_newlines(d), memo) for d in descs]
+
+
+def _plan_change(code: str, pid: str, description: Any) -> Optional[Change]:
+    old = _norm_newlines(str(description or "")).strip()
+    new = cleanup_description(old)
+    if new == old:
+        return None
+    return Change(code=code, product_id=pid, old=old, new=new)
+
+
+def collect_changes(
+    api: Optional[API],
+    breeders: List[Dict[str, Any]],
+    *,
+    full_refetch: bool = False,
+    concurrency: int = 8,
+    journal: Optional[ApplyJournal] = None,
+) -> Tuple[List[Change], Dict[str, int]]:
+    """Compute description changes, trusting the list payload where possible.
+
+    The /api/breeders payload already carries description, so only breeders whose
+    cleaned description would differ (or whose list entry has no description) are
+    re-fetched, in parallel. If the fresh product's updatedAt differs from the list
+    entry, the change is recomputed from the fresh description. Changes already
+    confirmed in ``journal`` are dropped before any request. With ``api=None``
+    (offline snapshot) nothing is re-fetched and the payload is used as-is.
+    """
+    stats = {"fetched": 0, "stale": 0, "journaled": 0}
+    planned: List[Optional[Change]] = []
+    to_fetch: List[int] = []
+
+    # Clean every description the list payload can be trusted for in one batch call.
+    olds = {
+        i: _norm_newlines(str(b.get("description") or "")).strip()
+        for i, b in enumerate(breeders)
+        if not (api is not None and (full_refetch or "description" not in b))
+    }
+    news = dict(zip(olds, cleanup_descriptions(olds.values())))
+
+    for i, b in enumerate(breeders):
+        code = str(b.get("code") or "")
+        pid = str(b.get("id") or "")
+        if i not in olds:
+            planned.append(None)
+            to_fetch.append(len(planned) - 1)
+            continue
+        old, new = olds[i], news[i]
+        ch = Change(code=code, product_id=pid, old=old, new=new) if new != old else None
+        if ch is not None and journal is not None and journal.done(pid, text_digest(ch.new)):
+            stats["journaled"] += 1
+            ch = None
+        planned.append(ch)
+        if ch is not None and api is not None:
+            to_fetch.append(len(planned) - 1)
+
+    def refetch(i: int) -> Tuple[Optional[Change], bool]:
+        b = breeders[i]
+        code = str(b.get("code") or "")
+        pid = str(b.get("id") or "")
+        prod = api.get_product(pid)  # type: ignore[union-attr]
+        listed_at = b.get("updatedAt") or b.get("updated_at")
+        fresh_at = prod.get("updatedAt") or prod.get("updated_at")
+        if planned[i] is not None and listed_at and fresh_at and listed_at == fresh_at:
+            return (planned[i], False)
+        stale = "description" in b and (
+            _norm_newlines(str(b.get("description") or "")).strip()
+            != _norm_newlines(str(prod.get("description") or "")).strip()
+        )
+        return (_plan_change(code, pid, prod.get("description")), stale)
+
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            for i, (ch, stale) in zip(to_fetch, pool.map(refetch, to_fetch)):
+                planned[i] = ch
+                stats["stale"] += int(stale)
+        stats["fetched"] = len(to_fetch)
+
+    return ([ch for ch in planned if ch is not None], stats)
+
+
+def change_diff(ch: Change) -> List[str]:
+    """Unified diff lines (no trailing newlines) for one change."""
+    return list(
+        difflib.unified_diff(
+            ch.old.split("\n"),
+            ch.new.split("\n"),
+            fromfile=f"{ch.code} ({ch.product_id}) before",
+            tofile=f"{ch.code} ({ch.product_id}) after",
+            lineterm="",
+            n=1,
+        )
+    )
+
+
+class ReportWriter:
+    """Streams each change to an NDJSON report and/or a unified-diff file as it is found.
+
+    Only counters are kept in memory, so a dry-run over any tenant size stays flat.
+    """
+
+    def __init__(self, ndjson_path: Optional[str] = None, diff_path: Optional[str] = None):
+        self.changes = 0
+        self.lines_removed = 0
+        self.lines_added = 0
+        self.chars_removed = 0
+        self._ndjson = self._open(ndjson_path)
+        self._diff = self._open(diff_path)
+
+    @staticmethod
+    def _open(path: Optional[str]) -> Optional[TextIO]:
+        if not path:
+            return None
+        p = Path(path).expanduser()
+        p.parent.mkdir(parents=True, exist_ok=True)
+        return p.open("w", encoding="utf-8")
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def write(self, ch: Change, diff: Optional[List[str]] = None) -> List[str]:
+        """Record one change; returns its diff lines."""
+        if diff is None:
+            diff = change_diff(ch)
+        body = diff[2:]  # skip ---/+++ headers
+        removed = sum(1 for line in body if line.startswith("-"))
+        added = sum(1 for line in body if line.startswith("+"))
+        self.changes += 1
+        self.lines_removed += removed
+        self.lines_added += added
+        self.chars_removed += len(ch.old) - len(ch.new)
+
+        if self._ndjson is not None:
+            record = {
+                "code": ch.code,
+                "product_id": ch.product_id,
+                "removed_lines": removed,
+                "added_lines": added,
+                "old_sha1": text_digest(ch.old),
+                "new_sha1": text_digest(ch.new),
+                "diff": body,
+            }
+            self._ndjson.write(json.dumps(record, ensure_ascii=False) + "\n")
+        if self._diff is not None:
+            self._diff.write("\n".join(diff) + "\n")
+        return diff
+
+    def close(self) -> None:
+        for fh in (self._ndjson, self._diff):
+            if fh is not None and not fh.closed:
+                fh.close()
+
+
+def _chunked(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@dataclass
+class WriteResult:
+    code: str
+    product_id: str
+    status: str  # updated|verify_failed|failed
+    error: Optional[str] = None
+
+
+def _write_and_verify(api: API, ch: Change, journal: Optional[ApplyJournal]) -> WriteResult:
+    """PUT one description, read it back, and journal it if the read-back matches."""
+    try:
+        api.update_description(ch.product_id, ch.new)
+    except TurtleAlbumError as exc:
+        return WriteResult(ch.code, ch.product_id, "failed", f"PUT: {exc}")
+    try:
+        rb = api.get_product(ch.product_id)
+    except TurtleAlbumError as exc:
+        return WriteResult(ch.code, ch.product_id, "verify_failed", f"read-back GET: {exc}")
+    got = _norm_newlines(str((rb.get("description") or ""))).strip()
+    if got != _norm_newlines(ch.new).strip():
+        return WriteResult(ch.code, ch.product_id, "verify_failed", "read-back mismatch")
+    if journal is not None:
+        journal.record(ch.product_id, "updated", digest=text_digest(ch.new), code=ch.code)
+    return WriteResult(ch.code, ch.product_id, "updated")
+
+
+def apply_changes(
+    api: API,
+    changes: List[Change],
+    *,
+    in_flight: int = 4,
+    journal: Optional[ApplyJournal] = None,
+) -> List[WriteResult]:
+    """Write changes with up to ``in_flight`` products in progress at once.
+
+    Each product's PUT and read-back GET stay in sequence; different products
+    overlap. Returns one ledger entry per change, in input order. A failed
+    product does not stop the others.
+    """
+    if in_flight <= 1:
+        return [_write_and_verify(api, ch, journal) for ch in changes]
+    with ThreadPoolExecutor(max_workers=in_flight) as pool:
+        return list(pool.map(lambda ch: _write_and_verify(api, ch, journal), changes))
+
+
 def main() -> int:
     p = argparse.ArgumentParser(description="Clean legacy record lines from product.description")
     p.add_argument("--env", choices=sorted(ENV_URLS.keys()), default="dev")
     p.add_argument("--base-url", default=None)
-    p.add_argument("--limit", type=int, default=1000)
+    p.add_argument(
+        "--input",
+        default=None,
+        help="Read breeders from a JSON/NDJSON snapshot instead of GET /api/breeders (dry-run makes no API calls)",
+    )
+    p.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Max number of female breeders (default: all)",
+    )
+    p.add_argument(
+        "--page-size",
+        type=int,
+        default=BREEDER_PAGE_SIZE,
+        help=f"Breeders per /api/breeders page (default: {BREEDER_PAGE_SIZE})",
+    )
     p.add_argument("--only-code", action="append", default=[])
 
     p.add_argument("--dry-run", action="store_true", help="Dry run (default)")
@@ -230,6 +447,30 @@ def main() -> int:
 
     p.add_argument("--max-write", type=int, default=0, help="0 = no limit")
     p.add_argument("--show", type=int, default=8, help="Show up to N diffs in dry-run")
+    p.add_argument(
+        "--report",
+        default=None,
+        help="Stream one NDJSON record per change (diff, line counts, sha1 of old/new) to this file",
+    )
+    p.add_argument("--diff", default=None, help="Stream a unified diff of every change to this file")
+    p.add_argument(
+        "--full-refetch",
+        action="store_true",
+        help="GET every breeder before cleaning (default: only those whose description would change)",
+    )
+    p.add_argument("--concurrency", type=int, default=8, help="Parallel product GETs when re-fetching")
+    p.add_argument(
+        "--in-flight",
+        type=int,
+        default=4,
+        help="Products written at once during --apply (each PUT is followed by its read-back GET)",
+    )
+    p.add_argument(
+        "--journal",
+        default=None,
+        help="Append-only JSONL of confirmed updates (--apply); re-runs skip journaled products without a request",
+    )
+    add_http_arguments(p)
 
     args = p.parse_args()
 
@@ -249,35 +490,87 @@ def main() -> int:
 
     only = {c.strip().upper() for c in (args.only_code or []) if (c or "").strip()}
 
-    api = API(base_url, token=None)
+    api = API(
+        base_url,
+        timeout=args.timeout,
+        pool_size=max(args.pool_size, args.concurrency, args.in_flight),
+        retries=args.retries,
+    )
 
-    breeders = api.list_female_breeders(limit=args.limit)
-    changes: List[Change] = []
+    journal = ApplyJournal(args.journal) if (args.journal and args.apply) else None
 
-    for b in breeders:
-        code = str(b.get("code") or "")
-        pid = str(b.get("id") or "")
-        if not code or not pid:
-            continue
-        if only and code.strip().upper() not in only:
-            continue
-
-        # b already includes description, but we do a fresh get_product for correctness.
-        prod = api.get_product(pid)
-        old = _norm_newlines(str(prod.get("description") or "")).strip()
-        new = cleanup_description(old)
-
-        if new != old:
-            changes.append(Change(code=code, product_id=pid, old=old, new=new))
-
-    print(f"Scanned female breeders: {len(breeders)}")
-    print(f"Will change descriptions: {len(changes)}")
+    try:
+        return _run(args, api, only, journal)
+    finally:
+        # Every exit path (bad snapshot, refused prod write, missing credentials) flushes the journal.
+        if journal is not None:
+            journal.close()
+
+
+def _run(args: argparse.Namespace, api: API, only: Set[str], journal: Optional[ApplyJournal]) -> int:
+    breeders: Iterable[Dict[str, Any]]
+    if args.input:
+        print(f"Input: {args.input}")
+        breeders = iter_snapshot_breeders(args.input, limit=args.limit or 0)
+    else:
+        breeders = api.iter_female_breeders(limit=args.limit or 0, page_size=args.page_size)
+
+    counters = {"scanned": 0, "fetched": 0, "stale": 0, "journaled": 0}
+
+    def selected() -> Iterator[Dict[str, Any]]:
+        for b in breeders:
+            counters["scanned"] += 1
+            code = str(b.get("code") or "")
+            pid = str(b.get("id") or "")
+            if not code or not pid:
+                continue
+            if only and code.strip().upper() not in only:
+                continue
+            yield b
+
+    # Breeders are planned chunk by chunk and each change is streamed to the
+    # report as soon as it is known; only --apply keeps the changes it will write.
+    changes: List[Change] = []
+    shown = 0
+    report = ReportWriter(args.report, args.diff)
+    try:
+        for chunk in _chunked(selected(), PLAN_CHUNK_SIZE):
+            chunk_changes, stats = collect_changes(
+                # A snapshot dry-run stays offline; --apply still re-checks live products.
+                None if (args.input and args.dry_run) else api,
+                chunk,
+                full_refetch=args.full_refetch,
+                concurrency=args.concurrency,
+                journal=journal,
+            )
+            for k in ("fetched", "stale", "journaled"):
+                counters[k] += stats[k]
+            for ch in chunk_changes:
+                diff = report.write(ch)
+                if args.dry_run and shown < args.show:
+                    shown += 1
+                    print("\n" + "\n".join(diff))
+                if args.apply:
+                    changes.append(ch)
+    except SnapshotError as exc:
+        print(f"Invalid --input: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        report.close()
+
+    print()
+    print(f"Scanned female breeders: {counters['scanned']}")
+    print(f"Will change descriptions: {report.changes}")
+    print(f"  lines removed: {report.lines_removed}, lines added: {report.lines_added}")
+    print(f"  chars removed: {report.chars_removed}")
+    print(f"Re-fetched products: {counters['fetched']} (stale list entries: {counters['stale']})")
+    if journal is not None:
+        print(f"Journal: {journal.path} (already confirmed: {counters['journaled']})")
+    for label, path in (("Report", args.report), ("Diff", args.diff)):
+        if path:
+            print(f"{label}: {path}")
 
     if args.dry_run:
-        for ch in changes[: max(args.show, 0)]:
-            print("\n---", ch.code, ch.product_id)
-            print("OLD:\n" + ch.old)
-            print("NEW:\n" + ch.new)
         return 0
 
     if args.env == "prod" and not args.confirm_prod:
@@ -292,18 +585,24 @@ def main() -> int:
 
     api.login(username=username, password=password)
 
-    wrote = 0
-    for i, ch in enumerate(changes):
-        if args.max_write and i >= args.max_write:
+    pending: List[Change] = []
+    for ch in changes:
+        if journal is not None and journal.done(ch.product_id, text_digest(ch.new)):
+            continue
+        if args.max_write and len(pending) >= args.max_write:
             print(f"Hit --max-write={args.max_write}; stopping")
             break
+        pending.append(ch)
 
-        api.update_description(ch.product_id, ch.new)
-        rb = api.get_product(ch.product_id)
-        got = _norm_newlines(str((rb.get("description") or ""))).strip()
-        if got != _norm_newlines(ch.new).strip():
-            raise RuntimeError(f"Readback mismatch for {ch.code} {ch.product_id}")
-        wrote += 1
+    ledger = apply_changes(api, pending, in_flight=args.in_flight, journal=journal)
+
+    wrote = sum(1 for r in ledger if r.status == "updated")
+    bad = [r for r in ledger if r.status != "updated"]
+    for r in bad:
+        print(f"  {r.status}: {r.code} {r.product_id} ({r.error})", file=sys.stderr)
+    if bad:
+        print(f"WRITE DONE WITH ERRORS: updated={wrote} failed={len(bad)}")
+        return 1
 
     print(f"WRITE OK: updated={wrote}")
     return 0
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Benchmark cleanup_description(s) from cleanup_description_records.py.
+
+Compares the previous per-line regex loop (kept below as the reference) with
+the shared-grammar implementation, per description and through the batch API,
+on the same synthetic corpus as bench_description_parser.py.
+
+The reference used its own keyword regex, which drifted from the backfill
+parser. The run reports how many descriptions change because of that, and
+fails if the new code differs from the reference for any other reason (the
+reference is re-run with the shared keyword test to check this).
+
+Cleanup is destructive, so the run also mixes dated prose that is not a
+record ("3.5 下午喂鸡蛋") into the corpus and fails if the dry-run diff removes
+any of it, or keeps any of the dated record forms listed below.
+
+Examples:
+  python3 scripts/devtools/bench_cleanup_descriptions.py
+  python3 scripts/devtools/bench_cleanup_descriptions.py --count 20000 --show-drift 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import gc
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cleanup_description_records as cdr  # noqa: E402
+from bench_description_parser import build_corpus  # noqa: E402
+from turtlealbum import grammar  # noqa: E402
+
+
+# --- Reference implementation (pre-grammar), kept verbatim for comparison ---
+
+_REF_RE_DATE = re.compile(
+    r"(?P<ymd>(?P<y>20\d{2})[\./\-](?P<m>\d{1,2})[\./\-](?P<d>\d{1,2}))"
+    r"|(?P<md_dash>(?P<m2>\d{1,2})\-(?P<d2>\d{1,2}))"
+    r"|(?P<md_dot>(?P<m3>\d{1,2})\s*\.\s*(?P<d3>\d{1,2}))"
+)
+
+_REF_RE_EVENT_KW = re.compile(
+    r"(交配|配对|配"
+    r"|产蛋|下蛋|产卵|下卵"
+    r"|(?:产|下)\s*\d{1,2}\s*(?:个|枚|颗)?\s*受精(?:蛋|卵)?"
+    r"|(?:产|下)\s*\d{1,2}\s*(?:受精)?\s*(?:个|枚|颗)?\s*(?:蛋|卵)"
+    r"|(?:产|下)\s*(?:一窝)?\s*(?:蛋|卵))"
+)
+
+KeywordTest = Callable[[str], object]
+
+
+def _ref_cleanup_line(line: str, kw: KeywordTest) -> str:
+    s = line
+    matches = list(_REF_RE_DATE.finditer(s))
+    if not matches:
+        return s
+
+    keep_parts: List[str] = []
+    cursor = 0
+
+    for i, m in enumerate(matches):
+        seg_start = m.start()
+        seg_after_date = m.end()
+        seg_end = matches[i + 1].start() if i + 1 < len(matches) else len(s)
+
+        prefix = s[cursor:seg_start]
+        segment = s[seg_after_date:seg_end]
+
+        if kw(segment):
+            if prefix.strip():
+                keep_parts.append(prefix)
+        else:
+            keep_parts.append(s[cursor:seg_end])
+
+        cursor = seg_end
+
+    out = "".join(keep_parts)
+    out = re.sub(r"\s+", " ", out).strip()
+    return out
+
+
+def _ref_cleanup_description(desc: str, kw: KeywordTest = _REF_RE_EVENT_KW.search) -> str:
+    d = (desc or "").replace("\r\n", "\n").replace("\r", "\n")
+
+    out_lines: List[str] = []
+    for raw in d.split("\n"):
+        line = raw.rstrip()
+        if not line.strip():
+            continue
+
+        if re.search(r"(产蛋/交配记录|交配记录|产蛋记录)", line):
+            continue
+        if line.lstrip().startswith("-") and _REF_RE_DATE.search(line) and kw(line):
+            continue
+
+        cleaned = _ref_cleanup_line(line, kw)
+        if not cleaned:
+            continue
+        out_lines.append(cleaned)
+
+    return "\n".join(out_lines).strip()
+
+
+# Dated text that is not a record: cleanup must keep every one of these.
+_DATED_PROSE = [
+    "3.5 下午喂鸡蛋",
+    "2025-03-01 下雨天没喂食",
+    "4.2 剩下半个蛋壳",
+    "6-18 下个月买鹌鹑蛋",
+    "2024.7.9 生产批次 B",
+    "11.3 天气转凉，下调水温",
+]
+
+# Dated records the shared keyword test must still catch, including every form
+# the reference keyword regex matched.
+_DATED_RECORDS = [
+    "3.5 产蛋2个",
+    "4-1 下了蛋",
+    "2025.5.6 产一窝蛋",
+    "5.20 产21颗",
+    "6.1 下 3 枚受精卵",
+    "7-7 产两个蛋",
+    "8.8 交配 CB-12",
+    "9.1 配对 MG-3",
+    "9-2 配 XY-9",
+    "3.8 下3受精",
+    "3.9 产 2 个受精",
+    "4.10 下2受精个蛋",
+    "4.11 产5枚卵",
+    "5-12 下卵",
+    "5.13 下一窝卵",
+]
+
+
+def _check_fixtures(descs: List[str], seed: int, show: int) -> int:
+    """Dry-run diff over the corpus with dated prose mixed in; returns the number of failures."""
+    rng = random.Random(seed)
+    failures = 0
+    for desc in descs[: max(len(descs) // 10, len(_DATED_PROSE))]:
+        lines = desc.splitlines()
+        prose = rng.choice(_DATED_PROSE)
+        lines.insert(rng.randint(0, len(lines)), prose)
+        mixed = "\n".join(lines)
+        cleaned = cdr.cleanup_description(mixed)
+        removed = [
+            d[1:] for d in difflib.ndiff(mixed.splitlines(), cleaned.splitlines()) if d.startswith("- ")
+        ]
+        if prose not in cleaned.splitlines():
+            failures += 1
+            if failures <= show:
+                print(f"❌ non-record line removed: {prose!r}")
+                print("\n".join(difflib.unified_diff(mixed.splitlines(), cleaned.splitlines(), lineterm="")))
+        elif any(prose in r for r in removed):
+            failures += 1
+    for record in _DATED_RECORDS:
+        if cdr.cleanup_description(record):
+            failures += 1
+            print(f"❌ record kept: {record!r}")
+    return failures
+
+
+def _run(label: str, fn: Callable[[], List[str]], n: int, repeat: int) -> float:
+    """Best-of-``repeat`` wall time."""
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:>12}: {best:7.3f}s  {n / best:10.0f} descriptions/sec")
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark description cleanup throughput")
+    p.add_argument("--count", type=int, default=100_000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--repeat", type=int, default=3, help="Timed passes per implementation (best is reported)")
+    p.add_argument("--show-drift", type=int, default=3, help="Print N descriptions changed by keyword unification")
+    args = p.parse_args(argv)
+
+    descs = [c[2] for c in build_corpus(args.count, args.seed)]
+    print(f"Corpus: {len(descs)} descriptions, {sum(len(d) for d in descs) / 1e6:.1f}M chars")
+
+    t_ref = _run("reference", lambda: [_ref_cleanup_description(d) for d in descs], len(descs), args.repeat)
+    t_one = _run("per-desc", lambda: [cdr.cleanup_description(d) for d in descs], len(descs), args.repeat)
+    t_batch = _run("batch", lambda: cdr.cleanup_descriptions(descs), len(descs), args.repeat)
+    print(f"Speedup: per-desc {t_ref / t_one:.2f}x, batch {t_ref / t_batch:.2f}x")
+
+    new = cdr.cleanup_descriptions(descs)
+    if new != [cdr.cleanup_description(d) for d in descs]:
+        print("❌ batch and per-description results differ")
+        return 1
+
+    unified = [_ref_cleanup_description(d, grammar.has_event_keyword) for d in descs]
+    mismatches = sum(1 for a, b in zip(unified, new) if a != b)
+    if mismatches:
+        print(f"❌ {mismatches} descriptions differ beyond the keyword-set change")
+        return 1
+
+    failures = _check_fixtures(descs, args.seed, max(args.show_drift, 1))
+    if failures:
+        print(f"❌ {failures} fixture checks failed")
+        return 1
+    print("✅ Dated prose fixtures kept, dated record fixtures removed")
+
+    drift = [i for i, d in enumerate(descs) if _ref_cleanup_description(d) != new[i]]
+    if not drift:
+        print("✅ Outputs match the reference")
+        return 0
+    print(f"Keyword-set drift: {len(drift)} descriptions now clean differently (identical under the shared keyword set)")
+    for i in drift[: max(args.show_drift, 0)]:
+        print(f"\n--- #{i}\nOLD: {_ref_cleanup_description(descs[i])!r}\nNEW: {new[i]!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
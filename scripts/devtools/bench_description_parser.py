@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""Benchmark the description scanner used by backfill_events_from_description.py.
+
+Compares the single-pass scanner (prefilter_description/scan_description +
+parse_description_events) against the previous multi-regex implementation,
+kept below together with the helpers it called, on a synthetic corpus.
+Outputs of both are compared item by item.
+
+The reference used its own, looser keyword tests, which drifted from the ones
+cleanup_description_records.py strips. Both now share grammar.classify_segment,
+so the run reports how many descriptions parse differently because of that, and
+fails if the new code differs from the reference for any other reason (the
+reference is re-run with the shared keyword test to check this).
+
+Examples:
+  python3 scripts/devtools/bench_description_parser.py
+  python3 scripts/devtools/bench_description_parser.py --count 20000 --seed 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import backfill_events_from_description as bf  # noqa: E402
+from turtlealbum import grammar  # noqa: E402
+from backfill_events_from_description import ParsedEvent, ParseFailure  # noqa: E402
+
+
+# --- Reference implementation (pre-scanner), kept verbatim for comparison ---
+
+
+def _ref_collapse_ws(s: str) -> str:
+    return re.sub(r"\s+", " ", (s or "").strip())
+
+
+def _ref_normalize_code_token(code: str) -> str:
+    c = (code or "").strip()
+    if not c:
+        return ""
+    if c.endswith("公"):
+        c = c[:-1]
+    # Uppercase ASCII letters only (keep CJK).
+    out = []
+    for ch in c:
+        if "a" <= ch <= "z":
+            out.append(chr(ord(ch) - 32))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _ref_safe_snippet(s: str, max_len: int = 120) -> str:
+    t = _ref_collapse_ws(s)
+    if len(t) <= max_len:
+        return t
+    return t[: max_len - 3] + "..."
+
+
+def _ref_build_source_id(*, code: str, event_type: str, event_date: datetime, male_code: Optional[str], egg_count: Optional[int], note_key: str, year_assumed: bool, male_inferred: bool) -> str:
+    parts = [
+        "v1",
+        _ref_normalize_code_token(code),
+        event_type,
+        event_date.strftime("%Y-%m-%d"),
+        _ref_normalize_code_token(male_code or ""),
+        str(egg_count) if egg_count is not None else "",
+        _ref_collapse_ws(note_key),
+        "year_assumed=1" if year_assumed else "year_assumed=0",
+        "male_inferred=1" if male_inferred else "male_inferred=0",
+    ]
+    raw = "|".join(parts).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _ref_parse_date_match(
+    m: re.Match[str],
+    *,
+    current_year: Optional[int],
+    now_year: int,
+    now_month: int,
+) -> Tuple[Optional[datetime], bool, Optional[str]]:
+    """Return (datetime, year_assumed, error_reason)."""
+
+    y: Optional[int] = None
+    mm: Optional[int] = None
+    dd: Optional[int] = None
+    year_assumed = False
+
+    if m.group("ymd"):
+        y = int(m.group("y"))
+        mm = int(m.group("m"))
+        dd = int(m.group("d"))
+    elif m.group("md_dash"):
+        mm = int(m.group("m2"))
+        dd = int(m.group("d2"))
+        if current_year is not None:
+            y = current_year
+        else:
+            # Rollover heuristic: in early-year ops notes, months greater than now_month
+            # usually refer to the previous year (e.g. Feb scanning sees 11.25).
+            y = now_year - 1 if mm > now_month else now_year
+            year_assumed = True
+    elif m.group("md_dot"):
+        mm = int(m.group("m3"))
+        dd = int(m.group("d3"))
+        if current_year is not None:
+            y = current_year
+        else:
+            y = now_year - 1 if mm > now_month else now_year
+            year_assumed = True
+    else:
+        return (None, False, "unknown_date_format")
+
+    try:
+        if y is None or mm is None or dd is None:
+            return (None, False, "incomplete_date")
+        if not (1 <= mm <= 12 and 1 <= dd <= 31):
+            return (None, False, "invalid_month_or_day")
+        return (datetime(y, mm, dd), year_assumed, None)
+    except Exception:
+        return (None, False, "invalid_date")
+
+
+def _ref_extract_male_code(*, segment: str, female_code: str, fallback_mate_code: Optional[str]) -> Tuple[Optional[str], bool]:
+    """Return (male_code, inferred)."""
+
+    seg = segment or ""
+    female_norm = _ref_normalize_code_token(female_code)
+
+    candidates: List[str] = []
+    for m in grammar.RE_CODE.finditer(seg):
+        c = _ref_normalize_code_token(m.group("code"))
+        if not c:
+            continue
+        # Skip self-reference.
+        if female_norm and c == female_norm:
+            continue
+        candidates.append(c)
+
+    if candidates:
+        return (candidates[0], False)
+
+    fb = _ref_normalize_code_token(fallback_mate_code or "")
+    if fb:
+        return (fb, True)
+
+    return (None, True)
+
+
+_REF_RE_EGG_KW = re.compile(r"(产蛋|下蛋|产卵|下卵)")
+_REF_RE_MATING_KW = re.compile(r"(交配|配对|配)")
+
+
+def _ref_infer_event_type(segment: str, shared: bool = False) -> Tuple[Optional[str], Optional[int], bool, Optional[str]]:
+    seg = segment or ""
+    egg_count = None
+
+    if shared:
+        egg_hit, mating_hit = grammar.classify_segment(seg)
+    else:
+        egg_loose_hit = (("产" in seg) or ("下" in seg)) and (("蛋" in seg) or ("卵" in seg))
+        egg_hit = bool(_REF_RE_EGG_KW.search(seg) or grammar.RE_EGG_COUNT.search(seg) or egg_loose_hit)
+        mating_hit = bool(_REF_RE_MATING_KW.search(seg))
+
+    if egg_hit and mating_hit:
+        return (None, None, True, "ambiguous_keywords")
+
+    if egg_hit:
+        m = grammar.RE_EGG_COUNT.search(seg)
+        if m:
+            try:
+                egg_count = int(m.group("n"))
+            except Exception:
+                egg_count = None
+        return ("egg", egg_count, False, None)
+
+    if mating_hit:
+        return ("mating", None, False, None)
+
+    return (None, None, False, "no_event_keyword")
+
+
+def _ref_parse(
+    *,
+    product_id: str,
+    code: str,
+    description: Optional[str],
+    mate_code: Optional[str],
+    now_year: int,
+    shared: bool = False,
+) -> Tuple[List[ParsedEvent], List[ParseFailure]]:
+    desc = description or ""
+    if not desc.strip():
+        return ([], [])
+
+    events: List[ParsedEvent] = []
+    failures: List[ParseFailure] = []
+    current_year: Optional[int] = None
+
+    for raw_line in desc.splitlines():
+        line = (raw_line or "").strip()
+        if not line:
+            continue
+
+        year_only = grammar.RE_YEAR_LINE.match(line)
+        if year_only:
+            current_year = int(year_only.group(1))
+            continue
+
+        leading_year = grammar.RE_LEADING_YEAR.match(line)
+        if leading_year and leading_year.group(2).strip():
+            current_year = int(leading_year.group(1))
+            line = leading_year.group(2).strip()
+
+        matches = list(grammar.RE_DATE.finditer(line))
+        if not matches:
+            continue
+
+        for i, m in enumerate(matches):
+            dt, year_assumed, date_err = _ref_parse_date_match(
+                m, current_year=current_year, now_year=now_year, now_month=datetime.utcnow().month
+            )
+            if date_err or dt is None:
+                failures.append(
+                    ParseFailure(code=code, product_id=product_id, reason=f"date_parse_failed:{date_err}", snippet=_ref_safe_snippet(line))
+                )
+                continue
+
+            seg_start = m.end()
+            seg_end = matches[i + 1].start() if i + 1 < len(matches) else len(line)
+            segment = line[seg_start:seg_end].strip(" \t:：,，;；|-—")
+
+            event_type, egg_count, ambiguous, no_kw_reason = _ref_infer_event_type(segment, shared)
+            if ambiguous:
+                failures.append(
+                    ParseFailure(code=code, product_id=product_id, reason="ambiguous_event_type", snippet=_ref_safe_snippet(f"{m.group(0)} {segment}"))
+                )
+                continue
+            if not event_type:
+                failures.append(
+                    ParseFailure(code=code, product_id=product_id, reason=no_kw_reason or "unknown", snippet=_ref_safe_snippet(f"{m.group(0)} {segment}"))
+                )
+                continue
+
+            male_code_val: Optional[str] = None
+            male_inferred = False
+            if event_type == "mating":
+                male_code_val, male_inferred = _ref_extract_male_code(segment=segment, female_code=code, fallback_mate_code=mate_code)
+
+            flags = []
+            if year_assumed:
+                flags.append("year_assumed")
+            if event_type == "mating" and male_inferred:
+                flags.append("male_inferred")
+
+            note_key = _ref_safe_snippet(f"{m.group(0)} {segment}", max_len=160)
+            note = "backfill:description"
+            if flags:
+                note += f"; flags={','.join(flags)}"
+            note += f"; raw={note_key}"
+
+            source_id = _ref_build_source_id(
+                code=code, event_type=event_type, event_date=dt, male_code=male_code_val, egg_count=egg_count,
+                note_key=note_key, year_assumed=year_assumed, male_inferred=male_inferred,
+            )
+            events.append(
+                ParsedEvent(
+                    product_id=product_id, code=code, event_type=event_type, event_date=dt, male_code=male_code_val,
+                    egg_count=egg_count, note=note, source_type="description", source_id=source_id,
+                    year_assumed=year_assumed, male_inferred=male_inferred,
+                )
+            )
+
+    return (events, failures)
+
+
+def _ref_has_keywords(description: Optional[str], shared: bool = False) -> bool:
+    d = description or ""
+    if not d.strip():
+        return False
+    if not grammar.RE_DATE.search(d):
+        return False
+    if shared:
+        return grammar.may_contain_records(d)
+    if re.search(r"(交配|配对|产蛋|下蛋|产卵|下卵)", d):
+        return True
+    if (("产" in d) or ("下" in d)) and (("蛋" in d) or ("卵" in d)):
+        return True
+    if re.search(r"(?:产|下)\s*\d+\s*(?:个|枚|颗)?\s*(?:蛋|卵)", d):
+        return True
+    return False
+
+
+# --- Synthetic corpus ---
+
+_FREE_TEXT = [
+    "漂亮的龟，背甲完整",
+    "性格温顺，吃食积极",
+    "Nice shell pattern",
+    "下午喂食一次",
+    "体重 1.2kg",
+    "来自 CB 系列",
+    "",
+]
+_EVENT_TEXT = [
+    "交配 {male}",
+    "配对{male}公",
+    "配 {male}",
+    "产蛋{n}个",
+    "下蛋 {n} 枚",
+    "产{n}颗",
+    "下了蛋",
+    "产一窝蛋",
+    "交配后产蛋",
+    "换公",
+    "",
+]
+
+
+def _rand_date(rng: random.Random) -> str:
+    m, d = rng.randint(1, 13), rng.randint(1, 32)
+    style = rng.randrange(5)
+    if style == 0:
+        return f"{rng.choice([2024, 2025, 2026])}-{m:02d}-{d:02d}"
+    if style == 1:
+        return f"{rng.choice([2024, 2025])}.{m}.{d}"
+    if style == 2:
+        return f"{m}-{d}"
+    if style == 3:
+        return f"{m} . {d}"
+    return f"{m}.{d}"
+
+
+def build_corpus(count: int, seed: int) -> List[Tuple[str, str, str, Optional[str]]]:
+    """Return (product_id, code, description, mate_code) tuples."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        lines: List[str] = []
+        for _ in range(rng.randint(0, 8)):
+            kind = rng.random()
+            if kind < 0.15:
+                lines.append(rng.choice(["2024", "2025年", "2025：", "2026 年"]))
+            elif kind < 0.45:
+                lines.append(rng.choice(_FREE_TEXT))
+            else:
+                parts = []
+                if rng.random() < 0.2:
+                    parts.append(rng.choice(["2025 ", "2024年 ", "2026:"]))
+                for _ in range(rng.randint(1, 3)):
+                    ev = rng.choice(_EVENT_TEXT).format(
+                        male=rng.choice(["CB-12", "mg-3", "黑-A1", "XY-9"]), n=rng.randint(1, 30)
+                    )
+                    parts.append(f"{_rand_date(rng)}{rng.choice(['', ' ', ': ', '，'])}{ev}")
+                lines.append(rng.choice(["", "- "]) + rng.choice([" ", "；", " | "]).join(parts))
+        sep = rng.choice(["\n", "\r\n", "\n\n"])
+        corpus.append((f"p{i}", f"MG-{i % 997}", sep.join(lines), rng.choice([None, "CB-1", "cb-7"])))
+    return corpus
+
+
+def _run(label: str, fn: Callable[[list], int], n: int, repeat: int) -> float:
+    """Best-of-``repeat`` wall time; outputs of each pass are discarded."""
+    best = float("inf")
+    matched = 0
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        start = time.perf_counter()
+        matched = fn([])
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:>10}: {best:7.3f}s  {n / best:10.0f} descriptions/sec  (matched={matched})")
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark description parsing throughput")
+    p.add_argument("--count", type=int, default=100_000)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--repeat", type=int, default=3, help="Timed passes per implementation (best is reported)")
+    p.add_argument("--include-all", action="store_true", help="Parse every description (skip prefilter)")
+    args = p.parse_args(argv)
+
+    now = datetime.utcnow()
+    corpus = build_corpus(args.count, args.seed)
+    print(f"Corpus: {len(corpus)} descriptions, {sum(len(c[2]) for c in corpus) / 1e6:.1f}M chars")
+
+    def run_ref(out: list, shared: bool = False) -> int:
+        matched = 0
+        for pid, code, desc, mate in corpus:
+            hit = args.include_all or _ref_has_keywords(desc, shared)
+            res = (
+                _ref_parse(product_id=pid, code=code, description=desc, mate_code=mate, now_year=now.year, shared=shared)
+                if hit
+                else None
+            )
+            matched += int(hit)
+            out.append((hit, res))
+        return matched
+
+    def run_new(out: list) -> int:
+        matched = 0
+        for pid, code, desc, mate in corpus:
+            scan = bf.scan_description(desc) if args.include_all else bf.prefilter_description(desc)
+            hit = scan is not None
+            res = (
+                bf.parse_description_events(
+                    product_id=pid, code=code, description=desc, mate_code=mate,
+                    now_year=now.year, now_month=now.month, scan=scan,
+                )
+                if hit
+                else None
+            )
+            matched += int(hit)
+            out.append((hit, res))
+        return matched
+
+    t_ref = _run("reference", run_ref, len(corpus), args.repeat)
+    t_new = _run("scanner", run_new, len(corpus), args.repeat)
+    print(f"Speedup: {t_ref / t_new:.2f}x")
+
+    ref_out: List[Tuple[bool, object]] = []
+    shared_out: List[Tuple[bool, object]] = []
+    new_out: List[Tuple[bool, object]] = []
+    run_ref(ref_out)
+    run_ref(shared_out, shared=True)
+    run_new(new_out)
+
+    mismatches = sum(1 for a, b in zip(shared_out, new_out) if a != b)
+    if mismatches:
+        print(f"❌ {mismatches} descriptions differ beyond the keyword-set change")
+        return 1
+    drift = sum(1 for a, b in zip(ref_out, new_out) if a != b)
+    if not drift:
+        print("✅ Outputs identical")
+        return 0
+    print(f"Keyword-set drift: {drift} descriptions now parse differently (identical under the shared keyword set)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
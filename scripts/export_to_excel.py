@@ -2,28 +2,62 @@
 """
 TurtleAlbum Excel Export Script
 
-根据用户需求导出产品数据到 Excel 文件。
+根据用户需求导出产品数据到 Excel 文件，或导出 CSV / NDJSON / Parquet 供分析使用。
 
 Usage:
     python3 scripts/export_to_excel.py --env prod --password PASSWORD --output products.xlsx
     python3 scripts/export_to_excel.py --env prod --password PASSWORD --series CB-2026
     python3 scripts/export_to_excel.py --env prod --password PASSWORD --quality-max 7
+    python3 scripts/export_to_excel.py --env prod --password PASSWORD --stream   # 大目录：分页流式写入
+    python3 scripts/export_to_excel.py --env prod --password PASSWORD --format parquet --output products
+    python3 scripts/export_to_excel.py --env prod --password PASSWORD --incremental   # 只拉取变更的产品
+    python3 scripts/export_to_excel.py --env prod --password PASSWORD --incremental --delta --output delta.xlsx
 """
 
 import requests
 import argparse
-from typing import List, Dict, Any, Optional
+import abc
+import csv
+import importlib
+import json
+from copy import copy
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
 import sys
 
-try:
-    import openpyxl
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    from openpyxl.utils import get_column_letter
-except ImportError:
-    print("❌ 缺少依赖: openpyxl")
-    print("请安装: pip3 install openpyxl")
-    sys.exit(1)
+from turtlealbum import ProductStore, cached_token, extract_token, get_session, iter_pages, quality, store_token
+from turtlealbum.store import is_newest_first, parse_timestamp, updated_at, updated_time
+
+
+def _require(module: str, package: str):
+    """按需导入可选依赖（只在用到对应导出格式时才要求安装）"""
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        print(f"❌ 缺少依赖: {package}")
+        print(f"请安装: pip3 install {package}")
+        sys.exit(1)
+
+
+# 工作簿命名样式
+STYLE_HEADER_PRODUCTS = "ta_header_products"
+STYLE_HEADER_IMAGES = "ta_header_images"
+STYLE_SCORE_HIGH = "ta_score_high"
+STYLE_SCORE_MID = "ta_score_mid"
+STYLE_SCORE_LOW = "ta_score_low"
+STYLE_TITLE = "ta_title"
+STYLE_BOLD = "ta_bold"
+
+# 分页拉取：每页产品数（/api/products 的 pageSize 上限为 100）；第 1 页之后并发请求的页数
+PAGE_SIZE = 100
+PAGE_WORKERS = 4
+
+# Parquet 每个 row group 的行数
+PARQUET_ROW_GROUP = 50_000
+
+# 增量导出的本地行缓存（按环境区分）
+DEFAULT_CACHE = "~/.cache/turtlealbum/export-{env}.sqlite"
 
 
 class TurtleAlbumAPI:
@@ -41,19 +75,27 @@ class TurtleAlbumAPI:
 
         self.base_url = self.ENVIRONMENTS[env]
         self.env = env
+        self.session = get_session(self.base_url)
         self.token = None
         self.login(username, password)
 
     def login(self, username: str, password: str):
-        """登录并获取 token"""
+        """登录并获取 token（同进程内复用已缓存的 token）"""
+        cached = cached_token(self.base_url, username)
+        if cached:
+            self.token = cached
+            return
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/auth/login",
                 json={"username": username, "password": password},
                 timeout=10
             )
             response.raise_for_status()
-            self.token = response.json()["access_token"]
+            self.token = extract_token(response.json())
+            if not self.token:
+                raise ValueError("Login succeeded but token missing in response")
+            store_token(self.base_url, username, self.token)
             print(f"✅ 登录成功 ({self.env})")
         except requests.exceptions.RequestException as e:
             print(f"❌ 登录失败: {e}")
@@ -65,25 +107,36 @@ class TurtleAlbumAPI:
             "Content-Type": "application/json"
         }
 
-    def get_all_products(self) -> List[Dict[str, Any]]:
-        """获取所有产品"""
+    def get_all_products(self, filters: Optional[Dict[str, Any]] = None, *,
+                         page_size: int = PAGE_SIZE, workers: int = PAGE_WORKERS) -> List[Dict[str, Any]]:
+        """获取所有产品（遍历全部分页，filters 为服务端筛选参数）"""
+        return [p for page in self.iter_product_pages(filters, page_size=page_size, workers=workers) for p in page]
+
+    def _fetch_products_page(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """请求一页 /api/products，返回完整响应体（供 iter_pages 分页使用）"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/products",
-                params={"page": 1, "page_size": 1000},
+                params=params,
                 headers=self.get_headers(),
                 timeout=10
             )
             response.raise_for_status()
-            return response.json()["products"]
+            return (response.json() if response.content else {}) or {}
         except requests.exceptions.RequestException as e:
-            print(f"❌ 获取产品失败: {e}")
+            print(f"❌ 获取产品失败 (page={params.get('page')}): {e}")
             raise
 
+    def iter_product_pages(self, filters: Optional[Dict[str, Any]] = None, *,
+                           page_size: int = PAGE_SIZE, workers: int = PAGE_WORKERS) -> Iterator[List[Dict[str, Any]]]:
+        """按页序逐页产出产品；第 1 页之后的页面 workers 个并发拉取"""
+        return iter_pages(self._fetch_products_page, params=filters, page_size=page_size, workers=workers,
+                          size_param="pageSize")
+
     def get_all_series(self) -> List[Dict[str, Any]]:
         """获取所有系列"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/series",
                 headers=self.get_headers(),
                 timeout=10
@@ -96,263 +149,435 @@ class TurtleAlbumAPI:
 
 
 class DataQualityAnalyzer:
-    """数据质量分析器"""
+    """数据质量分析器（评分规则见 turtlealbum.quality.EXPORT_PROFILE）"""
+
+    PROFILE = quality.EXPORT_PROFILE
 
     @staticmethod
     def analyze_product(product: Dict[str, Any]) -> Dict[str, Any]:
         """分析产品质量"""
-        score = 5
-        missing_fields = []
-
-        if product.get("description"):
-            score += 1
-            if len(product["description"]) >= 100:
-                score += 0.5
-        else:
-            missing_fields.append("description")
-
-        if product.get("images") and len(product["images"]) > 0:
-            score += 1
-            if len(product["images"]) >= 3:
-                score += 1
-        else:
-            missing_fields.append("images")
-
-        if product.get("dimensions"):
-            score += 1
-        else:
-            missing_fields.append("dimensions")
-
-        if product.get("series_id"):
-            score += 0.5
-        else:
-            missing_fields.append("series_id")
-
-        if product.get("cost_price") and product["cost_price"] > 0:
-            score += 0.5
-        else:
-            missing_fields.append("cost_price")
-
-        if product.get("has_sample"):
-            score += 0.25
-
-        if score >= 9:
-            level = "excellent"
-        elif score >= 7:
-            level = "good"
-        elif score >= 5:
-            level = "fair"
-        else:
-            level = "poor"
-
-        return {
-            "score": round(score, 1),
-            "level": level,
-            "missing_fields": missing_fields
-        }
+        return quality.analyze_product(product, DataQualityAnalyzer.PROFILE)
+
+
+# 导出行模型：各导出格式共用
+PRODUCT_HEADERS = [
+    "编号", "产品名称", "产品描述",
+    "出厂价格", "成本价", "库存状态", "有样品", "是否精选", "热度评分",
+    "系列编号", "系列名称",
+    "性别", "后代单价", "父本编号", "母本编号",
+    "图片数量", "主图URL",
+    "质量评分", "质量等级", "缺失字段"
+]
+IMAGE_HEADERS = ["产品编号", "产品名称", "图片类型", "图片URL", "图片描述", "排序"]
+SCORE_COLUMN = PRODUCT_HEADERS.index("质量评分")
+
+# CSV / NDJSON / Parquet 使用的英文列名（与上面的表头一一对应）及 Parquet 列类型
+PRODUCT_COLUMN_TYPES = {
+    "code": "str", "name": "str", "description": "str",
+    "price": "float", "cost_price": "float", "stock_status": "str", "has_sample": "str", "is_featured": "str",
+    "popularity_score": "float",
+    "series_id": "str", "series_name": "str",
+    "sex": "str", "offspring_unit_price": "float", "sire_code": "str", "dam_code": "str",
+    "image_count": "int", "main_image_url": "str",
+    "quality_score": "float", "quality_level": "str", "missing_fields": "str",
+}
+IMAGE_COLUMN_TYPES = {
+    "product_code": "str", "product_name": "str", "type": "str", "url": "str", "alt": "str", "sort_order": "int",
+}
+PRODUCT_COLUMNS = list(PRODUCT_COLUMN_TYPES)
+IMAGE_COLUMNS = list(IMAGE_COLUMN_TYPES)
+
+
+def product_row(product: Dict[str, Any], series_map: Dict[str, str],
+                score: float, level: str, missing: str) -> List[Any]:
+    """Products 表的一行"""
+    images = product.get("images") or []
+    main_image = next((img for img in images if img.get("type") == "main"), None)
+
+    return [
+        product.get("code", ""),
+        product.get("name", ""),
+        product.get("description", ""),
+        product.get("price", 0),
+        product.get("cost_price", 0),
+        "有货" if product.get("in_stock") else "缺货",
+        "是" if product.get("has_sample") else "否",
+        "是" if product.get("is_featured") else "否",
+        product.get("popularity_score", 0),
+        product.get("series_id", ""),
+        series_map.get(product.get("series_id"), ""),
+        product.get("sex", ""),
+        product.get("offspring_unit_price", ""),
+        product.get("sire_code", ""),
+        product.get("dam_code", ""),
+        len(images),
+        main_image.get("url") if main_image else "",
+        score,
+        level,
+        missing
+    ]
+
+
+def image_rows(product: Dict[str, Any]) -> List[List[Any]]:
+    """Images 表中该产品的所有行"""
+    return [
+        [
+            product.get("code", ""),
+            product.get("name", ""),
+            image.get("type", ""),
+            image.get("url", ""),
+            image.get("alt", ""),
+            image.get("sort_order", 0)
+        ]
+        for image in product.get("images") or []
+    ]
+
+
+def _named_styles() -> List[Any]:
+    """工作簿共享的命名样式（每个单元格只引用样式名，不再各自创建 Font/PatternFill/Alignment）"""
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    from openpyxl.styles.fonts import DEFAULT_FONT
+
+    def solid(color: str):
+        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+    center = Alignment(vertical="center")
+    header = Alignment(horizontal="center", vertical="center")
+    white_bold = Font(bold=True, color="FFFFFF")
+    return [
+        NamedStyle(name=STYLE_HEADER_PRODUCTS, font=white_bold, fill=solid("4472C4"), alignment=header),
+        NamedStyle(name=STYLE_HEADER_IMAGES, font=white_bold, fill=solid("70AD47"), alignment=header),
+        NamedStyle(name=STYLE_SCORE_HIGH, font=copy(DEFAULT_FONT), alignment=center, fill=solid("C6EFCE")),
+        NamedStyle(name=STYLE_SCORE_MID, font=copy(DEFAULT_FONT), alignment=center, fill=solid("FFEB9C")),
+        NamedStyle(name=STYLE_SCORE_LOW, font=copy(DEFAULT_FONT), alignment=center, fill=solid("FFC7CE")),
+        NamedStyle(name=STYLE_TITLE, font=Font(size=16, bold=True)),
+        NamedStyle(name=STYLE_BOLD, font=Font(bold=True)),
+    ]
+
+
+def _score_style(score: float) -> Optional[str]:
+    if score >= 9:
+        return STYLE_SCORE_HIGH
+    if score >= 7:
+        return STYLE_SCORE_MID
+    if score < 5:
+        return STYLE_SCORE_LOW
+    return None
 
 
 class ExcelExporter:
-    """Excel 导出器"""
+    """Excel 导出器
 
-    def __init__(self, filename: str):
-        self.filename = filename
-        self.workbook = openpyxl.Workbook()
-        self.workbook.remove(self.workbook.active)  # 删除默认 sheet
-
-    def create_products_sheet(self, products: List[Dict[str, Any]], series_map: Dict[str, str]):
-        """创建产品数据表"""
-        ws = self.workbook.create_sheet("Products")
-
-        # 定义列
-        headers = [
-            "编号", "产品名称", "产品描述",
-            "出厂价格", "成本价", "库存状态", "有样品", "是否精选", "热度评分",
-            "系列编号", "系列名称",
-            "性别", "后代单价", "父本编号", "母本编号",
-            "图片数量", "主图URL",
-            "质量评分", "质量等级", "缺失字段"
-        ]
+    export_products() 单遍调用 open() → add()（每个产品一次）→ finish()。
+    streaming=True 时使用 openpyxl 只写工作簿：行直接写入临时文件，不在内存中保留单元格，
+    适合边分页拉取边写入。
+    """
 
-        # 写入表头
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        # 写入数据
-        for row_idx, product in enumerate(products, 2):
-            analysis = DataQualityAnalyzer.analyze_product(product)
-            images = product.get("images") or []
-            main_image = next((img for img in images if img.get("type") == "main"), None)
-
-            series_name = series_map.get(product.get("series_id"), "")
-
-            data = [
-                product.get("code", ""),
-                product.get("name", ""),
-                product.get("description", ""),
-                product.get("price", 0),
-                product.get("cost_price", 0),
-                "有货" if product.get("in_stock") else "缺货",
-                "是" if product.get("has_sample") else "否",
-                "是" if product.get("is_featured") else "否",
-                product.get("popularity_score", 0),
-                product.get("series_id", ""),
-                series_name,
-                product.get("sex", ""),
-                product.get("offspring_unit_price", ""),
-                product.get("sire_code", ""),
-                product.get("dam_code", ""),
-                len(images),
-                main_image.get("url") if main_image else "",
-                analysis["score"],
-                analysis["level"],
-                ", ".join(analysis["missing_fields"])
-            ]
-
-            for col, value in enumerate(data, 1):
-                cell = ws.cell(row=row_idx, column=col, value=value)
-                cell.alignment = Alignment(vertical="center")
-
-                # 质量评分着色
-                if col == len(data) - 2:  # 质量评分列
-                    if analysis["score"] >= 9:
-                        cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                    elif analysis["score"] >= 7:
-                        cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                    elif analysis["score"] < 5:
-                        cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-
-        # 调整列宽
-        for col in range(1, len(headers) + 1):
-            ws.column_dimensions[get_column_letter(col)].width = 15
-
-        # 冻结首行
-        ws.freeze_panes = "A2"
+    PRODUCT_HEADERS = PRODUCT_HEADERS
+    IMAGE_HEADERS = IMAGE_HEADERS
 
-    def create_images_sheet(self, products: List[Dict[str, Any]]):
-        """创建图片数据表"""
-        ws = self.workbook.create_sheet("Images")
-
-        headers = ["产品编号", "产品名称", "图片类型", "图片URL", "图片描述", "排序"]
-
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="70AD47", end_color="70AD47", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        row_idx = 2
-        for product in products:
-            images = product.get("images") or []
-            for image in images:
-                data = [
-                    product.get("code", ""),
-                    product.get("name", ""),
-                    image.get("type", ""),
-                    image.get("url", ""),
-                    image.get("alt", ""),
-                    image.get("sort_order", 0)
-                ]
-
-                for col, value in enumerate(data, 1):
-                    cell = ws.cell(row=row_idx, column=col, value=value)
-                    cell.alignment = Alignment(vertical="center")
-
-                row_idx += 1
+    def __init__(self, filename: str, streaming: bool = False):
+        openpyxl = _require("openpyxl", "openpyxl")
+        from openpyxl.cell import WriteOnlyCell
 
+        self.filename = filename
+        self.streaming = streaming
+        self._new_cell = WriteOnlyCell
+        self.workbook = openpyxl.Workbook(write_only=streaming)
+        if not streaming:
+            self.workbook.remove(self.workbook.active)  # 删除默认 sheet
+        for style in _named_styles():
+            self.workbook.add_named_style(style)
+        self.products_ws = None
+        self.images_ws = None
+
+    def _cells(self, ws, values: List[Any], style: str) -> List[Any]:
+        cells = []
+        for value in values:
+            cell = self._new_cell(ws, value=value)
+            cell.style = style
+            cells.append(cell)
+        return cells
+
+    def _open_sheet(self, title: str, headers: List[str], header_style: str, width: int):
+        from openpyxl.utils import get_column_letter
+
+        ws = self.workbook.create_sheet(title)
+        # 只写模式下列宽和冻结窗格必须在写入第一行之前设置
         for col in range(1, len(headers) + 1):
-            ws.column_dimensions[get_column_letter(col)].width = 20
-
+            ws.column_dimensions[get_column_letter(col)].width = width
         ws.freeze_panes = "A2"
-
-    def create_quality_report_sheet(self, products: List[Dict[str, Any]]):
-        """创建质量报告表"""
+        ws.append(self._cells(ws, headers, header_style))
+        return ws
+
+    def open(self):
+        """创建 Products / Images 表并写入表头"""
+        self.products_ws = self._open_sheet("Products", self.PRODUCT_HEADERS, STYLE_HEADER_PRODUCTS, 15)
+        self.images_ws = self._open_sheet("Images", self.IMAGE_HEADERS, STYLE_HEADER_IMAGES, 20)
+
+    def add(self, row: List[Any], images: List[List[Any]]):
+        """写入一个产品：Products 表一行，Images 表若干行"""
+        # 质量评分着色（只有这一列带样式，其余单元格直接写值）
+        style = _score_style(row[SCORE_COLUMN])
+        if style:
+            row[SCORE_COLUMN] = self._cells(self.products_ws, [row[SCORE_COLUMN]], style)[0]
+        self.products_ws.append(row)
+        for image in images:
+            self.images_ws.append(image)
+
+    def finish(self, report: Dict[str, Any]):
+        """写入质量报告表（QualityReport.to_dict() 的汇总结果）"""
         ws = self.workbook.create_sheet("Quality Report")
+        ws.column_dimensions["A"].width = 25
+        ws.column_dimensions["B"].width = 15
+        ws.column_dimensions["C"].width = 15
 
-        # 分析所有产品
-        scores = []
-        distribution = {"excellent": 0, "good": 0, "fair": 0, "poor": 0}
-        missing_fields_count = {}
-
-        for product in products:
-            analysis = DataQualityAnalyzer.analyze_product(product)
-            scores.append(analysis["score"])
-            distribution[analysis["level"]] += 1
-
-            for field in analysis["missing_fields"]:
-                missing_fields_count[field] = missing_fields_count.get(field, 0) + 1
-
-        total = len(products)
-        avg_score = sum(scores) / len(scores) if scores else 0
+        distribution = report["distribution"]
+        total = report["total_products"]
+        avg_score = report["average_score"]
 
-        # 写入报告
-        row = 1
+        def bold(*values):
+            ws.append(self._cells(ws, list(values), STYLE_BOLD))
 
         # 标题
-        ws.cell(row=row, column=1, value="数据质量报告").font = Font(size=16, bold=True)
-        row += 2
+        ws.append(self._cells(ws, ["数据质量报告"], STYLE_TITLE))
+        ws.append([])
 
         # 总体统计
-        ws.cell(row=row, column=1, value="总体统计").font = Font(bold=True)
-        row += 1
-        ws.cell(row=row, column=1, value="总产品数:")
-        ws.cell(row=row, column=2, value=total)
-        row += 1
-        ws.cell(row=row, column=1, value="平均评分:")
-        ws.cell(row=row, column=2, value=f"{avg_score:.2f}/10")
-        row += 2
+        bold("总体统计")
+        ws.append(["总产品数:", total])
+        ws.append(["平均评分:", f"{avg_score:.2f}/10"])
+        ws.append([])
 
         # 质量分布
-        ws.cell(row=row, column=1, value="质量分布").font = Font(bold=True)
-        row += 1
+        bold("质量分布")
         for level, label in [("excellent", "优秀 (9-10分)"), ("good", "良好 (7-9分)"),
                               ("fair", "一般 (5-7分)"), ("poor", "较差 (0-5分)")]:
             count = distribution[level]
             percentage = (count / total * 100) if total > 0 else 0
-            ws.cell(row=row, column=1, value=label)
-            ws.cell(row=row, column=2, value=count)
-            ws.cell(row=row, column=3, value=f"{percentage:.1f}%")
-            row += 1
-
-        row += 1
+            ws.append([label, count, f"{percentage:.1f}%"])
+        ws.append([])
 
         # 最常缺失的字段
-        ws.cell(row=row, column=1, value="最常缺失的字段").font = Font(bold=True)
-        row += 1
-        ws.cell(row=row, column=1, value="字段名").font = Font(bold=True)
-        ws.cell(row=row, column=2, value="缺失数量").font = Font(bold=True)
-        ws.cell(row=row, column=3, value="缺失比例").font = Font(bold=True)
-        row += 1
-
-        sorted_missing = sorted(missing_fields_count.items(), key=lambda x: x[1], reverse=True)
-        for field, count in sorted_missing[:15]:
+        bold("最常缺失的字段")
+        bold("字段名", "缺失数量", "缺失比例")
+        for field, count in report["top_missing_fields"][:15]:
             percentage = (count / total * 100) if total > 0 else 0
-            ws.cell(row=row, column=1, value=field)
-            ws.cell(row=row, column=2, value=count)
-            ws.cell(row=row, column=3, value=f"{percentage:.1f}%")
-            row += 1
-
-        # 调整列宽
-        ws.column_dimensions["A"].width = 25
-        ws.column_dimensions["B"].width = 15
-        ws.column_dimensions["C"].width = 15
+            ws.append([field, count, f"{percentage:.1f}%"])
 
     def save(self):
         """保存文件"""
         self.workbook.save(self.filename)
         print(f"✅ 文件已保存: {self.filename}")
 
+    def discard(self):
+        """放弃未保存的工作簿（只写模式需关闭各表的临时文件）"""
+        if self.streaming:
+            for ws in self.workbook.worksheets:
+                ws.close()
 
-def filter_products(products: List[Dict[str, Any]], args) -> List[Dict[str, Any]]:
-    """根据参数筛选产品"""
+
+class TableExporter(abc.ABC):
+    """机器可读导出的公共部分：每张表一个文件，质量报告写成 JSON。
+
+    output 去掉扩展名后作为前缀：<prefix>.products.<ext>、<prefix>.images.<ext>、<prefix>.quality.json。
+    行按到达顺序直接写入文件（export_products 单遍调用 open() → add() → finish()）。
+    """
+
+    EXTENSION = ""
+
+    def __init__(self, filename: str):
+        self.prefix = str(Path(filename).with_suffix(""))
+        self.paths = {
+            "products": f"{self.prefix}.products.{self.EXTENSION}",
+            "images": f"{self.prefix}.images.{self.EXTENSION}",
+            "quality": f"{self.prefix}.quality.json",
+        }
+
+    def open(self):
+        Path(self.prefix).parent.mkdir(parents=True, exist_ok=True)
+        self._open_table("products", PRODUCT_COLUMNS)
+        self._open_table("images", IMAGE_COLUMNS)
+
+    def add(self, row: List[Any], images: List[List[Any]]):
+        self._write("products", row)
+        for image in images:
+            self._write("images", image)
+
+    def finish(self, report: Dict[str, Any]):
+        """质量报告只保留汇总（逐个产品的评分已在 products 表中）"""
+        summary = {k: v for k, v in report.items() if k != "products_by_quality"}
+        with open(self.paths["quality"], "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    def save(self):
+        self._close()
+        for path in self.paths.values():
+            print(f"✅ 文件已保存: {path}")
+
+    def discard(self):
+        self._close()
+        for path in self.paths.values():
+            Path(path).unlink(missing_ok=True)
+
+    @abc.abstractmethod
+    def _open_table(self, table: str, columns: List[str]):
+        ...
+
+    @abc.abstractmethod
+    def _write(self, table: str, row: List[Any]):
+        ...
+
+    @abc.abstractmethod
+    def _close(self):
+        ...
+
+
+class CsvExporter(TableExporter):
+    """CSV（UTF-8 带 BOM，Excel 直接打开不乱码）"""
+
+    EXTENSION = "csv"
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self.files: Dict[str, Any] = {}
+        self.writers: Dict[str, Any] = {}
+
+    def _open_table(self, table: str, columns: List[str]):
+        f = open(self.paths[table], "w", encoding="utf-8-sig", newline="")
+        self.files[table] = f
+        self.writers[table] = csv.writer(f)
+        self.writers[table].writerow(columns)
+
+    def _write(self, table: str, row: List[Any]):
+        self.writers[table].writerow(row)
+
+    def _close(self):
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+
+
+class NdjsonExporter(TableExporter):
+    """NDJSON：每行一个 JSON 对象，键为英文列名"""
+
+    EXTENSION = "ndjson"
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self.files: Dict[str, Any] = {}
+        self.columns: Dict[str, List[str]] = {}
+
+    def _open_table(self, table: str, columns: List[str]):
+        self.files[table] = open(self.paths[table], "w", encoding="utf-8")
+        self.columns[table] = columns
+
+    def _write(self, table: str, row: List[Any]):
+        line = json.dumps(dict(zip(self.columns[table], row)), ensure_ascii=False, separators=(",", ":"))
+        self.files[table].write(line + "\n")
+
+    def _close(self):
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+
+
+class ParquetExporter(TableExporter):
+    """Parquet（需要 pyarrow）：按列缓冲，每 PARQUET_ROW_GROUP 行写一个 row group"""
+
+    EXTENSION = "parquet"
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self.pa = _require("pyarrow", "pyarrow")
+        self.pq = _require("pyarrow.parquet", "pyarrow")
+        self.writers: Dict[str, Any] = {}
+        self.schemas: Dict[str, Any] = {}
+        self.buffers: Dict[str, List[List[Any]]] = {}
+
+    def _open_table(self, table: str, columns: List[str]):
+        kinds = PRODUCT_COLUMN_TYPES if table == "products" else IMAGE_COLUMN_TYPES
+        types = {"str": self.pa.string(), "float": self.pa.float64(), "int": self.pa.int64()}
+        self.schemas[table] = self.pa.schema([(c, types[kinds[c]]) for c in columns])
+        self.writers[table] = self.pq.ParquetWriter(self.paths[table], self.schemas[table])
+        self.buffers[table] = [[] for _ in columns]
+
+    def _write(self, table: str, row: List[Any]):
+        buffer = self.buffers[table]
+        for column, value in zip(buffer, row):
+            column.append(value)
+        if len(buffer[0]) >= PARQUET_ROW_GROUP:
+            self._flush(table)
+
+    def _flush(self, table: str):
+        buffer = self.buffers[table]
+        if not buffer[0]:
+            return
+        schema = self.schemas[table]
+        arrays = [
+            self.pa.array([_coerce(v, field.type) for v in values], type=field.type)
+            for field, values in zip(schema, buffer)
+        ]
+        self.writers[table].write_table(self.pa.Table.from_arrays(arrays, schema=schema))
+        self.buffers[table] = [[] for _ in buffer]
+
+    def _close(self):
+        for table, writer in self.writers.items():
+            self._flush(table)
+            writer.close()
+        self.writers.clear()
+
+
+def _coerce(value: Any, arrow_type: Any) -> Any:
+    """把行模型中的值转成列类型；空字符串 / 无法解析的数字记为 null"""
+    if value is None or value == "":
+        return None
+    if str(arrow_type) == "string":
+        return value if isinstance(value, str) else str(value)
+    try:
+        return int(value) if str(arrow_type) == "int64" else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+EXPORTERS = {
+    "xlsx": ExcelExporter,
+    "csv": CsvExporter,
+    "ndjson": NdjsonExporter,
+    "parquet": ParquetExporter,
+}
+
+
+def resolve_series_id(series: str, series_list: List[Dict[str, Any]]) -> Optional[str]:
+    """--series 可以是系列 id / 编号 / 名称，返回对应的系列 id（找不到为 None）"""
+    for s in series_list:
+        if series in (s.get("id"), s.get("code"), s.get("name")):
+            return s.get("id")
+    return None
+
+
+def server_filters(args) -> Dict[str, Any]:
+    """可下推到 /api/products 的筛选参数（listProductsQuerySchema 中的 seriesId / type）。
+
+    _field_filters 总是在客户端再筛一遍，服务端忽略这些参数时结果照样正确；
+    库存状态没有对应的查询参数，--missing-field 和质量评分依赖评分，都只在客户端判断。
+    """
+    params: Dict[str, Any] = {}
+    if getattr(args, "series_id", None):
+        params["seriesId"] = args.series_id
+    if args.product_type:
+        params["type"] = args.product_type
+    return params
+
+
+def _field_filters(products: List[Dict[str, Any]], args) -> List[Dict[str, Any]]:
+    """按系列 / 产品类型 / 库存状态筛选（不需要质量评分的条件）"""
     filtered = products
 
-    # 按系列筛选
+    # 按系列筛选（args.series_id 为解析出的系列 id，服务端按它筛选后这里照样保留）
     if args.series:
-        filtered = [p for p in filtered if p.get("series_id") == args.series or
+        series_ids = {args.series, getattr(args, "series_id", None)} - {None}
+        filtered = [p for p in filtered if p.get("series_id") in series_ids or
                     any(s.get("code") == args.series or s.get("name") == args.series
                         for s in [p.get("series")] if s)]
 
@@ -364,81 +589,263 @@ def filter_products(products: List[Dict[str, Any]], args) -> List[Dict[str, Any]
     if args.in_stock is not None:
         filtered = [p for p in filtered if p.get("in_stock") == args.in_stock]
 
-    # 按质量评分筛选
-    if args.quality_min is not None or args.quality_max is not None:
-        def check_quality(p):
-            analysis = DataQualityAnalyzer.analyze_product(p)
-            score = analysis["score"]
-            if args.quality_min is not None and score < args.quality_min:
-                return False
-            if args.quality_max is not None and score > args.quality_max:
-                return False
-            return True
+    return filtered
+
+
+def _quality_filter(args) -> Optional[Callable[[float, int], bool]]:
+    """--quality-min / --quality-max / --missing-field 对应的 (评分, 缺失字段掩码) 判断；未指定时为 None"""
+    if args.quality_min is None and args.quality_max is None and not args.missing_field:
+        return None
+    fields = [r.field for r in DataQualityAnalyzer.PROFILE.missing_rules]
+    # 评分规则之外的字段永远不会被记为缺失
+    missing_bit = 1 << fields.index(args.missing_field) if args.missing_field in fields else 0
+
+    def keep(score: float, mask: int) -> bool:
+        if args.quality_min is not None and score < args.quality_min:
+            return False
+        if args.quality_max is not None and score > args.quality_max:
+            return False
+        if args.missing_field and not mask & missing_bit:
+            return False
+        return True
 
-        filtered = [p for p in filtered if check_quality(p)]
+    return keep
 
-    # 按缺失字段筛选
-    if args.missing_field:
-        def has_missing_field(p):
-            analysis = DataQualityAnalyzer.analyze_product(p)
-            return args.missing_field in analysis["missing_fields"]
 
-        filtered = [p for p in filtered if has_missing_field(p)]
+def _select(products: List[Dict[str, Any]], batch: quality.BatchScores,
+            keep: Callable[[float, int], bool]) -> Tuple[List[Dict[str, Any]], quality.BatchScores]:
+    """按质量条件保留产品及其评分"""
+    idx = [i for i, (score, mask) in enumerate(zip(batch.scores, batch.missing)) if keep(score, mask)]
+    return (
+        [products[i] for i in idx],
+        quality.BatchScores([batch.scores[i] for i in idx], [batch.levels[i] for i in idx],
+                            [batch.missing[i] for i in idx]),
+    )
 
+
+def filter_products(products: List[Dict[str, Any]], args) -> List[Dict[str, Any]]:
+    """根据参数筛选产品"""
+    filtered = _field_filters(products, args)
+    keep = _quality_filter(args)
+    if keep is not None and filtered:
+        filtered, _ = _select(filtered, quality.score_batch(filtered, DataQualityAnalyzer.PROFILE), keep)
     return filtered
 
 
+def export_products(exporter, chunks: Iterable[List[Dict[str, Any]]], series_map: Dict[str, str], args) -> int:
+    """单遍导出：每个产品只筛选、评分一次，产品行和图片行同时交给各表，质量报告边写边累计。
+
+    chunks 可以是完整列表 [products]，也可以是逐页拉取的迭代器。返回导出的产品数（0 时未写报告）。
+    """
+    profile = DataQualityAnalyzer.PROFILE
+    keep = _quality_filter(args)
+    report = quality.QualityReport(profile)
+    missing_names: Dict[int, str] = {}
+    exported = 0
+
+    exporter.open()
+    for chunk in chunks:
+        products = _field_filters(chunk, args)
+        if not products:
+            continue
+        batch = quality.score_batch(products, profile)
+        if keep is not None:
+            products, batch = _select(products, batch, keep)
+        for product, score, level, mask in zip(products, batch.scores, batch.levels, batch.missing):
+            if mask not in missing_names:
+                missing_names[mask] = ", ".join(quality.missing_fields(mask, profile))
+            row = product_row(product, series_map, score, quality.LEVELS[level], missing_names[mask])
+            exporter.add(row, image_rows(product))
+        report.update(products, batch=batch)
+        exported += len(products)
+
+    if exported:
+        exporter.finish(report.to_dict())
+    return exported
+
+
+def _with_progress(pages: Iterable[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+    fetched = 0
+    for page in pages:
+        fetched += len(page)
+        print(f"\r⏳ 已拉取 {fetched} 个产品", end="", flush=True)
+        yield page
+    print()
+
+
+def sync_cache(api: TurtleAlbumAPI, store: ProductStore, *, full: bool = False, page_size: int = PAGE_SIZE,
+               workers: int = PAGE_WORKERS) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]:
+    """刷新增量导出的本地行缓存，返回 (变更产品的 (编号, id), 已删除的产品)。
+
+    缓存里每个产品的 updated_at 就是上次导出的清单。有水位线时按 updatedAt 倒序（sortBy=updatedAt&sortDir=desc）
+    逐页拉取，翻到早于水位线的产品就停，与清单比对后只写入真正变化的行；后端未按 updatedAt 排序时
+    改为并发扫描全部分页（同样只写入变化的行）。扫完整个目录时（首次、--full 或未排序）顺带清理已删除的产品。
+    """
+    watermark = None if full or not store.count_products() else parse_timestamp(store.get_meta("watermark"))
+    stamps = store.product_stamps()
+    changed: List[Tuple[str, str]] = []
+    seen = set()
+
+    def absorb(page: List[Dict[str, Any]]) -> None:
+        fresh = []
+        for p in page:
+            pid = str(p.get("id") or "")
+            stamp = updated_at(p)
+            seen.add(pid)
+            # 没有 updated_at 的产品无法判断是否变化，总是重写
+            if pid and (stamp is None or stamps.get(pid) != stamp):
+                fresh.append(p)
+                stamps[pid] = stamp
+        changed.extend((str(p.get("code") or ""), str(p["id"])) for p in fresh)
+        store.upsert_products(fresh)
+
+    complete = True
+    if watermark:
+        prev: Optional[datetime] = None
+        sort = {"sortBy": "updatedAt", "sortDir": "desc"}
+        for page in _with_progress(api.iter_product_pages(sort, page_size=page_size, workers=1)):
+            if not is_newest_first(page, prev):
+                print("\n⚠️ 后端未按 updatedAt 倒序返回，改为并发扫描全部分页")
+                watermark = None
+                break
+            absorb(page)
+            prev = next((ts for ts in map(updated_time, reversed(page)) if ts), prev)
+            if prev is not None and prev < watermark:
+                complete = False
+                break
+    if not watermark:
+        for page in _with_progress(api.iter_product_pages(page_size=page_size, workers=workers)):
+            absorb(page)
+
+    deleted: List[Dict[str, Any]] = []
+    if complete:
+        gone = [pid for pid in stamps if pid not in seen]
+        deleted = store.get_products(gone)
+        store.prune_products(seen)
+    store.set_meta(watermark=store.max_updated_at(), synced_at=datetime.now().isoformat(timespec="seconds"),
+                   base_url=api.base_url)
+    return changed, deleted
+
+
+def _delta_pages(store: ProductStore, changed: List[Tuple[str, str]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """变更的产品按编号排序，逐页从缓存读取"""
+    keys = sorted(changed)
+    for i in range(0, len(keys), size):
+        page = store.get_products([pid for _, pid in keys[i : i + size]])
+        yield sorted(page, key=lambda p: (str(p.get("code") or ""), str(p.get("id"))))
+
+
 def main():
     parser = argparse.ArgumentParser(description="TurtleAlbum Excel 导出工具")
     parser.add_argument("--env", choices=["dev", "staging", "prod"], default="dev",
                         help="环境")
     parser.add_argument("--username", default="admin", help="用户名")
     parser.add_argument("--password", required=True, help="密码")
-    parser.add_argument("--output", default=f"turtle_album_products_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        help="输出文件名")
+    parser.add_argument("--output", help="输出文件名 (默认: turtle_album_products_<日期>.<格式>)")
+    parser.add_argument("--format", choices=list(EXPORTERS), default="xlsx",
+                        help="导出格式：xlsx 带样式的工作簿；csv / ndjson / parquet 为每张表一个文件，"
+                             "分页流式写入，便于 pandas / duckdb 读取 (默认: xlsx)")
 
     # 筛选选项
     parser.add_argument("--series", help="按系列筛选")
     parser.add_argument("--product-type", choices=["tube", "box", "turtle"], help="按产品类型筛选")
-    parser.add_argument("--in-stock", type=bool, help="按库存状态筛选")
+    parser.add_argument("--in-stock", choices=["true", "false"], help="按库存状态筛选 (true/false)")
     parser.add_argument("--quality-min", type=float, help="最低质量评分")
     parser.add_argument("--quality-max", type=float, help="最高质量评分")
     parser.add_argument("--missing-field", help="筛选缺失指定字段的产品")
 
+    # 流式导出
+    parser.add_argument("--stream", action="store_true",
+                        help="分页拉取并逐页写入只写工作簿（内存占用恒定，适合数万产品）")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help=f"分页拉取每页产品数，1-{PAGE_SIZE} (默认: {PAGE_SIZE})")
+    parser.add_argument("--workers", type=int, default=PAGE_WORKERS,
+                        help=f"第 1 页之后并发拉取的页数，1 为顺序拉取 (默认: {PAGE_WORKERS})")
+
+    # 增量导出
+    parser.add_argument("--incremental", action="store_true",
+                        help="增量导出：只拉取上次导出后变更的产品，其余行从本地缓存读取")
+    parser.add_argument("--delta", action="store_true",
+                        help="--incremental 时只导出本次变更的产品（差异工作簿）")
+    parser.add_argument("--full", action="store_true",
+                        help="--incremental 时全量刷新缓存并清理已删除的产品")
+    parser.add_argument("--cache", default=None,
+                        help=f"增量导出的本地缓存 sqlite 路径 (默认: {DEFAULT_CACHE})")
+
     args = parser.parse_args()
+    if not 1 <= args.page_size <= PAGE_SIZE:
+        parser.error(f"--page-size 需在 1-{PAGE_SIZE} 之间")
+    args.in_stock = None if args.in_stock is None else args.in_stock == "true"
+    if not args.output:
+        args.output = f"turtle_album_products_{datetime.now().strftime('%Y%m%d')}.{args.format}"
+
+    if (args.delta or args.full) and not args.incremental:
+        parser.error("--delta / --full 需要配合 --incremental 使用")
+
+    # 机器可读格式和增量导出总是分页流式写入
+    streaming = args.stream or args.format != "xlsx" or args.incremental
+    if args.format == "xlsx":
+        exporter = ExcelExporter(args.output, streaming=streaming)
+    else:
+        exporter = EXPORTERS[args.format](args.output)
 
     # 初始化 API
     api = TurtleAlbumAPI(args.env, args.username, args.password)
 
-    # 获取数据
-    print("⏳ 正在获取产品数据...")
-    products = api.get_all_products()
-    print(f"✅ 获取到 {len(products)} 个产品")
-
     print("⏳ 正在获取系列数据...")
     series_list = api.get_all_series()
     series_map = {s["id"]: s["name"] for s in series_list}
     print(f"✅ 获取到 {len(series_list)} 个系列")
 
-    # 筛选产品
-    filtered_products = filter_products(products, args)
-    print(f"✅ 筛选后: {len(filtered_products)} 个产品")
-
-    if not filtered_products:
+    # 能由服务端处理的筛选条件直接带到请求参数里，只拉取需要的产品
+    args.series_id = resolve_series_id(args.series, series_list) if args.series else None
+    filters = server_filters(args)
+    paging = {"page_size": args.page_size, "workers": max(1, args.workers)}
+
+    store = None
+    if args.incremental:
+        # 缓存保存完整目录，筛选条件只在客户端生效
+        cache_path = Path(args.cache or DEFAULT_CACHE.format(env=args.env)).expanduser()
+        # 导出缓存只按 id/编号读取，不建全文索引
+        store = ProductStore(cache_path, search_index=False)
+        if store.get_meta("base_url") not in (None, api.base_url):
+            args.full = True
+        print(f"⏳ 正在拉取变更的产品 (缓存: {cache_path}，上次同步: {store.get_meta('synced_at') or '无'})...")
+        changed, deleted = sync_cache(api, store, full=args.full, **paging)
+        print(f"✅ 变更 {len(changed)} 个产品，删除 {len(deleted)} 个产品，缓存共 {store.count_products()} 个")
+        if deleted:
+            print("已删除: " + ", ".join(str(p.get("code") or p.get("id")) for p in deleted[:20]) +
+                  (" ..." if len(deleted) > 20 else ""))
+        # 按编号顺序逐页读取缓存（图片也按页加载），内存占用与目录大小无关
+        chunks = _delta_pages(store, changed, PAGE_SIZE) if args.delta else store.iter_product_pages()
+    elif streaming:
+        print(f"⏳ 正在分页拉取并流式写入 ({args.format})...")
+        chunks = _with_progress(api.iter_product_pages(filters, **paging))
+    else:
+        # 获取数据
+        print("⏳ 正在获取产品数据...")
+        products = api.get_all_products(filters, **paging)
+        print(f"✅ 获取到 {len(products)} 个产品")
+        print(f"⏳ 正在生成 Excel 文件...")
+        chunks = [products]
+
+    # 筛选并导出（单遍）
+    exported = export_products(exporter, chunks, series_map, args)
+    print(f"✅ 筛选后: {exported} 个产品")
+    if store is not None:
+        store.close()
+
+    if not exported:
+        exporter.discard()
         print("⚠️ 没有符合条件的产品")
         return
 
-    # 导出到 Excel
-    print(f"⏳ 正在生成 Excel 文件...")
-    exporter = ExcelExporter(args.output)
-    exporter.create_products_sheet(filtered_products, series_map)
-    exporter.create_images_sheet(filtered_products)
-    exporter.create_quality_report_sheet(filtered_products)
     exporter.save()
 
     print(f"\n📊 导出完成!")
-    print(f"文件: {args.output}")
-    print(f"产品数: {len(filtered_products)}")
+    if args.format == "xlsx":
+        print(f"文件: {args.output}")
+    print(f"产品数: {exported}")
 
 
 if __name__ == "__main__":
@@ -23,7 +23,7 @@ import sys
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
-import requests
+from turtlealbum import ApiClient, TurtleAlbumError
 
 
 ENV_URLS = {
@@ -54,10 +54,8 @@ ALLOWED_PRODUCT_KEYS = {
     "images",
 }
 
-DEFAULT_TIMEOUT = 20
 
-
-class UploadError(RuntimeError):
+class UploadError(TurtleAlbumError):
     """Domain error for uploader flow."""
 
 
@@ -70,66 +68,14 @@ class UploadResult:
     dam_code: Optional[str]
 
 
-class TurtleAlbumClient:
-    def __init__(self, base_url: str, username: str, password: str):
-        self.base_url = base_url.rstrip("/")
-        self.token = self._login(username=username, password=password)
-
-    def _login(self, username: str, password: str) -> str:
-        body = self._request(
-            "POST",
-            "/api/auth/login",
-            json_body={"username": username, "password": password},
-            auth=False,
-        )
-        token = ((body or {}).get("data") or {}).get("token")
-        if not token:
-            raise UploadError("Login succeeded but token is missing in /api/auth/login response")
-        return token
-
-    def _request(
-        self,
-        method: str,
-        path: str,
-        *,
-        params: Optional[Dict[str, Any]] = None,
-        json_body: Optional[Dict[str, Any]] = None,
-        auth: bool = True,
-    ) -> Dict[str, Any]:
-        headers: Dict[str, str] = {"Content-Type": "application/json"}
-        if auth:
-            headers["Authorization"] = f"Bearer {self.token}"
-
-        url = f"{self.base_url}{path}"
-        try:
-            resp = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                params=params,
-                json=json_body,
-                timeout=DEFAULT_TIMEOUT,
-            )
-        except requests.RequestException as exc:
-            raise UploadError(f"Request failed: {method} {url} -> {exc}") from exc
+class TurtleAlbumClient(ApiClient):
+    error_cls = UploadError
 
-        body: Dict[str, Any]
-        try:
-            body = resp.json()
-        except ValueError:
-            body = {"message": resp.text}
-
-        if resp.status_code >= 400:
-            detail = body.get("message") or body.get("detail") or resp.text
-            raise UploadError(f"HTTP {resp.status_code}: {detail}")
-
-        if isinstance(body, dict) and body.get("success") is False:
-            raise UploadError(f"API reported failure: {body.get('message') or body}")
-
-        return body
+    def __init__(self, base_url: str, username: str, password: str):
+        super().__init__(base_url, username=username, password=password)
 
     def list_products_by_search(self, search: str) -> List[Dict[str, Any]]:
-        body = self._request(
+        body = self.request(
             "GET",
             "/api/products",
             params={"search": search, "page": 1, "limit": 1000},
@@ -139,15 +85,15 @@ class TurtleAlbumClient:
         return data.get("products") or []
 
     def get_product(self, product_id: str) -> Dict[str, Any]:
-        body = self._request("GET", f"/api/products/{product_id}", auth=False)
+        body = self.request("GET", f"/api/products/{product_id}", auth=False)
         return body.get("data") or {}
 
     def create_product(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        body = self._request("POST", "/api/products", json_body=payload, auth=True)
+        body = self.request("POST", "/api/products", json_body=payload, auth=True)
         return body.get("data") or {}
 
     def update_product(self, product_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        body = self._request("PUT", f"/api/products/{product_id}", json_body=payload, auth=True)
+        body = self.request("PUT", f"/api/products/{product_id}", json_body=payload, auth=True)
         return body.get("data") or {}
 
 
@@ -7,16 +7,44 @@ TurtleAlbum Production Data Query Script
 Usage:
     python3 scripts/query_production.py --env prod --action list
     python3 scripts/query_production.py --env prod --action search --code CBF
+    python3 scripts/query_production.py --env prod --action search --text 黄化 --fuzzy
     python3 scripts/query_production.py --env prod --action quality-report
+    python3 scripts/query_production.py --env prod --action quality-report --workers 8 --page-size 200
+    python3 scripts/query_production.py --env prod --action sync            # 增量同步到本地快照
+    python3 scripts/query_production.py --env prod --action sync --full     # 全量同步（清理已删除产品）
+    python3 scripts/query_production.py --env prod --action quality-report --live
+
+list / search / quality-report 会遍历全部分页：先取第 1 页拿到 totalPages，
+其余页按 --workers 并发拉取，按页序流式交给 DataQualityAnalyzer。
+
+本地快照：--action sync 把产品/图片/系列写入 sqlite（--store，默认按环境放在
+~/.cache/turtlealbum/ 下）。首次或 --full 为全量；之后按 updatedAt 倒序拉取，
+遇到早于上次水位线 (watermark) 的产品即停止。快照存在时 list/search/detail/
+quality-report/series 直接读本地（无需登录），--live 强制走 API。增量同步看不到
+删除，定期 --full 即可。
+
+快照上的 search 走 FTS5 三元组 (trigram) 索引：--code/--name/--text 都是不区分大小写的
+子串匹配（中文同样适用），编号前缀命中排在前面；--fuzzy 按共享三元组打分，容忍错字。
 """
 
 import requests
 import json
 import os
 import argparse
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Set
 from datetime import datetime
 
+from turtlealbum import ProductStore, cached_token, extract_token, get_session, iter_items, iter_pages, store_token
+from turtlealbum import quality
+from turtlealbum.store import is_newest_first, parse_timestamp, updated_time
+
+PAGE_SIZE = 100
+PAGE_WORKERS = 4
+
+DEFAULT_STORE = "~/.cache/turtlealbum/products-{env}.sqlite"
+SYNC_CHUNK = 500
+QUALITY_BATCH = 5000
+
 
 class TurtleAlbumAPI:
     """TurtleAlbum API 客户端"""
@@ -41,22 +69,28 @@ class TurtleAlbumAPI:
 
         self.base_url = self.ENVIRONMENTS[env]
         self.env = env
+        self.session = get_session(self.base_url)
         self.token = None
         self.login(username, password)
 
     def login(self, username: str, password: str):
-        """登录并获取 token"""
+        """登录并获取 token（同进程内复用已缓存的 token）"""
+        cached = cached_token(self.base_url, username)
+        if cached:
+            self.token = cached
+            return
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/auth/login",
                 json={"username": username, "password": password},
                 timeout=10
             )
             response.raise_for_status()
             body = response.json() if response.content else {}
-            token = ((body or {}).get("data") or {}).get("token")
+            token = extract_token(body)
             if not token:
                 raise ValueError("Login succeeded but token missing in response")
+            store_token(self.base_url, username, token)
             self.token = token
             print(f"✅ 登录成功 ({self.env})")
         except requests.exceptions.RequestException as e:
@@ -70,29 +104,53 @@ class TurtleAlbumAPI:
             "Content-Type": "application/json"
         }
 
-    def get_all_products(self, page: int = 1, limit: int = 100, search: Optional[str] = None) -> Dict[str, Any]:
-        """获取产品列表（支持 search）"""
+    def _fetch_products_page(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """请求一页 /api/products，返回完整响应体（供 iter_items 分页使用）"""
         try:
-            params: Dict[str, Any] = {"page": page, "limit": limit}
-            if search:
-                params["search"] = search
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/products",
                 params=params,
                 headers=self.get_headers(),
                 timeout=10,
             )
             response.raise_for_status()
-            body = response.json() if response.content else {}
-            return (body or {}).get("data") or {}
+            return (response.json() if response.content else {}) or {}
         except requests.exceptions.RequestException as e:
-            print(f"❌ 获取产品列表失败: {e}")
+            print(f"❌ 获取产品列表失败 (page={params.get('page')}): {e}")
             raise
 
+    def iter_products(
+        self,
+        search: Optional[str] = None,
+        *,
+        page_size: int = PAGE_SIZE,
+        workers: int = PAGE_WORKERS,
+        limit: int = 0,
+    ) -> Iterator[Dict[str, Any]]:
+        """遍历全部产品（所有分页）；第 1 页之后的页面并发拉取，按页序逐个产出。limit 0 = 全部"""
+        params: Dict[str, Any] = {"search": search} if search else {}
+        return iter_items(
+            self._fetch_products_page,
+            params=params,
+            page_size=page_size,
+            limit=limit,
+            workers=workers,
+            size_param="pageSize",
+        )
+
+    def iter_recent_product_pages(self, *, page_size: int = PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """按 updatedAt 倒序逐页产出产品（顺序拉取，调用方可随时停止）"""
+        return iter_pages(
+            self._fetch_products_page,
+            params={"sortBy": "updatedAt", "sortDir": "desc"},
+            page_size=page_size,
+            size_param="pageSize",
+        )
+
     def get_product(self, product_id: str) -> Dict[str, Any]:
         """获取单个产品"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/products/{product_id}",
                 headers=self.get_headers(),
                 timeout=10,
@@ -107,7 +165,7 @@ class TurtleAlbumAPI:
     def get_all_series(self) -> Dict[str, Any]:
         """获取所有系列"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/series",
                 headers=self.get_headers(),
                 timeout=10,
@@ -122,7 +180,7 @@ class TurtleAlbumAPI:
     def get_filter_options(self) -> Dict[str, Any]:
         """获取筛选选项"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/api/products/filter-options",
                 headers=self.get_headers(),
                 timeout=10
@@ -133,18 +191,22 @@ class TurtleAlbumAPI:
             print(f"❌ 获取筛选选项失败: {e}")
             raise
 
-    def search_products(self, code: Optional[str] = None, name: Optional[str] = None) -> List[Dict[str, Any]]:
-        """搜索产品（走后端 search 参数）"""
+    def search_products(
+        self,
+        code: Optional[str] = None,
+        name: Optional[str] = None,
+        *,
+        page_size: int = PAGE_SIZE,
+        workers: int = PAGE_WORKERS,
+    ) -> List[Dict[str, Any]]:
+        """搜索产品（走后端 search 参数，遍历全部分页）"""
         q = (code or name or "").strip()
         if not q:
             return []
 
-        data = self.get_all_products(page=1, limit=1000, search=q)
-        products = data.get("products") or []
-
         # Keep behavior: allow substring match on code/name.
         results: List[Dict[str, Any]] = []
-        for product in products:
+        for product in self.iter_products(q, page_size=page_size, workers=workers):
             p_code = str(product.get("code") or "")
             p_name = str(product.get("name") or "")
             if code and code.lower() in p_code.lower():
@@ -156,13 +218,15 @@ class TurtleAlbumAPI:
 
 
 class DataQualityAnalyzer:
-    """数据质量分析器"""
+    """数据质量分析器（评分规则见 turtlealbum.quality.LISTING_PROFILE）"""
 
     # 重要字段定义（按当前 API 返回字段，主要用于报告展示）
     CRITICAL_FIELDS = ["code"]
     IMPORTANT_FIELDS = ["description", "seriesId", "images"]
     OPTIONAL_FIELDS = ["pricing.price", "pricing.costPrice", "pricing.hasSample", "inStock", "isFeatured"]
 
+    PROFILE = quality.LISTING_PROFILE
+
     @staticmethod
     def analyze_product(product: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -170,66 +234,18 @@ class DataQualityAnalyzer:
 
         Returns:
             {
-                "score": int (0-10),
+                "score": float (0-10),
                 "level": str ("excellent" / "good" / "fair" / "poor"),
                 "missing_fields": List[str],
                 "warnings": List[str]
             }
         """
-        score = 5  # 基础分（必填字段完整）
-        missing_fields = []
-        warnings = []
-
-        # 检查重要字段
-        if product.get("description"):
-            score += 1
-        else:
-            missing_fields.append("description")
-            warnings.append("缺少产品描述，影响 SEO 和用户理解")
-
-        if product.get("images") and len(product["images"]) > 0:
-            score += 1
-            if len(product["images"]) >= 3:
-                score += 1
-        else:
-            missing_fields.append("images")
-            warnings.append("缺少产品图片，无法展示")
-
-        if product.get("seriesId"):
-            score += 1
-        else:
-            missing_fields.append("seriesId")
-            warnings.append("未分配系列，影响分类和筛选")
-
-        # 检查可选字段
-        pricing = product.get("pricing") or {}
-        if pricing.get("costPrice") and float(pricing.get("costPrice") or 0) > 0:
-            score += 0.5
-
-        if pricing.get("hasSample"):
-            score += 0.5
-
-        # 确定质量等级
-        if score >= 9:
-            level = "excellent"
-        elif score >= 7:
-            level = "good"
-        elif score >= 5:
-            level = "fair"
-        else:
-            level = "poor"
-
-        return {
-            "score": round(score, 1),
-            "level": level,
-            "missing_fields": missing_fields,
-            "warnings": warnings
-        }
+        return quality.analyze_product(product, DataQualityAnalyzer.PROFILE)
 
     @staticmethod
-    def generate_quality_report(products: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def generate_quality_report(products: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        生成数据质量报告
+        生成数据质量报告（products 可为流式迭代器，按批列式评分，只遍历一次）
 
         Returns:
             {
@@ -240,43 +256,44 @@ class DataQualityAnalyzer:
                 "products_by_quality": Dict[str, List[Dict]]
             }
         """
-        total_products = len(products)
-        scores = []
-        distribution = {"excellent": 0, "good": 0, "fair": 0, "poor": 0}
-        missing_fields_count = {}
-        products_by_quality = {"excellent": [], "good": [], "fair": [], "poor": []}
-
+        report = quality.QualityReport(DataQualityAnalyzer.PROFILE)
+        batch: List[Dict[str, Any]] = []
         for product in products:
-            analysis = DataQualityAnalyzer.analyze_product(product)
-            scores.append(analysis["score"])
-            distribution[analysis["level"]] += 1
-
-            # 统计缺失字段
-            for field in analysis["missing_fields"]:
-                missing_fields_count[field] = missing_fields_count.get(field, 0) + 1
-
-            # 按质量分组
-            products_by_quality[analysis["level"]].append({
-                "code": product["code"],
-                "name": product["name"],
-                "score": analysis["score"],
-                "missing_fields": analysis["missing_fields"]
-            })
-
-        # 排序缺失字段
-        top_missing_fields = sorted(
-            missing_fields_count.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+            batch.append(product)
+            if len(batch) >= QUALITY_BATCH:
+                report.update(batch)
+                batch = []
+        report.update(batch)
+        return report.to_dict()
 
-        return {
-            "total_products": total_products,
-            "average_score": round(sum(scores) / len(scores), 2) if scores else 0,
-            "distribution": distribution,
-            "top_missing_fields": top_missing_fields,
-            "products_by_quality": products_by_quality
-        }
+    @staticmethod
+    def store_quality_report(store: ProductStore) -> Dict[str, Any]:
+        """本地快照的质量报告：缓存每个产品的评分，只重新评分 updatedAt 变化/新增的产品"""
+        key = f"quality:{DataQualityAnalyzer.PROFILE.name}"
+        cached = store.get_meta(key)
+        if not cached:
+            # 首次：顺序扫描整个快照
+            report = quality.QualityReport(DataQualityAnalyzer.PROFILE)
+            batch: List[Dict[str, Any]] = []
+            for product in store.iter_products():
+                batch.append(product)
+                if len(batch) >= QUALITY_BATCH:
+                    report.update(batch)
+                    batch = []
+            report.update(batch)
+            changed = True
+        else:
+            report = quality.QualityReport.from_state(json.loads(cached), DataQualityAnalyzer.PROFILE)
+            stamps = store.product_stamps()
+            gone = [k for k in report.entries if k not in stamps]
+            report.remove(gone)
+            stale = [pid for pid, ts in stamps.items() if ts is None or report.stamp(pid) != ts]
+            for i in range(0, len(stale), QUALITY_BATCH):
+                report.update(store.get_products(stale[i : i + QUALITY_BATCH]))
+            changed = bool(gone or stale)
+        if changed:
+            store.set_meta(**{key: json.dumps(report.state(), ensure_ascii=False, separators=(",", ":"))})
+        return report.to_dict()
 
 
 def print_product_list(products: List[Dict[str, Any]]):
@@ -358,7 +375,7 @@ def print_quality_report(report: Dict[str, Any]):
 
     print("\n质量分布:")
     dist = report["distribution"]
-    total = report["total_products"]
+    total = report["total_products"] or 1
     print(f"  优秀 (9-10分): {dist['excellent']:3d} ({dist['excellent']/total*100:5.1f}%)")
     print(f"  良好 (7-9分):  {dist['good']:3d} ({dist['good']/total*100:5.1f}%)")
     print(f"  一般 (5-7分):  {dist['fair']:3d} ({dist['fair']/total*100:5.1f}%)")
@@ -377,6 +394,57 @@ def print_quality_report(report: Dict[str, Any]):
                   f"评分: {product['score']}/10 | 缺失: {', '.join(product['missing_fields'])}")
 
 
+def sync_store(
+    api: TurtleAlbumAPI,
+    store: ProductStore,
+    *,
+    full: bool = False,
+    page_size: int = PAGE_SIZE,
+    workers: int = PAGE_WORKERS,
+) -> Dict[str, Any]:
+    """把产品/图片/系列同步到本地快照；有水位线时只拉 updatedAt 不早于水位线的产品"""
+    watermark = None if full else parse_timestamp(store.get_meta("watermark"))
+    stats: Dict[str, Any] = {"mode": "incremental" if watermark else "full", "fetched": 0, "written": 0, "pruned": 0}
+    synced_at = datetime.now().isoformat(timespec="seconds")
+    chunk: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        stats["written"] += store.upsert_products(chunk)
+        chunk.clear()
+
+    if watermark:
+        prev: Optional[datetime] = None
+        sorted_ok = True
+        for page in api.iter_recent_product_pages(page_size=page_size):
+            stats["fetched"] += len(page)
+            if sorted_ok and not is_newest_first(page, prev):
+                # 后端未按 updatedAt 排序：只能扫完全部分页，仍只写入变更的产品
+                sorted_ok = False
+                print("⚠️ 后端未按 updatedAt 倒序返回，增量同步退化为全量扫描")
+            chunk.extend(p for p in page if (updated_time(p) or watermark) >= watermark)
+            if len(chunk) >= SYNC_CHUNK:
+                flush()
+            prev = next((ts for ts in map(updated_time, reversed(page)) if ts), prev)
+            if sorted_ok and prev is not None and prev < watermark:
+                break
+        flush()
+    else:
+        seen: Set[str] = set()
+        for product in api.iter_products(page_size=page_size, workers=workers):
+            stats["fetched"] += 1
+            seen.add(str(product.get("id") or ""))
+            chunk.append(product)
+            if len(chunk) >= SYNC_CHUNK:
+                flush()
+        flush()
+        stats["pruned"] = store.prune_products(seen)
+
+    stats["series"] = store.replace_series(api.get_all_series() or [])
+    store.set_meta(watermark=store.max_updated_at(), synced_at=synced_at, base_url=api.base_url)
+    stats["total"] = store.count_products()
+    return stats
+
+
 def main():
     parser = argparse.ArgumentParser(description="TurtleAlbum 生产数据查询工具")
     parser.add_argument("--env", choices=["dev", "staging", "prod"], default="dev",
@@ -391,33 +459,79 @@ def main():
         default=os.getenv("TURTLEALBUM_ADMIN_PASSWORD"),
         help="密码 (或设置 TURTLEALBUM_ADMIN_PASSWORD)",
     )
-    parser.add_argument("--action", choices=["list", "search", "detail", "quality-report", "series"],
+    parser.add_argument("--action", choices=["list", "search", "detail", "quality-report", "series", "sync"],
                         required=True, help="操作类型")
     parser.add_argument("--code", help="产品编号 (用于 search/detail)")
     parser.add_argument("--name", help="产品名称 (用于 search)")
+    parser.add_argument("--text", help="编号/名称/描述全文 (用于 search)")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="search: 模糊匹配（按相似度排序，仅本地快照；最多 --limit 条，默认 20）")
     parser.add_argument("--product-id", help="产品 ID (用于 detail)")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help=f"分页大小 (默认: {PAGE_SIZE})")
+    parser.add_argument("--workers", type=int, default=PAGE_WORKERS,
+                        help=f"并发拉取的页数 (默认: {PAGE_WORKERS}; 1 = 顺序拉取)")
+    parser.add_argument("--limit", type=int, default=0,
+                        help="list/search 最多显示的产品数 (默认: 0 = 全部)")
+    parser.add_argument("--store", default=None,
+                        help=f"本地快照 sqlite 路径 (默认: {DEFAULT_STORE})")
+    parser.add_argument("--live", action="store_true", help="读操作直连 API，不读本地快照")
+    parser.add_argument("--full", action="store_true", help="sync: 全量同步并清理已删除的产品")
 
     args = parser.parse_args()
 
-    if not (args.password or "").strip():
-        args.password = (os.getenv("TURTLEALBUM_ADMIN_PASSWORD") or "").strip() or None
-    if not args.password:
-        parser.error("密码必填: 传 --password 或设置 env TURTLEALBUM_ADMIN_PASSWORD")
+    store_path = os.path.expanduser(args.store or DEFAULT_STORE.format(env=args.env))
+    store: Optional[ProductStore] = None
+    if args.action == "sync" or (not args.live and os.path.exists(store_path)):
+        store = ProductStore(store_path)
+        if args.action != "sync" and not store.get_meta("synced_at"):
+            store.close()
+            store = None
+    if store is not None and args.action != "sync":
+        print(f"(本地快照 {store_path}，同步于 {store.get_meta('synced_at')}；--live 直连 API)")
+
+    api: Optional[TurtleAlbumAPI] = None
+    if store is None or args.action == "sync":
+        if not (args.password or "").strip():
+            args.password = (os.getenv("TURTLEALBUM_ADMIN_PASSWORD") or "").strip() or None
+        if not args.password:
+            parser.error("密码必填: 传 --password 或设置 env TURTLEALBUM_ADMIN_PASSWORD")
 
-    # 初始化 API 客户端
-    api = TurtleAlbumAPI(args.env, args.username, args.password)
+        # 初始化 API 客户端
+        api = TurtleAlbumAPI(args.env, args.username, args.password)
+
+    paging = {"page_size": args.page_size, "workers": args.workers}
 
     # 执行操作
-    if args.action == "list":
-        products_data = api.get_all_products()
-        print_product_list(products_data.get("products") or [])
+    if args.action == "sync":
+        stats = sync_store(api, store, full=args.full, **paging)
+        print(
+            f"✅ 同步完成 ({stats['mode']}): 拉取 {stats['fetched']}，写入 {stats['written']}，"
+            f"删除 {stats['pruned']}，系列 {stats['series']}，本地共 {stats['total']} 个产品"
+        )
+        if stats["mode"] == "incremental":
+            print("   (增量同步不处理已删除的产品，需要时用 --full)")
+
+    elif args.action == "list":
+        if store is not None:
+            print_product_list(list(store.iter_products(limit=args.limit)))
+        else:
+            print_product_list(list(api.iter_products(limit=args.limit, **paging)))
 
     elif args.action == "search":
-        if not args.code and not args.name:
-            print("❌ 请提供 --code 或 --name 参数")
+        if not args.code and not args.name and not args.text:
+            print("❌ 请提供 --code、--name 或 --text 参数")
             return
 
-        results = api.search_products(code=args.code, name=args.name)
+        if store is not None and args.fuzzy:
+            results = store.fuzzy_search(args.text or args.name or args.code, limit=args.limit or 20)
+        elif store is not None:
+            results = store.search_products(code=args.code, name=args.name, text=args.text, limit=args.limit)
+        elif args.text:
+            # 全文检索交给后端 search 参数
+            results = list(api.iter_products(args.text, limit=args.limit, **paging))
+        else:
+            results = api.search_products(code=args.code, name=args.name, **paging)
         if results:
             print_product_list(results)
         else:
@@ -425,10 +539,16 @@ def main():
 
     elif args.action == "detail":
         if args.product_id:
-            product_data = api.get_product(args.product_id)
-            print_product_detail(product_data)
+            product_data = store.get_product(args.product_id) if store is not None else api.get_product(args.product_id)
+            if product_data:
+                print_product_detail(product_data)
+            else:
+                print("❌ 未找到匹配的产品")
         elif args.code:
-            results = api.search_products(code=args.code)
+            if store is not None:
+                results = store.search_products(code=args.code)
+            else:
+                results = api.search_products(code=args.code, **paging)
             if results:
                 print_product_detail(results[0])
             else:
@@ -437,12 +557,14 @@ def main():
             print("❌ 请提供 --product-id 或 --code 参数")
 
     elif args.action == "quality-report":
-        products_data = api.get_all_products()
-        report = DataQualityAnalyzer.generate_quality_report(products_data.get("products") or [])
+        if store is not None:
+            report = DataQualityAnalyzer.store_quality_report(store)
+        else:
+            report = DataQualityAnalyzer.generate_quality_report(api.iter_products(**paging))
         print_quality_report(report)
 
     elif args.action == "series":
-        series_list = api.get_all_series() or []
+        series_list = (store.series() if store is not None else api.get_all_series()) or []
         print(f"\n📚 系列列表 (共 {len(series_list)} 个)")
         print("-" * 80)
         for i, series in enumerate(series_list, 1):
@@ -452,6 +574,9 @@ def main():
             name = str(series.get("name") or "")
             print(f"{i:3d}. {series_id:36s} | {name:20s} | 激活: {active}")
 
+    if store is not None:
+        store.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,57 @@
+"""Shared helpers for the TurtleAlbum operator scripts in scripts/.
+
+Scripts are run as ``python3 scripts/<name>.py`` so this package is importable
+as ``turtlealbum`` without installation.
+"""
+
+from .client import (
+    DEFAULT_BACKOFF,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    IDEMPOTENT_METHODS,
+    RETRY_STATUSES,
+    ApiClient,
+    TurtleAlbumError,
+    add_http_arguments,
+    build_session,
+    cached_token,
+    extract_token,
+    forget_token,
+    get_session,
+    store_token,
+)
+from .cache import DEFAULT_MAX_ENTRIES, DiskCache
+from .journal import ApplyJournal, text_digest
+from .paging import DEFAULT_PAGE_SIZE, iter_items, iter_pages
+from .snapshot import SnapshotError, iter_snapshot, iter_snapshot_breeders
+from .store import ProductStore
+
+__all__ = [
+    "DEFAULT_BACKOFF",
+    "DEFAULT_MAX_ENTRIES",
+    "DEFAULT_PAGE_SIZE",
+    "DEFAULT_POOL_SIZE",
+    "DEFAULT_RETRIES",
+    "DEFAULT_TIMEOUT",
+    "IDEMPOTENT_METHODS",
+    "RETRY_STATUSES",
+    "ApiClient",
+    "ApplyJournal",
+    "DiskCache",
+    "ProductStore",
+    "SnapshotError",
+    "TurtleAlbumError",
+    "add_http_arguments",
+    "build_session",
+    "cached_token",
+    "extract_token",
+    "forget_token",
+    "get_session",
+    "iter_items",
+    "iter_pages",
+    "iter_snapshot",
+    "iter_snapshot_breeders",
+    "store_token",
+    "text_digest",
+]
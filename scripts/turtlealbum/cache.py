@@ -0,0 +1,101 @@
+"""Size-bounded on-disk LRU cache (sqlite) for derived, recomputable data.
+
+Used by the description backfill to skip re-parsing unchanged descriptions
+between dry runs. Values are JSON; keys are opaque strings (callers hash their
+inputs). Entries beyond ``max_entries`` are evicted least-recently-used first
+when the cache is closed.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Keys per IN (...) query; older sqlite builds cap host parameters at 999.
+_IN_CHUNK = 500
+
+
+class DiskCache:
+    def __init__(self, path: str | Path, *, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+
+    def __enter__(self) -> "DiskCache":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return {key: value} for the keys present; refreshes their LRU stamp."""
+        wanted = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        now = time.time()
+        with self._conn:
+            for i in range(0, len(wanted), _IN_CHUNK):
+                chunk = wanted[i : i + _IN_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(f"SELECT key, value FROM entries WHERE key IN ({marks})", chunk).fetchall()
+                if not rows:
+                    continue
+                for key, value in rows:
+                    found[key] = json.loads(value)
+                self._conn.execute(f"UPDATE entries SET used = ? WHERE key IN ({marks})", [now, *chunk])
+        self.hits += len(found)
+        self.misses += len(wanted) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        now = time.time()
+        rows: List[Tuple[str, str, float]] = [
+            (k, json.dumps(v, ensure_ascii=False, separators=(",", ":")), now) for k, v in items
+        ]
+        if rows:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO entries (key, value, used) VALUES (?, ?, ?)", rows)
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def delete(self, key: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def evict(self) -> int:
+        """Trim to max_entries, least recently used first. Returns rows removed."""
+        if self.max_entries <= 0:
+            return 0
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        extra = count - self.max_entries
+        if extra <= 0:
+            return 0
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used ASC LIMIT ?)", (extra,)
+            )
+        return extra
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self.evict()
+        self._conn.close()
+        self._conn = None  # type: ignore[assignment]
@@ -0,0 +1,309 @@
+"""Pooled HTTP client shared by the TurtleAlbum operator scripts.
+
+Every script used to call module-level ``requests.request(...)``, which opens a
+fresh TCP+TLS connection per call. This module keeps one keep-alive
+``requests.Session`` per (base_url, pool settings) for the whole process, retries
+429/5xx with exponential backoff, and caches login tokens so several clients in
+the same run authenticate once.
+
+Tunables can be overridden via env:
+  TURTLEALBUM_HTTP_POOL_SIZE   connections kept alive per host (default: 10)
+  TURTLEALBUM_HTTP_RETRIES     retries on 429/5xx/connect errors (default: 3)
+  TURTLEALBUM_HTTP_BACKOFF     backoff factor in seconds (default: 0.5)
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Type
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .paging import DEFAULT_PAGE_SIZE, iter_items
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+DEFAULT_TIMEOUT = 20
+DEFAULT_POOL_SIZE = _env_int("TURTLEALBUM_HTTP_POOL_SIZE", 10)
+DEFAULT_RETRIES = _env_int("TURTLEALBUM_HTTP_RETRIES", 3)
+DEFAULT_BACKOFF = _env_float("TURTLEALBUM_HTTP_BACKOFF", 0.5)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# POST is not retried by default: only callers whose writes are idempotent
+# (e.g. breeder events keyed by source_id) should opt in.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class TurtleAlbumError(RuntimeError):
+    # Set by ApiClient.request for HTTP errors so callers can branch on 404/405 etc.
+    status_code: Optional[int] = None
+
+
+_SessionKey = Tuple[str, int, int, float, frozenset]
+
+_sessions: Dict[_SessionKey, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+_tokens: Dict[Tuple[str, str], str] = {}
+_tokens_lock = threading.Lock()
+
+
+def build_session(
+    *,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    retry_methods: Iterable[str] = IDEMPOTENT_METHODS,
+) -> requests.Session:
+    """Create a keep-alive session with a sized connection pool and retry policy."""
+    retry = Retry(
+        total=max(retries, 0),
+        connect=max(retries, 0),
+        read=max(retries, 0),
+        status=max(retries, 0),
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(m.upper() for m in retry_methods),
+        respect_retry_after_header=True,
+        # Let the caller see the final 4xx/5xx body instead of a MaxRetryError.
+        raise_on_status=False,
+    )
+    size = max(pool_size, 1)
+    adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(
+    base_url: str,
+    *,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    retry_methods: Iterable[str] = IDEMPOTENT_METHODS,
+) -> requests.Session:
+    """Return the process-wide session for base_url (created on first use)."""
+    methods = frozenset(m.upper() for m in retry_methods)
+    key: _SessionKey = (base_url.rstrip("/"), pool_size, retries, backoff, methods)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = build_session(
+                pool_size=pool_size,
+                retries=retries,
+                backoff=backoff,
+                retry_methods=methods,
+            )
+            _sessions[key] = session
+        return session
+
+
+def extract_token(body: Any) -> Optional[str]:
+    """Pull the access token out of a login response (enveloped or bare)."""
+    if not isinstance(body, dict):
+        return None
+    for container in (body.get("data"), body):
+        if not isinstance(container, dict):
+            continue
+        for key in ("token", "access_token", "accessToken"):
+            value = container.get(key)
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+    return None
+
+
+def cached_token(base_url: str, username: str) -> Optional[str]:
+    with _tokens_lock:
+        return _tokens.get((base_url.rstrip("/"), username))
+
+
+def store_token(base_url: str, username: str, token: str) -> None:
+    with _tokens_lock:
+        _tokens[(base_url.rstrip("/"), username)] = token
+
+
+def forget_token(base_url: str, username: str) -> None:
+    with _tokens_lock:
+        _tokens.pop((base_url.rstrip("/"), username), None)
+
+
+def add_http_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the shared --pool-size/--retries/--timeout flags on a script parser."""
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help=f"Keep-alive connections per host (default: {DEFAULT_POOL_SIZE})",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=f"Retries on 429/5xx with exponential backoff (default: {DEFAULT_RETRIES})",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=DEFAULT_TIMEOUT,
+        help=f"Per-request timeout in seconds (default: {DEFAULT_TIMEOUT})",
+    )
+
+
+class ApiClient:
+    """JSON client for the TurtleAlbum admin API over a pooled session.
+
+    Scripts subclass this and pass their own ``error_cls`` so their existing
+    ``except <ScriptError>`` handling keeps working unchanged.
+    """
+
+    error_cls: Type[Exception] = TurtleAlbumError
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        retry_methods: Iterable[str] = IDEMPOTENT_METHODS,
+        error_cls: Optional[Type[Exception]] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        if error_cls is not None:
+            self.error_cls = error_cls
+        self.session = get_session(
+            self.base_url,
+            pool_size=pool_size,
+            retries=retries,
+            backoff=backoff,
+            retry_methods=retry_methods,
+        )
+        self.token: Optional[str] = token
+        if self.token is None and username and password:
+            self.token = self.login(username=username, password=password)
+
+    def auth_headers(self) -> Dict[str, str]:
+        if not self.token:
+            raise self.error_cls("Auth requested but client has no token")
+        t = self.token.strip()
+        if not t.lower().startswith("bearer "):
+            t = f"Bearer {t}"
+        return {"Authorization": t}
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+        auth: bool = False,
+        timeout: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Send one request and return the decoded JSON body.
+
+        Raises ``error_cls`` on transport errors, HTTP >= 400 and ``success: false``.
+        """
+        headers: Dict[str, str] = {"Content-Type": "application/json"}
+        if auth:
+            headers.update(self.auth_headers())
+
+        url = f"{self.base_url}{path}"
+        try:
+            resp = self.session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json_body,
+                timeout=timeout or self.timeout,
+            )
+        except requests.RequestException as exc:
+            raise self.error_cls(f"Request failed: {method} {url} -> {exc}") from exc
+
+        body: Any
+        try:
+            body = resp.json() if resp.content else {}
+        except ValueError:
+            body = {"message": resp.text}
+        if not isinstance(body, dict):
+            body = {"data": body}
+
+        if resp.status_code >= 400:
+            detail = body.get("message") or body.get("detail") or resp.text
+            err = self.error_cls(f"HTTP {resp.status_code}: {detail}")
+            err.status_code = resp.status_code  # type: ignore[attr-defined]
+            raise err
+
+        if body.get("success") is False:
+            raise self.error_cls(f"API reported failure: {body.get('message') or body}")
+
+        return body
+
+    def iter_list(
+        self,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        limit: int = 0,
+        auth: bool = False,
+        timeout: Optional[int] = None,
+        workers: int = 1,
+        size_param: str = "limit",
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream items of a paginated list endpoint (see turtlealbum.paging)."""
+        return iter_items(
+            lambda p: self.request("GET", path, params=p, auth=auth, timeout=timeout),
+            params=params,
+            page_size=page_size,
+            limit=limit,
+            workers=workers,
+            size_param=size_param,
+        )
+
+    def login(self, username: str, password: str) -> str:
+        """Return a token for username, logging in only if none is cached."""
+        token = cached_token(self.base_url, username)
+        if token:
+            self.token = token
+            return token
+
+        body = self.request(
+            "POST",
+            "/api/auth/login",
+            json_body={"username": username, "password": password},
+            auth=False,
+        )
+        token = extract_token(body)
+        if not token:
+            raise self.error_cls("Login succeeded but token missing in /api/auth/login response")
+        store_token(self.base_url, username, token)
+        self.token = token
+        return token
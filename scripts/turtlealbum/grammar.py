@@ -0,0 +1,82 @@
+"""Date/event grammar for legacy record lines in products.description.
+
+Shared by backfill_events_from_description.py (which turns records into
+breeder_events) and cleanup_description_records.py (which strips the same
+records afterwards), so both agree on what counts as a record.
+
+A record is a date token followed by a segment with an event keyword:
+  - mating: 配 (交配 / 配对 / 配 XX-1)
+  - egg:    the egg verb 产/下 next to its object, with at most 了, a count,
+            a unit or 一窝 between them ("产蛋", "下了蛋", "产一窝蛋",
+            "下 3 枚受精卵"), a count followed by 受精 ("下3受精"), or the
+            digit form "产4"
+
+``classify_segment`` is the one keyword test: the backfill reads the event type
+from it and cleanup (``has_event_keyword``) strips exactly the segments it
+recognises, so nothing is deleted that the backfill did not turn into an event.
+The egg verb and object must be adjacent because cleanup deletes text:
+"下午喂鸡蛋" or "下个月买鹌鹑蛋" are not records.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Tuple
+
+# Matches common date formats in operator notes. All formats live in one
+# alternation so a line is tokenized in a single pass; Match.lastgroup names
+# the format that matched (ymd / md_dash / md_dot).
+RE_DATE = re.compile(
+    r"(?P<ymd>(?P<y>20\d{2})[\./\-](?P<m>\d{1,2})[\./\-](?P<d>\d{1,2}))"
+    r"|(?P<md_dash>(?P<m2>\d{1,2})\-(?P<d2>\d{1,2}))"
+    r"|(?P<md_dot>(?P<m3>\d{1,2})\s*\.\s*(?P<d3>\d{1,2}))"
+)
+
+RE_YEAR_LINE = re.compile(r"^\s*(20\d{2})\s*(?:年)?\s*$")
+RE_LEADING_YEAR = re.compile(r"^\s*(20\d{2})\s*(?:年)?\s*[:：\-]?\s*(.*)$")
+
+RE_EGG_COUNT = re.compile(r"(?:产|下)\s*(?:蛋|卵)?\s*(?P<n>\d{1,2})\s*(?:个|枚|颗)?\s*(?:蛋|卵)?")
+
+# Egg keyword with the verb next to its object: 产蛋 / 下了蛋 / 产一窝蛋 / 下 3 枚受精卵 / 产两个蛋,
+# a count followed by 受精 (下3受精 / 产 2 个受精), or 产 directly followed by a count (产4 / 产21颗).
+RE_EGG_RECORD = re.compile(
+    r"(?:产|下)\s*了?\s*(?:一窝|(?:\d{1,2}|[一二两三四五六七八九十]{1,3})?\s*(?:个|枚|颗)?)"
+    r"\s*(?:受精)?\s*(?:个|枚|颗)?\s*(?:蛋|卵)"
+    r"|(?:产|下)\s*了?\s*\d{1,2}\s*(?:个|枚|颗)?\s*受精"
+    r"|产\s*了?\s*\d{1,2}"
+)
+
+# Candidate code formats seen in the dataset (ASCII prefix or CJK prefix, dash, then token).
+RE_CODE = re.compile(r"(?P<code>(?:[A-Za-z]{1,8}|[\u4e00-\u9fff]{1,8})\-[A-Za-z0-9]{1,8})\s*(?:公)?")
+
+# Characters trimmed around the segment that follows a date.
+SEGMENT_STRIP = " \t:：,，;；|-—"
+
+# Section headers operators put above record lists.
+RECORD_HEADERS = ("产蛋/交配记录", "交配记录", "产蛋记录")
+
+
+def classify_segment(segment: str) -> Tuple[bool, bool]:
+    """Return (egg_hit, mating_hit) for the text after a date.
+
+    Substring checks reject most segments before the egg regex runs.
+    """
+    seg = segment or ""
+    egg_hit = ("产" in seg or "下" in seg) and RE_EGG_RECORD.search(seg) is not None
+    # "配" covers 交配 / 配对 / 配.
+    return (egg_hit, "配" in seg)
+
+
+def has_event_keyword(text: str) -> bool:
+    """True if ``classify_segment`` finds any event keyword (ambiguous mixes included)."""
+    egg_hit, mating_hit = classify_segment(text)
+    return egg_hit or mating_hit
+
+
+def may_contain_records(description: str) -> bool:
+    """Cheap whole-description test used before any tokenizing.
+
+    Any segment ``classify_segment`` accepts is a substring of its description,
+    so this never rejects a description holding a record.
+    """
+    return has_event_keyword(description)
@@ -0,0 +1,83 @@
+"""Append-only JSONL journal of confirmed writes for resumable --apply runs.
+
+Each confirmed write appends one line::
+
+  {"key": "<source_id|product_id>", "status": "created", "digest": "...", "at": "..."}
+
+On re-run, keys already present are skipped without any network call. A torn
+last line (process killed mid-write) is ignored on load.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+class ApplyJournal:
+    def __init__(self, path: str | Path):
+        self.path = Path(path).expanduser()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("a", encoding="utf-8")
+
+    def _load(self) -> None:
+        try:
+            fh = self.path.open("r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and entry.get("key"):
+                    self._entries[str(entry["key"])] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self) -> "ApplyJournal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def done(self, key: str, digest: Optional[str] = None) -> bool:
+        """True if key was confirmed (and, when given, with the same digest)."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return False
+        return digest is None or entry.get("digest") == digest
+
+    def record(self, key: str, status: str, *, digest: Optional[str] = None, **extra: Any) -> None:
+        entry: Dict[str, Any] = {"key": key, "status": status}
+        if digest is not None:
+            entry["digest"] = digest
+        entry.update(extra)
+        entry["at"] = datetime.now(timezone.utc).isoformat()
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            self._entries[key] = entry
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
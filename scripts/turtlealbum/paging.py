@@ -0,0 +1,233 @@
+"""Paginated list iteration for TurtleAlbum list endpoints.
+
+The legacy API uses a few list shapes:
+  - ``{"data": [...]}``                                    (page/limit, or limit only)
+  - ``{"data": {"products": [...], "totalPages": N}}``    (page/limit)
+  - ``{"data": {"items": [...], "nextCursor": "...", "hasMore": true}}`` (cursor)
+
+``iter_pages`` walks any of them, fetching the next page in a background thread
+while the caller processes the current one, so memory stays bounded by one or
+two pages. An endpoint that ignores ``page`` (returns the same first page again)
+is detected and iteration stops instead of looping.
+
+A page/limit endpoint that reports its size (``totalPages``, or ``total``) is
+read up to that page count, derived from the length of page 1 when the server
+caps the page size; only endpoints with no count stop at the first short page.
+With ``workers > 1`` and such an endpoint, the remaining pages are fetched ``workers`` at a
+time after page 1 and still yielded in page order; at most ``workers`` pages are
+buffered. Cursor and plain-list endpoints stay sequential.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 200
+
+# Safety net against endpoints that never signal the last page.
+MAX_PAGES = 10_000
+
+_ITEM_KEYS = ("items", "products", "data", "breeders")
+
+FetchPage = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def _split_page(body: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Return (items, paging_meta) for one response body."""
+    data = body.get("data", body)
+    if isinstance(data, list):
+        return ([x for x in data if isinstance(x, dict)], {})
+    if isinstance(data, dict):
+        for key in _ITEM_KEYS:
+            value = data.get(key)
+            if isinstance(value, list):
+                return ([x for x in value if isinstance(x, dict)], data)
+    return ([], {})
+
+
+def _item_key(item: Dict[str, Any]) -> Optional[str]:
+    value = item.get("id")
+    return str(value) if value not in (None, "") else None
+
+
+def _total_pages(meta: Dict[str, Any], page_size: int, first_len: int) -> Optional[int]:
+    """Page count reported by a page/limit response, if any.
+
+    ``first_len`` is the length of page 1: a server that caps the page size
+    below ``page_size`` pages by its cap, so a short first page that is not the
+    whole list sets the page size used to derive the count from ``total``.
+    """
+    if "totalPages" in meta or "total_pages" in meta:
+        return int(meta.get("totalPages") or meta.get("total_pages") or 1)
+    total = meta.get("total")
+    if isinstance(total, int):
+        size = first_len if 0 < first_len < min(page_size, total) else page_size
+        return max(1, -(-total // size))
+    return None
+
+
+def _warn_ignored_paging(page: int, page_size: int) -> None:
+    print(
+        f"[paging] page {page} repeats page 1; endpoint ignores paging, stopping "
+        f"(only the first {page_size} items are available; raise the page size)",
+        file=sys.stderr,
+    )
+
+
+def _iter_rest_concurrent(
+    fetch: FetchPage,
+    page_params: Callable[[int], Dict[str, Any]],
+    *,
+    total: int,
+    workers: int,
+    first_keys: Tuple[Optional[str], ...],
+    page_size: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages 2..total in order, keeping up to ``workers`` requests in flight."""
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-fetch")
+    try:
+        window: Deque[Future] = deque()
+        next_page = 2
+        page = 2
+        while page <= total:
+            while next_page <= total and len(window) < workers:
+                window.append(pool.submit(fetch, page_params(next_page)))
+                next_page += 1
+            items, _ = _split_page(window.popleft().result())
+            if not items:
+                return
+            if page == 2 and tuple(_item_key(x) for x in items[:3]) == first_keys:
+                _warn_ignored_paging(page, page_size)
+                return
+            yield items
+            page += 1
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_pages(
+    fetch: FetchPage,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    prefetch: bool = True,
+    workers: int = 1,
+    size_param: str = "limit",
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield pages of items from a page/limit or cursor-paginated endpoint.
+
+    ``fetch(params)`` performs one request and returns the decoded body. The next
+    page is requested as soon as the current one arrives; with ``prefetch`` that
+    request runs in a background thread while the caller consumes the page.
+    ``workers > 1`` fetches the pages of a sized page/limit endpoint concurrently
+    (``fetch`` must then be thread-safe). ``size_param`` names the page-size query
+    parameter (``pageSize`` on the Nest API).
+    """
+    base = dict(params or {})
+    base[size_param] = page_size
+
+    def page_params(page: int, cursor: Optional[str]) -> Dict[str, Any]:
+        p = dict(base)
+        if cursor:
+            p["cursor"] = cursor
+        else:
+            p["page"] = page
+        return p
+
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") if prefetch else None
+    try:
+        pending: Optional[Future] = None
+        next_params: Optional[Dict[str, Any]] = page_params(1, None)
+        page = 1
+        first_keys: Optional[Tuple[Optional[str], ...]] = None
+        page_count: Optional[int] = None
+
+        while next_params is not None and page <= MAX_PAGES:
+            if pending is not None:
+                body = pending.result()
+                pending = None
+            else:
+                body = fetch(next_params)
+            items, meta = _split_page(body)
+            if not items:
+                return
+
+            # Same leading ids as page 1: the endpoint ignores paging.
+            keys = tuple(_item_key(x) for x in items[:3])
+            if page == 1:
+                first_keys = keys
+            elif keys == first_keys:
+                _warn_ignored_paging(page, page_size)
+                return
+
+            cursor = meta.get("nextCursor") or meta.get("next_cursor")
+            if page == 1 and not cursor:
+                page_count = _total_pages(meta, page_size, len(items))
+            if workers > 1 and page_count is not None and page_count > 1:
+                yield items
+                yield from _iter_rest_concurrent(
+                    fetch,
+                    lambda n: page_params(n, None),
+                    total=min(page_count, MAX_PAGES),
+                    workers=workers,
+                    first_keys=keys,
+                    page_size=page_size,
+                )
+                return
+
+            if cursor:
+                next_params = page_params(page + 1, str(cursor)) if meta.get("hasMore", True) else None
+            elif page_count is not None:
+                next_params = page_params(page + 1, None) if page < page_count else None
+            else:
+                # No count at all: a short page is the last one.
+                next_params = page_params(page + 1, None) if len(items) >= page_size else None
+
+            if next_params is not None and pool is not None:
+                pending = pool.submit(fetch, next_params)
+
+            yield items
+            page += 1
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_items(
+    fetch: FetchPage,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    limit: int = 0,
+    prefetch: bool = True,
+    workers: int = 1,
+    size_param: str = "limit",
+) -> Iterator[Dict[str, Any]]:
+    """Yield items across pages; ``limit`` 0 = all. ``size_param`` as in ``iter_pages``.
+
+    Offset paging over a list that changes while it is read can repeat an item
+    at a page boundary, so ids of the previous page are skipped. Only two pages
+    of ids are kept, so memory does not grow with the list.
+    """
+    if limit:
+        page_size = min(page_size, limit)
+    previous: set = set()
+    n = 0
+    for items in iter_pages(
+        fetch, params=params, page_size=page_size, prefetch=prefetch, workers=workers, size_param=size_param
+    ):
+        current: set = set()
+        for item in items:
+            key = _item_key(item)
+            if key is not None:
+                if key in previous or key in current:
+                    continue
+                current.add(key)
+            yield item
+            n += 1
+            if limit and n >= limit:
+                return
+        previous = current
@@ -0,0 +1,308 @@
+"""Product data-quality scoring shared by query_production.py and export_to_excel.py.
+
+A ``Profile`` is a list of rules. Each rule reads one number per product (text
+length, image count, 1/0 presence, ...) and earns points at given minimums; a
+product that earns nothing from a rule has that field missing. Batches are
+scored column-wise: the rule values of all products are gathered once, then
+points, levels and missing-field masks are computed per column, with numpy
+when it is installed and plain lists otherwise (same results).
+
+``QualityReport`` keeps per-product results plus running totals, so updating
+a few changed products adjusts the report without re-scoring the rest.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python fallback below
+    np = None
+
+LEVELS = ("excellent", "good", "fair", "poor")
+
+# Minimum (unrounded) score per level, best first; anything lower is "poor".
+LEVEL_MINIMUMS = (9.0, 7.0, 5.0)
+
+
+@dataclass(frozen=True)
+class Rule:
+    field: str
+    values: Callable[[Sequence[Dict[str, Any]]], List[float]]  # one number per product
+    points: Tuple[Tuple[float, float], ...]  # (minimum value, points earned)
+    missing: bool = True  # report ``field`` as missing when no points are earned
+    warning: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    rules: Tuple[Rule, ...]
+    base: float = 5.0
+
+    @property
+    def missing_rules(self) -> Tuple[Rule, ...]:
+        return tuple(r for r in self.rules if r.missing)
+
+
+def column(products: Sequence[Dict[str, Any]], path: Tuple[str, ...]) -> List[Any]:
+    """Values at a (nested) key for every product; None where absent."""
+    values: List[Any] = list(products)
+    for key in path:
+        values = [v.get(key) if isinstance(v, dict) else None for v in values]
+    return values
+
+
+def _number(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0
+
+
+def size_of(*path: str) -> Callable[[Sequence[Dict[str, Any]]], List[float]]:
+    """Length of a text/list field (0 when empty or absent)."""
+
+    def values(products: Sequence[Dict[str, Any]]) -> List[float]:
+        sized = (str, list, tuple, dict)
+        return [(len(v) if isinstance(v, sized) else 1) if v else 0 for v in column(products, path)]
+
+    return values
+
+
+def present(*path: str) -> Callable[[Sequence[Dict[str, Any]]], List[float]]:
+    """1 when the field is truthy."""
+    return lambda products: [1 if v else 0 for v in column(products, path)]
+
+
+def positive(*path: str) -> Callable[[Sequence[Dict[str, Any]]], List[float]]:
+    """1 when the field is a number > 0."""
+    return lambda products: [1 if v and _number(v) > 0 else 0 for v in column(products, path)]
+
+
+# query_production.py: camelCase API products.
+LISTING_PROFILE = Profile(
+    "listing",
+    (
+        Rule("description", size_of("description"), ((1, 1.0),), warning="缺少产品描述，影响 SEO 和用户理解"),
+        Rule("images", size_of("images"), ((1, 1.0), (3, 1.0)), warning="缺少产品图片，无法展示"),
+        Rule("seriesId", present("seriesId"), ((1, 1.0),), warning="未分配系列，影响分类和筛选"),
+        Rule("pricing.costPrice", positive("pricing", "costPrice"), ((1, 0.5),), missing=False),
+        Rule("pricing.hasSample", present("pricing", "hasSample"), ((1, 0.5),), missing=False),
+    ),
+)
+
+# export_to_excel.py: snake_case export rows.
+EXPORT_PROFILE = Profile(
+    "export",
+    (
+        Rule("description", size_of("description"), ((1, 1.0), (100, 0.5))),
+        Rule("images", size_of("images"), ((1, 1.0), (3, 1.0))),
+        Rule("dimensions", present("dimensions"), ((1, 1.0),)),
+        Rule("series_id", present("series_id"), ((1, 0.5),)),
+        Rule("cost_price", positive("cost_price"), ((1, 0.5),)),
+        Rule("has_sample", present("has_sample"), ((1, 0.25),), missing=False),
+    ),
+)
+
+
+@dataclass
+class BatchScores:
+    """Column results for one batch, in input order."""
+
+    scores: List[float]  # rounded to one decimal, as shown in reports
+    levels: List[int]  # index into LEVELS
+    missing: List[int]  # bit i set = profile.missing_rules[i] missing
+
+
+def _level(score: float) -> int:
+    for i, minimum in enumerate(LEVEL_MINIMUMS):
+        if score >= minimum:
+            return i
+    return len(LEVEL_MINIMUMS)
+
+
+def score_batch(products: Sequence[Dict[str, Any]], profile: Profile) -> BatchScores:
+    """Score products column-wise."""
+    rules = profile.rules
+    columns = [rule.values(products) for rule in rules]
+    missing_bits = {id(r): 1 << i for i, r in enumerate(profile.missing_rules)}
+
+    if np is not None and products:
+        values = np.asarray(columns, dtype=float)
+        score = np.full(len(products), profile.base)
+        mask = np.zeros(len(products), dtype=np.int64)
+        for row, rule in zip(values, rules):
+            for minimum, points in rule.points:
+                score += points * (row >= minimum)
+            if rule.missing:
+                mask |= (row < rule.points[0][0]).astype(np.int64) * missing_bits[id(rule)]
+        level = np.full(len(products), len(LEVEL_MINIMUMS))
+        for i, minimum in reversed(list(enumerate(LEVEL_MINIMUMS))):
+            level[score >= minimum] = i
+        return BatchScores([round(s, 1) for s in score.tolist()], level.tolist(), mask.tolist())
+
+    scores: List[float] = []
+    levels: List[int] = []
+    masks: List[int] = []
+    for j in range(len(products)):
+        s = profile.base
+        m = 0
+        for col, rule in zip(columns, rules):
+            v = col[j]
+            for minimum, points in rule.points:
+                if v >= minimum:
+                    s += points
+            if rule.missing and v < rule.points[0][0]:
+                m |= missing_bits[id(rule)]
+        scores.append(round(s, 1))
+        levels.append(_level(s))
+        masks.append(m)
+    return BatchScores(scores, levels, masks)
+
+
+def display_score(score: float) -> float:
+    """Score as reports show it: whole scores as int (8, not 8.0)."""
+    return int(score) if score == int(score) else score
+
+
+def missing_fields(mask: int, profile: Profile) -> List[str]:
+    return [r.field for i, r in enumerate(profile.missing_rules) if mask >> i & 1]
+
+
+def analyze_batch(products: Sequence[Dict[str, Any]], profile: Profile) -> List[Dict[str, Any]]:
+    """Per-product analysis dicts: score, level, missing_fields, warnings."""
+    batch = score_batch(products, profile)
+    out = []
+    for score, level, mask in zip(batch.scores, batch.levels, batch.missing):
+        rules = [r for i, r in enumerate(profile.missing_rules) if mask >> i & 1]
+        out.append(
+            {
+                "score": display_score(score),
+                "level": LEVELS[level],
+                "missing_fields": [r.field for r in rules],
+                "warnings": [r.warning for r in rules if r.warning],
+            }
+        )
+    return out
+
+
+def analyze_product(product: Dict[str, Any], profile: Profile) -> Dict[str, Any]:
+    return analyze_batch([product], profile)[0]
+
+
+# Per-product entry kept by QualityReport: (code, name, score x10, level, missing mask, stamp).
+_Entry = Tuple[str, str, int, int, int, Optional[str]]
+
+
+class QualityReport:
+    """Running quality report; ``update`` re-scores only the products given."""
+
+    def __init__(self, profile: Profile):
+        self.profile = profile
+        self.entries: Dict[str, _Entry] = {}
+        self._score_sum = 0  # in tenths, so removals do not drift
+        self._levels = [0] * len(LEVELS)
+        self._missing = [0] * len(profile.missing_rules)
+        self._missing_order: List[int] = []  # rule indices in first-seen order (ties in top_missing_fields)
+        self._anonymous = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _add(self, entries: Iterable[_Entry], sign: int) -> None:
+        """Add (sign=1) or subtract (sign=-1) entries from the running totals."""
+        masks: Counter = Counter()
+        for _, _, score10, level, mask, _ in entries:
+            self._score_sum += sign * score10
+            self._levels[level] += sign
+            masks[mask] += 1
+        for mask, n in masks.items():
+            for i in range(len(self._missing)):
+                if mask >> i & 1:
+                    self._missing[i] += sign * n
+                    if i not in self._missing_order:
+                        self._missing_order.append(i)
+
+    def update(
+        self,
+        products: Sequence[Dict[str, Any]],
+        *,
+        stamp_key: str = "updatedAt",
+        batch: Optional[BatchScores] = None,
+    ) -> None:
+        """Add or replace products (keyed by id, else code); pass ``batch`` if already scored."""
+        if batch is None:
+            batch = score_batch(products, self.profile)
+        added: Dict[str, _Entry] = {}
+        for p, score, level, mask in zip(products, batch.scores, batch.levels, batch.missing):
+            key = str(p.get("id") or p.get("code") or "")
+            if not key:
+                self._anonymous += 1
+                key = f"#{self._anonymous}"
+            stamp = p.get(stamp_key)
+            added[key] = (
+                str(p.get("code") or ""),
+                str(p.get("name") or ""),
+                int(round(score * 10)),
+                level,
+                mask,
+                str(stamp) if stamp else None,
+            )
+        self.remove(added)
+        self.entries.update(added)
+        self._add(added.values(), 1)
+
+    def remove(self, keys: Iterable[str]) -> None:
+        self._add([self.entries.pop(key) for key in keys if key in self.entries], -1)
+
+    def stamp(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        return entry[5] if entry else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report in the shape of generate_quality_report()."""
+        fields = [r.field for r in self.profile.missing_rules]
+        by_quality: Dict[str, List[Dict[str, Any]]] = {level: [] for level in LEVELS}
+        names: Dict[int, List[str]] = {}  # few distinct masks; lists are shared between rows
+        for code, name, score10, level, mask, _ in self.entries.values():
+            if mask not in names:
+                names[mask] = missing_fields(mask, self.profile)
+            by_quality[LEVELS[level]].append(
+                {"code": code, "name": name, "score": display_score(score10 / 10), "missing_fields": names[mask]}
+            )
+        total = len(self.entries)
+        missing = [(fields[i], self._missing[i]) for i in self._missing_order if self._missing[i]]
+        return {
+            "total_products": total,
+            "average_score": round(self._score_sum / 10 / total, 2) if total else 0,
+            "distribution": dict(zip(LEVELS, self._levels)),
+            "top_missing_fields": sorted(missing, key=lambda x: x[1], reverse=True),
+            "products_by_quality": by_quality,
+        }
+
+    def state(self) -> Dict[str, Any]:
+        """JSON-serializable state for from_state()."""
+        return {
+            "profile": self.profile.name,
+            "totals": [self._score_sum, self._levels, self._missing, self._anonymous, self._missing_order],
+            "entries": self.entries,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], profile: Profile) -> "QualityReport":
+        report = cls(profile)
+        if state.get("profile") != profile.name:
+            return report
+        entries = state.get("entries") or {}
+        totals = state.get("totals")
+        if totals and len(totals) == 5 and len(totals[2]) == len(report._missing):
+            report.entries = {key: tuple(e) for key, e in entries.items()}  # type: ignore[misc]
+            report._score_sum, report._levels, report._missing, report._anonymous, report._missing_order = totals
+            return report
+        report.entries = {key: tuple(e) for key, e in entries.items()}  # type: ignore[misc]
+        report._add(report.entries.values(), 1)
+        return report
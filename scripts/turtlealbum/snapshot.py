@@ -0,0 +1,104 @@
+"""Read breeders from a local snapshot instead of the live API.
+
+Accepted inputs:
+  - NDJSON / JSON Lines (``.ndjson`` / ``.jsonl``): one product object per line,
+    streamed without loading the whole file.
+  - A JSON document: a bare list of products, the API envelope ``{"data": [...]}``
+    (e.g. a saved ``/api/breeders`` response) or an export with a ``"products"`` list
+    (``scripts/migrate/turtle_album_export.py``). JSON documents are parsed whole.
+
+Records are normalized to the field names the scripts read from the API
+(``updated_at`` -> ``updatedAt``, ``mate_code`` -> ``mateCode``).
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+# Keys under which a JSON document may carry its product list.
+_LIST_KEYS = ("products", "data", "items", "breeders")
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _normalize(record: Dict[str, Any]) -> Dict[str, Any]:
+    for snake, camel in (("updated_at", "updatedAt"), ("mate_code", "mateCode")):
+        if camel not in record and snake in record:
+            record[camel] = record[snake]
+    return record
+
+
+def _iter_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                raise SnapshotError(f"{path}:{lineno}: invalid JSON ({exc})") from exc
+            if isinstance(record, dict):
+                yield record
+
+
+def _iter_json(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as fh:
+        try:
+            doc = json.load(fh)
+        except ValueError as exc:
+            raise SnapshotError(f"{path}: invalid JSON ({exc})") from exc
+
+    records: Any = doc
+    if isinstance(doc, dict):
+        records = None
+        for key in _LIST_KEYS:
+            value = doc.get(key)
+            # Paged envelopes: {"data": {"items": [...]}}.
+            if isinstance(value, dict):
+                value = next((value[k] for k in _LIST_KEYS if isinstance(value.get(k), list)), None)
+            if isinstance(value, list):
+                records = value
+                break
+    if not isinstance(records, list):
+        raise SnapshotError(f"{path}: expected a list of products or one of keys {', '.join(_LIST_KEYS)}")
+
+    for record in records:
+        if isinstance(record, dict):
+            yield record
+
+
+def iter_snapshot(path: str | Path) -> Iterator[Dict[str, Any]]:
+    """Yield every product record in the snapshot file."""
+    p = Path(path).expanduser()
+    if not p.exists():
+        raise SnapshotError(f"Snapshot not found: {p}")
+    reader = _iter_ndjson if p.suffix.lower() in NDJSON_SUFFIXES else _iter_json
+    for record in reader(p):
+        yield _normalize(record)
+
+
+def iter_snapshot_breeders(
+    path: str | Path,
+    *,
+    sex: Optional[str] = "female",
+    limit: int = 0,
+) -> Iterator[Dict[str, Any]]:
+    """Yield breeders of the given sex, like ``/api/breeders?sex=...&limit=...``.
+
+    Records without a ``sex`` field (e.g. the raw sqlite export) are kept; 0 = no limit.
+    """
+    n = 0
+    for record in iter_snapshot(path):
+        if sex and record.get("sex") not in (None, "", sex):
+            continue
+        yield record
+        n += 1
+        if limit and n >= limit:
+            return
@@ -0,0 +1,412 @@
+"""Local sqlite snapshot of products, their images and series.
+
+Filled by ``query_production.py --action sync`` and read by its other actions,
+so read-only queries do not re-download the catalog. Products are stored as
+their API JSON (minus ``images``, which get their own table) next to a few
+indexed columns; ``updatedAt`` of the newest synced product is kept as the
+watermark for the next incremental sync. Timestamps are compared as parsed,
+timezone-aware datetimes (``parse_timestamp``), never as raw strings, since the
+API may mix offsets and fractional-second precision.
+
+Search runs on an FTS5 trigram index over code, name and description, kept in
+step with the products table (its rowid follows the product row). Trigrams need
+no word segmentation, so CJK names match like ASCII codes; queries shorter than
+three characters fall back to a LIKE scan of the index table. sqlite builds
+without FTS5/trigram (< 3.34) fall back to scanning the products table, as does
+a store opened with ``search_index=False`` (a cache that is never searched, e.g.
+the export cache), which skips the index on every write.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id TEXT PRIMARY KEY,
+    code TEXT NOT NULL,
+    name TEXT NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_code ON products (code);
+CREATE TABLE IF NOT EXISTS images (
+    product_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    url TEXT,
+    type TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (product_id, position)
+);
+CREATE TABLE IF NOT EXISTS series (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(code, name, description, tokenize='trigram')"
+)
+
+# Bumped when the index layout changes; an older store is re-indexed on open.
+FTS_VERSION = "1"
+
+SEARCH_FIELDS = ("code", "name", "description")
+
+# Rows considered by fuzzy_search before re-ranking.
+_FUZZY_CANDIDATES = 500
+
+# Host parameters per IN (...) query (older sqlite builds cap them at 999).
+_IN_CHUNK = 500
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _phrase(text: str) -> str:
+    """FTS5 string literal for text (matched as a substring by the trigram tokenizer)."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _like(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def updated_at(product: Dict[str, Any]) -> Optional[str]:
+    value = product.get("updatedAt") or product.get("updated_at")
+    return str(value) if value else None
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Timezone-aware datetime for an ISO-8601 stamp; naive stamps are taken as UTC, junk is None."""
+    if not value:
+        return None
+    text = value.strip()
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def updated_time(product: Dict[str, Any]) -> Optional[datetime]:
+    return parse_timestamp(updated_at(product))
+
+
+def is_newest_first(page: List[Dict[str, Any]], prev: Optional[datetime]) -> bool:
+    """Whether a page (and its seam with the previous page) is in descending updatedAt order."""
+    stamps = [ts for ts in (updated_time(p) for p in page) if ts]
+    if prev:
+        stamps.insert(0, prev)
+    return all(a >= b for a, b in zip(stamps, stamps[1:]))
+
+
+class ProductStore:
+    def __init__(self, path: str | Path, *, search_index: bool = True):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.has_fts = False
+        if not search_index:
+            # Drop an index left by an earlier indexed open; re-enabling rebuilds it.
+            with self._conn:
+                self._conn.execute("DROP TABLE IF EXISTS products_fts")
+                self._conn.execute("DELETE FROM meta WHERE key = 'fts_version'")
+            return
+        try:
+            self._conn.execute(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            pass
+        if self.has_fts and self.get_meta("fts_version") != FTS_VERSION:
+            self.reindex()
+
+    def __enter__(self) -> "ProductStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None  # type: ignore[assignment]
+
+    # --- meta ---
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, **values: Optional[str]) -> None:
+        with self._conn:
+            for key, value in values.items():
+                if value is None:
+                    self._conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+                else:
+                    self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # --- writes ---
+
+    def _rowids(self, ids: List[str]) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for i in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[i : i + _IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            out.update(self._conn.execute(f"SELECT id, rowid FROM products WHERE id IN ({marks})", chunk))
+        return out
+
+    def _index(self, products: List[Dict[str, Any]]) -> None:
+        """(Re)write the search rows of products; caller holds the transaction."""
+        rowids = self._rowids([str(p["id"]) for p in products])
+        rows = [
+            (rowids[str(p["id"])], str(p.get("code") or ""), str(p.get("name") or ""), str(p.get("description") or ""))
+            for p in products
+        ]
+        self._conn.executemany("DELETE FROM products_fts WHERE rowid = ?", [(r[0],) for r in rows])
+        self._conn.executemany("INSERT INTO products_fts (rowid, code, name, description) VALUES (?, ?, ?, ?)", rows)
+
+    def reindex(self) -> None:
+        """Rebuild the search index from the products table."""
+        with self._conn:
+            self._conn.execute("DELETE FROM products_fts")
+            self._conn.execute(
+                "INSERT INTO products_fts (rowid, code, name, description) "
+                "SELECT rowid, code, name, COALESCE(json_extract(data, '$.description'), '') FROM products"
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fts_version', ?)", (FTS_VERSION,))
+
+    def upsert_products(self, products: Iterable[Dict[str, Any]]) -> int:
+        """Insert or update products (their images and search rows) in one transaction."""
+        rows = []
+        image_rows = []
+        ids = []
+        indexed: Dict[str, Dict[str, Any]] = {}
+        for p in products:
+            pid = str(p.get("id") or "")
+            if not pid:
+                continue
+            record = {k: v for k, v in p.items() if k != "images"}
+            rows.append((pid, str(p.get("code") or ""), str(p.get("name") or ""), updated_at(p), _dumps(record)))
+            ids.append((pid,))
+            indexed[pid] = p
+            for pos, img in enumerate(p.get("images") or []):
+                if isinstance(img, dict):
+                    image_rows.append((pid, pos, img.get("url"), img.get("type"), _dumps(img)))
+        if rows:
+            with self._conn:
+                self._conn.executemany("DELETE FROM images WHERE product_id = ?", ids)
+                # Upsert keeps the rowid of an existing product, which is also its search-index rowid.
+                self._conn.executemany(
+                    "INSERT INTO products (id, code, name, updated_at, data) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET code = excluded.code, name = excluded.name, "
+                    "updated_at = excluded.updated_at, data = excluded.data",
+                    rows,
+                )
+                self._conn.executemany(
+                    "INSERT INTO images (product_id, position, url, type, data) VALUES (?, ?, ?, ?, ?)", image_rows
+                )
+                if self.has_fts:
+                    self._index(list(indexed.values()))
+        return len(rows)
+
+    def prune_products(self, keep_ids: Set[str]) -> int:
+        """Delete products whose id is not in keep_ids (after a full sync)."""
+        stale = [(pid,) for (pid,) in self._conn.execute("SELECT id FROM products") if pid not in keep_ids]
+        if stale:
+            with self._conn:
+                if self.has_fts:
+                    rowids = self._rowids([pid for (pid,) in stale])
+                    self._conn.executemany("DELETE FROM products_fts WHERE rowid = ?", [(r,) for r in rowids.values()])
+                self._conn.executemany("DELETE FROM images WHERE product_id = ?", stale)
+                self._conn.executemany("DELETE FROM products WHERE id = ?", stale)
+        return len(stale)
+
+    def replace_series(self, series: List[Dict[str, Any]]) -> int:
+        rows = [
+            (str(s.get("id") or ""), str(s.get("name") or ""), pos, _dumps(s))
+            for pos, s in enumerate(series)
+            if isinstance(s, dict) and s.get("id")
+        ]
+        with self._conn:
+            self._conn.execute("DELETE FROM series")
+            self._conn.executemany("INSERT INTO series (id, name, position, data) VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # --- reads ---
+
+    def count_products(self) -> int:
+        (n,) = self._conn.execute("SELECT COUNT(*) FROM products").fetchone()
+        return int(n)
+
+    def max_updated_at(self) -> Optional[str]:
+        """Newest product ``updated_at`` (by parsed time, not string order), as stored."""
+        newest: Optional[Tuple[datetime, str]] = None
+        for (value,) in self._conn.execute("SELECT updated_at FROM products WHERE updated_at IS NOT NULL"):
+            parsed = parse_timestamp(value)
+            if parsed is not None and (newest is None or parsed > newest[0]):
+                newest = (parsed, value)
+        return newest[1] if newest else None
+
+    def _images_for(self, ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for i in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[i : i + _IN_CHUNK]
+            cur = self._conn.execute(
+                f"SELECT product_id, data FROM images WHERE product_id IN ({','.join('?' * len(chunk))}) "
+                "ORDER BY product_id, position",
+                chunk,
+            )
+            for pid, data in cur:
+                out.setdefault(pid, []).append(json.loads(data))
+        return out
+
+    def _load(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(sql, tuple(params)).fetchall()
+        images = self._images_for([r[0] for r in rows])
+        products = []
+        for pid, data in rows:
+            p = json.loads(data)
+            p["images"] = images.get(pid, [])
+            products.append(p)
+        return products
+
+    def iter_product_pages(self, *, page_size: int = _IN_CHUNK) -> Iterator[List[Dict[str, Any]]]:
+        """All products ordered by code, one page at a time (keyset paging; images loaded per page)."""
+        sql = "SELECT id, data FROM products {} ORDER BY code, id LIMIT ?"
+        page = self._load(sql.format(""), (page_size,))
+        while page:
+            yield page
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            page = self._load(
+                sql.format("WHERE (code, id) > (?, ?)"), (str(last.get("code") or ""), str(last["id"]), page_size)
+            )
+
+    def iter_products(self, *, limit: int = 0) -> Iterator[Dict[str, Any]]:
+        """All products ordered by code; limit 0 = all. Reads one page at a time."""
+        n = 0
+        for page in self.iter_product_pages(page_size=min(limit, _IN_CHUNK) if limit else _IN_CHUNK):
+            for product in page:
+                yield product
+                n += 1
+                if limit and n >= limit:
+                    return
+
+    def product_stamps(self) -> Dict[str, Optional[str]]:
+        """{product id: updatedAt} for every stored product."""
+        return dict(self._conn.execute("SELECT id, updated_at FROM products"))
+
+    def get_products(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """Products for ids (missing ids are skipped), in no particular order."""
+        out: List[Dict[str, Any]] = []
+        for i in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[i : i + _IN_CHUNK]
+            out.extend(self._load(f"SELECT id, data FROM products WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        return out
+
+    def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        found = self._load("SELECT id, data FROM products WHERE id = ?", (product_id,))
+        return found[0] if found else None
+
+    def _match_clause(self, field: Optional[str], text: str) -> Tuple[str, List[str]]:
+        """SQL selecting product rowids whose field (None = any search field) contains text."""
+        columns = [field] if field else list(SEARCH_FIELDS)
+        if self.has_fts and len(text) >= 3:
+            query = f"{field} : {_phrase(text)}" if field else _phrase(text)
+            return "SELECT rowid FROM products_fts WHERE products_fts MATCH ?", [query]
+        if self.has_fts and "description" in columns:
+            # Too short for a trigram: LIKE over the index table, which holds the plain description.
+            sql = " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in columns)
+            return f"SELECT rowid FROM products_fts WHERE {sql}", [_like(text)] * len(columns)
+        exprs = {"description": "COALESCE(json_extract(data, '$.description'), '')"}
+        sql = " OR ".join(f"instr(lower({exprs.get(c, c)}), ?) > 0" for c in columns)
+        return f"SELECT rowid FROM products WHERE {sql}", [text.lower()] * len(columns)
+
+    def search_products(
+        self,
+        *,
+        code: Optional[str] = None,
+        name: Optional[str] = None,
+        text: Optional[str] = None,
+        limit: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Case-insensitive substring search; a product matching any given term is returned.
+
+        ``code`` / ``name`` match their own column (like the API search + filter),
+        ``text`` matches code, name or description. Products whose code starts with
+        ``code`` come first, then the rest by code.
+        """
+        subqueries: List[str] = []
+        params: List[Any] = []
+        for field, value in (("code", code), ("name", name), (None, text)):
+            value = (value or "").strip()
+            if value:
+                sql, args = self._match_clause(field, value)
+                subqueries.append(sql)
+                params.extend(args)
+        if not subqueries:
+            return []
+        prefix = (code or "").strip()
+        sql = (
+            f"SELECT id, data FROM products WHERE rowid IN ({' UNION '.join(subqueries)}) "
+            "ORDER BY (code LIKE ? ESCAPE '\\') DESC, code, id"
+        )
+        params.append(_like(prefix)[1:] if prefix else "")
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._load(sql, params)
+
+    def fuzzy_search(self, text: str, *, limit: int = 20) -> List[Dict[str, Any]]:
+        """Best matches for text that may be misspelt or partial.
+
+        Candidates share at least one trigram with text (bigram for short text);
+        they are ranked by the share of text's bigrams found in code + name, then
+        by bm25 (code and name weigh four times the description).
+        """
+        text = (text or "").strip().lower()
+        bigrams = {text[i : i + 2] for i in range(len(text) - 1)}
+        if not bigrams:
+            return self.search_products(text=text, limit=limit)
+        trigrams = sorted({text[i : i + 3] for i in range(len(text) - 2)})
+        if self.has_fts and len(trigrams) >= 2:
+            rows = self._conn.execute(
+                "SELECT p.id, p.code, p.name FROM products_fts f JOIN products p ON p.rowid = f.rowid "
+                "WHERE products_fts MATCH ? ORDER BY bm25(products_fts, 4.0, 4.0, 1.0) LIMIT ?",
+                (" OR ".join(_phrase(g) for g in trigrams), _FUZZY_CANDIDATES),
+            ).fetchall()
+        else:
+            grams = sorted(bigrams)
+            cond = " OR ".join("instr(lower(code), ?) > 0 OR instr(lower(name), ?) > 0" for _ in grams)
+            rows = self._conn.execute(
+                f"SELECT id, code, name FROM products WHERE {cond} LIMIT ?",
+                [g for g in grams for _ in (0, 1)] + [_FUZZY_CANDIDATES],
+            ).fetchall()
+
+        def score(row: Tuple[str, str, str]) -> float:
+            hay = f"{row[1]} {row[2]}".lower()
+            return sum(1 for g in bigrams if g in hay) / len(bigrams)
+
+        # sorted() is stable, so equal scores keep the bm25 order.
+        best = sorted(rows, key=score, reverse=True)[:limit]
+        by_id = {p["id"]: p for p in self.get_products([r[0] for r in best])}
+        return [by_id[r[0]] for r in best if r[0] in by_id]
+
+    def series(self) -> List[Dict[str, Any]]:
+        return [json.loads(d) for (d,) in self._conn.execute("SELECT data FROM series ORDER BY position")]